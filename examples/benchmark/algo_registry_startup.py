@@ -0,0 +1,70 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+startup-time regression benchmark of the lazy algorithm registry: importing marllib.marl and resolving
+the running script of one algorithm, compared with importing every script and trainer up front as
+POlICY_REGISTRY and eval's form_algo_dict used to do
+
+with --budget_ms the script exits with status 1 when the lazy startup import time exceeds the budget,
+so it can guard against heavy imports creeping back into the startup path
+
+usage: python examples/benchmark/algo_registry_startup.py --algo mappo --repeat 5 --budget_ms 3000
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from env_registry_import_time import run_importtime
+
+EAGER = "from marllib.marl.algos.registry import POlICY_REGISTRY as P, TRAINER_REGISTRY as T; " \
+        "[P[n] for n in P]; [T[n] for n in T]; "
+
+SCENARIOS = {
+    "import marllib.marl": "import marllib.marl; ",
+    "single algo startup": "from marllib import marl; from marllib.marl.algos.registry import POlICY_REGISTRY; "
+                           "marl.algos.{algo}; POlICY_REGISTRY['{algo}']; ",
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--algo", type=str, default="mappo")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget_ms", type=float, default=None)
+    args = parser.parse_args()
+
+    lazy_startup_ms = None
+    print("{:<22}{:>10}{:>18}{:>14}".format("scenario", "registry", "import time (ms)", "wall (ms)"))
+    for scenario, code in SCENARIOS.items():
+        code = code.format(algo=args.algo)
+        for registry, prefix in (("eager", EAGER), ("lazy", "")):
+            results = np.array([run_importtime(prefix + code) for _ in range(args.repeat)])
+            import_ms, wall_ms = np.median(results, axis=0)
+            print("{:<22}{:>10}{:>18.1f}{:>14.1f}".format(scenario, registry, import_ms, wall_ms))
+            if registry == "lazy":
+                lazy_startup_ms = import_ms
+
+    if args.budget_ms is not None and lazy_startup_ms > args.budget_ms:
+        print("startup import time {:.1f} ms exceeds the budget of {:.1f} ms".format(lazy_startup_ms, args.budget_ms))
+        sys.exit(1)
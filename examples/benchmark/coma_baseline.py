@@ -0,0 +1,124 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+CPU time per COMA update across action-space sizes: the per-opponent one_hot critic input, the
+flat-index np.take on the rollout side and the unmasked baseline as before, against a single scatter
+into the joint one-hot, the take_along_axis gather and the masked einsum baseline as now. Both sides
+run one critic forward over all actions per timestep, as the loss needs it with grad anyway.
+
+usage: python examples/benchmark/coma_baseline.py --batch 3200 --n_agents 10 --actions 5 15 30 60
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+class AllActionCritic(nn.Module):
+    """stand-in for the cc_mlp central_value_function with q_flag set"""
+
+    def __init__(self, state_dim, n_actions, n_agents, hidden=128):
+        super().__init__()
+        self.n_actions = n_actions
+        self.n_agents = n_agents
+        self.encoder = nn.Sequential(nn.Linear(state_dim, hidden), nn.ReLU())
+        self.branch = nn.Sequential(
+            nn.Linear(hidden + (n_agents - 1) * n_actions, hidden), nn.ReLU(), nn.Linear(hidden, n_actions))
+
+    def forward(self, state, opponent_actions, vectorized):
+        B = state.shape[0]
+        x = self.encoder(state)
+        if vectorized:
+            opponent_actions_ls = [
+                torch.zeros(B, self.n_agents - 1, self.n_actions).scatter_(
+                    2, opponent_actions.long().reshape(B, -1, 1), 1.0).reshape(B, -1)]
+        else:  # previous behaviour
+            opponent_actions_ls = [
+                nn.functional.one_hot(opponent_actions[:, i].long(), self.n_actions).float()
+                for i in range(self.n_agents - 1)]
+        return self.branch(torch.cat([x] + opponent_actions_ls, 1))
+
+
+def postprocess(critic, state, opponent_actions, actions, vectorized):
+    with torch.no_grad():
+        q = critic(state, opponent_actions, vectorized).numpy()
+    if vectorized:
+        return np.take_along_axis(q, actions.numpy().reshape(-1, 1), axis=1)[:, 0]
+    return np.take(q, np.expand_dims(actions.numpy(), axis=1)).squeeze(axis=1)
+
+
+def learner_step(critic, logits, state, opponent_actions, actions, avail, value_targets, vectorized):
+    values = critic(state, opponent_actions, vectorized)
+    pi = torch.softmax(logits, dim=-1)
+    log_probs = torch.log_softmax(logits, dim=-1).gather(1, actions.unsqueeze(1)).squeeze(1)
+    select_action_Q_value = values.gather(1, actions.unsqueeze(1)).squeeze(1)
+    if vectorized:
+        baseline = torch.einsum("ba,ba->b", values, pi * avail)
+    else:
+        baseline = torch.sum(values * pi, dim=1)
+    advantages = (select_action_Q_value - baseline).detach()
+    loss = -torch.sum(log_probs * advantages) + 0.5 * torch.sum((select_action_Q_value - value_targets) ** 2)
+    loss.backward()
+
+
+def cpu_ms(fn, steps):
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(steps):
+        fn()
+    return (time.process_time() - start) / steps * 1e3
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=3200)
+    parser.add_argument("--n_agents", type=int, default=10)
+    parser.add_argument("--state_dim", type=int, default=120)
+    parser.add_argument("--actions", type=int, nargs="+", default=[5, 15, 30, 60])
+    parser.add_argument("--steps", type=int, default=30)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    print("{:>8}{:>18}{:>18}{:>18}{:>18}".format(
+        "actions", "postproc before", "postproc after", "update before", "update after"))
+    for n_actions in args.actions:
+        critic = AllActionCritic(args.state_dim, n_actions, args.n_agents)
+        state = torch.randn(args.batch, args.state_dim)
+        opponent_actions = torch.randint(n_actions, (args.batch, args.n_agents - 1))
+        actions = torch.randint(n_actions, (args.batch,))
+        avail = torch.ones(args.batch, n_actions)
+        logits = torch.randn(args.batch, n_actions, requires_grad=True)
+        value_targets = torch.randn(args.batch)
+
+        row = [n_actions]
+        for step in (postprocess, learner_step):
+            for vectorized in (False, True):
+                if step is postprocess:
+                    inputs = (critic, state, opponent_actions, actions, vectorized)
+                else:
+                    inputs = (critic, logits, state, opponent_actions, actions, avail, value_targets, vectorized)
+                row.append(cpu_ms(lambda: step(*inputs), args.steps))
+        print("{:>8}{:>18.2f}{:>18.2f}{:>18.2f}{:>18.2f}".format(*row))
@@ -0,0 +1,78 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+cost of building the experiment configs the way a grid search driver does: the same env / algo / model
+configs requested many times. Cold runs clear the config cache before every request, so every yaml file is
+parsed again as before the cache existed; warm runs reuse the parsed and merged configs.
+The cProfile output of the cold run shows where the startup time goes.
+
+usage: python examples/benchmark/config_cache.py --env smac --map 3m --algo mappo --repeat 200
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import time
+
+import marllib
+from marllib.marl.common import load_config, get_model_config, clear_config_cache
+
+ROOT = os.path.dirname(marllib.__file__)
+
+
+def build_configs(env, map_name, algo):
+    ray_config = load_config(os.path.join(ROOT, "marl/ray/ray.yaml"))
+    env_config = load_config(os.path.join(ROOT, "envs/base_env/config/{}.yaml".format(env)), "env_args",
+                             {"map_name": map_name})
+    algo_config = load_config(os.path.join(ROOT, "marl/algos/hyperparams/common/{}.yaml".format(algo)))
+    model_configs = [get_model_config(name) for name in ["rnn", "mlp", "fc_encoder", "mixer"]]
+    return ray_config, env_config, algo_config, model_configs
+
+
+def timed(args, cold):
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        if cold:
+            clear_config_cache()
+        build_configs(args.env, args.map, args.algo)
+    return (time.perf_counter() - start) / args.repeat * 1e3
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env", type=str, default="smac")
+    parser.add_argument("--map", type=str, default="3m")
+    parser.add_argument("--algo", type=str, default="mappo")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    cold_ms = timed(args, cold=True)
+    profiler.disable()
+    warm_ms = timed(args, cold=False)
+
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(8)
+    print("configs per experiment, cold (parse every time): {:.3f} ms".format(cold_ms))
+    print("configs per experiment, warm (cached):           {:.3f} ms".format(warm_ms))
@@ -0,0 +1,99 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+A/B learner throughput of the DDPG-family critic evaluation on MAMujoco-sized batches: the online GRU Q network
+unrolled separately for the taken and the policy actions with the target branch under autograd (before), and the
+same with the target branch under torch.no_grad (now always on).
+
+usage: python examples/benchmark/ddpg_target_no_grad.py --episodes 8 --episode_len 1000 --max_seq_len 20 --steps 10
+"""
+
+import argparse
+import copy
+import time
+
+import torch
+import torch.nn as nn
+
+class RNNQ(nn.Module):
+    """stand-in for the ddpg_rnn Q model: obs encoder, GRU unrolled over each sequence, Q head"""
+
+    def __init__(self, obs_dim, state_dim, action_dim, hidden=128):
+        super().__init__()
+        self.encoder = nn.Sequential(nn.Linear(obs_dim + state_dim, hidden), nn.ReLU())
+        self.rnn = nn.GRU(hidden + action_dim, hidden, batch_first=True)
+        self.head = nn.Linear(hidden, 1)
+
+    def get_q_values(self, model_out, state_in, seq_lens, actions):
+        x = torch.cat((self.encoder(torch.cat((model_out["obs"]["obs"], model_out["state"]), -1)), actions), -1)
+        x = x.reshape(seq_lens.shape[0], x.shape[0] // seq_lens.shape[0], -1)
+        features, h = self.rnn(x, state_in[0].unsqueeze(0))
+        return self.head(features).reshape(-1, 1), [h.squeeze(0)]
+
+
+def learner_step(q_net, target_q_net, actor, batch, target_no_grad):
+    model_out, model_out_tp1, state_in, seq_lens, actions, rewards = batch
+    policy_t = actor(model_out["obs"]["obs"])
+    with torch.set_grad_enabled(not target_no_grad):
+        policy_tp1 = actor(model_out_tp1["obs"]["obs"])
+        q_tp1 = target_q_net.get_q_values(model_out_tp1, state_in, seq_lens, policy_tp1)[0]
+    q_t = q_net.get_q_values(model_out, state_in, seq_lens, actions)[0]
+    q_t_det_policy = q_net.get_q_values(model_out, state_in, seq_lens, policy_t)[0]
+    critic_loss = (q_t - (rewards + 0.99 * q_tp1).detach()).pow(2).mean()
+    actor_loss = -q_t_det_policy.mean()
+    actor_loss.backward(retain_graph=True)
+    critic_loss.backward()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=8)
+    parser.add_argument("--episode_len", type=int, default=1000)
+    parser.add_argument("--max_seq_len", type=int, default=20)
+    parser.add_argument("--obs_dim", type=int, default=12)  # 2AgentHalfCheetah, agent_obsk=1
+    parser.add_argument("--state_dim", type=int, default=17)
+    parser.add_argument("--action_dim", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = args.episodes * args.episode_len
+    n_seq = rows // args.max_seq_len
+
+    def make_model_out():
+        return {"obs": {"obs": torch.randn(rows, args.obs_dim)}, "state": torch.randn(rows, args.state_dim)}
+
+    batch = (make_model_out(), make_model_out(), [torch.zeros(n_seq, 128)],
+             torch.full((n_seq,), args.max_seq_len), torch.rand(rows, args.action_dim) * 2 - 1, torch.randn(rows, 1))
+    q_net = RNNQ(args.obs_dim, args.state_dim, args.action_dim)
+    target_q_net = copy.deepcopy(q_net)
+    actor = nn.Sequential(nn.Linear(args.obs_dim, 64), nn.ReLU(), nn.Linear(64, args.action_dim), nn.Tanh())
+
+    variants = [("before", False), ("no_grad target", True)]
+    print("{:<18}{:>14}{:>16}".format("critic", "step (ms)", "samples / s"))
+    for name, target_no_grad in variants:
+        learner_step(q_net, target_q_net, actor, batch, target_no_grad)  # warm up
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            learner_step(q_net, target_q_net, actor, batch, target_no_grad)
+        step_s = (time.perf_counter() - start) / args.steps
+        print("{:<18}{:>14.1f}{:>16.0f}".format(name, step_s * 1e3, rows / step_s))
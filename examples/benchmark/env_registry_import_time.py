@@ -0,0 +1,79 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+import-time benchmark of the lazy environment registry: `import marllib.marl` and a rollout worker
+startup (import + resolving the one env it runs) with the lazy registry, compared with eagerly
+resolving every registered env as the registry used to do at import time
+
+each measurement runs in a fresh interpreter with `python -X importtime`
+
+usage: python examples/benchmark/env_registry_import_time.py --env mpe --repeat 5
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+EAGER = "from marllib.envs.base_env import ENV_REGISTRY as R; from marllib.envs.global_reward_env " \
+        "import COOP_ENV_REGISTRY as C; [R[n] for n in R]; [C[n] for n in C]; "
+
+SCENARIOS = {
+    "import marllib.marl": "import marllib.marl; ",
+    "worker startup": "import marllib.marl; from marllib.envs.base_env import ENV_REGISTRY; ENV_REGISTRY['{env}']; ",
+}
+
+
+def run_importtime(code):
+    """Run `code` in a fresh interpreter, return (total import time, wall time) in ms."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], stderr=subprocess.PIPE,
+                          stdout=subprocess.DEVNULL, universal_newlines=True)
+    wall = (time.perf_counter() - start) * 1e3
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # top-level imports only, nested ones are already counted
+            total += int(cumulative)
+    return total / 1e3, wall
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env", type=str, default="mpe")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("{:<22}{:>10}{:>18}{:>14}".format("scenario", "registry", "import time (ms)", "wall (ms)"))
+    for scenario, code in SCENARIOS.items():
+        code = code.format(env=args.env)
+        for registry, prefix in (("eager", EAGER), ("lazy", "")):
+            results = np.array([run_importtime(prefix + code) for _ in range(args.repeat)])
+            import_ms, wall_ms = np.median(results, axis=0)
+            print("{:<22}{:>10}{:>18.1f}{:>14.1f}".format(scenario, registry, import_ms, wall_ms))
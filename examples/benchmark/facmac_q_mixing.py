@@ -0,0 +1,123 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+learner-step cost of the FACMAC Q-and-mixing evaluation: the three Q calls of value_mixing_ddpg_loss
+(taken actions, current policy, target) plus the backward pass, with model_out deep-copied per call as
+before and shared as now. The memory column counts the tensor bytes duplicated per learner step
+(tensor deepcopy clones storages outside the aten ops that torch.profiler reports).
+
+usage: python examples/benchmark/facmac_q_mixing.py --batch 3200 --n_agents 8 --obs_dim 80 --state_dim 160
+"""
+
+import argparse
+import copy
+import time
+
+import torch
+import torch.nn as nn
+
+COPIED_BYTES = [0]
+
+
+def tensor_bytes(value):
+    if isinstance(value, dict):
+        return sum(tensor_bytes(item) for item in value.values())
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    return 0
+
+
+class QMixingNet(nn.Module):
+    """stand-in for the FACMAC q_model: per-agent Q(o, a) and a state-conditioned monotonic mixer"""
+
+    def __init__(self, obs_dim, state_dim, action_dim, n_agents, hidden=64):
+        super().__init__()
+        self.n_agents = n_agents
+        self.q = nn.Sequential(nn.Linear(obs_dim + action_dim, hidden), nn.ReLU(), nn.Linear(hidden, 1))
+        self.hyper_w = nn.Linear(state_dim, n_agents)
+        self.hyper_b = nn.Linear(state_dim, 1)
+
+    def forward(self, model_out):
+        return self.q(torch.cat((model_out["obs"]["obs"], model_out["actions"]), -1))
+
+    def mixing_value(self, all_agents_q, state):
+        return (all_agents_q * torch.abs(self.hyper_w(state))).sum(-1) + self.hyper_b(state).squeeze(-1)
+
+
+def q_and_mixing(net, model_out, actions, deep_copy):
+    if deep_copy:  # previous behaviour
+        model_out = copy.deepcopy(model_out)
+        COPIED_BYTES[0] += tensor_bytes(model_out)
+        model_out["actions"] = actions
+        model_out["is_training"] = True
+    else:
+        model_out = dict(model_out, actions=actions, is_training=True)
+    out = net(model_out)
+    return net.mixing_value(torch.cat((out, model_out["opponent_q"]), 1), model_out["state"])
+
+
+def learner_step(net, target_net, model_out, target_model_out, actions, policy_t, policy_tp1, deep_copy):
+    q_t = q_and_mixing(net, model_out, actions, deep_copy)
+    q_t_det_policy = q_and_mixing(net, model_out, policy_t, deep_copy)
+    q_tp1 = q_and_mixing(target_net, target_model_out, policy_tp1, deep_copy).detach()
+    loss = (q_t - q_tp1).pow(2).mean() - q_t_det_policy.mean()
+    loss.backward()
+
+
+def make_model_out(args):
+    return {
+        "obs": {"obs": torch.randn(args.batch, args.obs_dim)},
+        "state": torch.randn(args.batch, args.state_dim),
+        "opponent_q": torch.randn(args.batch, args.n_agents - 1),
+        "prev_actions": torch.randn(args.batch, args.action_dim),
+        "prev_rewards": torch.randn(args.batch),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=3200)
+    parser.add_argument("--n_agents", type=int, default=8)
+    parser.add_argument("--obs_dim", type=int, default=80)
+    parser.add_argument("--state_dim", type=int, default=160)
+    parser.add_argument("--action_dim", type=int, default=6)
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+
+    net = QMixingNet(args.obs_dim, args.state_dim, args.action_dim, args.n_agents)
+    target_net = copy.deepcopy(net)
+    model_out, target_model_out = make_model_out(args), make_model_out(args)
+    actions = torch.randn(args.batch, args.action_dim)
+    policy_t = torch.randn(args.batch, args.action_dim, requires_grad=True)
+    policy_tp1 = torch.randn(args.batch, args.action_dim)
+    inputs = (net, target_net, model_out, target_model_out, actions, policy_t, policy_tp1)
+
+    print("{:<14}{:>16}{:>20}".format("model_out", "step (ms)", "copied / step (MB)"))
+    for name, deep_copy in [("deepcopy", True), ("shared", False)]:
+        learner_step(*inputs, deep_copy)  # warm up
+        COPIED_BYTES[0] = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            learner_step(*inputs, deep_copy)
+        step_ms = (time.perf_counter() - start) / args.steps * 1e3
+        print("{:<14}{:>16.2f}{:>20.2f}".format(name, step_ms, COPIED_BYTES[0] / args.steps / 2 ** 20))
@@ -0,0 +1,106 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+wall time of one HAPPO heterogeneous update over n individual actors: every agent's pre-update forward and
+ratio run one after another as before, or up front on a thread pool whose workers split the torch intra-op
+threads (agent_update_threads). The m_advantage chain, the actor step and the post-update forward stay
+sequential in both modes. Only meaningful on a multi-core CPU.
+
+usage: python examples/benchmark/happo_agent_threads.py --n_agents 10 --batch 4000 --threads 1 2 4 8
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+import torch.nn as nn
+
+
+def make_actor(obs_dim, n_actions, hidden):
+    return nn.Sequential(nn.Linear(obs_dim, hidden), nn.Tanh(), nn.Linear(hidden, hidden), nn.Tanh(),
+                         nn.Linear(hidden, n_actions))
+
+
+def agent_forward(actor, obs, actions, prev_logp):
+    actor.train()
+    dist = torch.distributions.Categorical(logits=actor(obs))
+    return dist, torch.exp(dist.log_prob(actions) - prev_logp)
+
+
+def heterogeneous_update(actors, optimizers, batches, advantages, pool):
+    order = list(range(len(actors)))
+    random.shuffle(order)
+    if pool is None:
+        forwards = (agent_forward(actors[i], *batches[i]) for i in order)
+    else:
+        forwards = list(pool.map(lambda i: agent_forward(actors[i], *batches[i]), order))
+
+    m_advantage = advantages
+    for i, (dist, logp_ratio) in zip(order, forwards):
+        surrogate = torch.min(m_advantage * logp_ratio, m_advantage * torch.clamp(logp_ratio, 0.7, 1.3)).mean()
+        loss = -(surrogate + 0.01 * dist.entropy().mean())
+        optimizers[i].zero_grad()
+        loss.backward()
+        optimizers[i].step()
+        with torch.no_grad():  # update_m_advantage
+            actors[i].eval()
+            obs, actions, prev_logp = batches[i]
+            new_logp = torch.distributions.Categorical(logits=actors[i](obs)).log_prob(actions)
+            m_advantage = torch.exp(new_logp - prev_logp) * m_advantage
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_agents", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=4000)
+    parser.add_argument("--obs_dim", type=int, default=128)
+    parser.add_argument("--hidden", type=int, default=256)
+    parser.add_argument("--n_actions", type=int, default=16)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    actors = [make_actor(args.obs_dim, args.n_actions, args.hidden) for _ in range(args.n_agents)]
+    optimizers = [torch.optim.Adam(actor.parameters(), lr=1e-5) for actor in actors]
+    batches = [(torch.randn(args.batch, args.obs_dim), torch.randint(args.n_actions, (args.batch,)),
+                torch.full((args.batch,), -2.0)) for _ in range(args.n_agents)]
+    advantages = torch.randn(args.batch)
+
+    intra_op_threads = torch.get_num_threads()
+    print("torch intra-op threads: {}".format(intra_op_threads))
+    print("{:>10}{:>16}".format("threads", "update (ms)"))
+    for num_threads in args.threads:
+        pool = None
+        if num_threads > 1:
+            pool = ThreadPoolExecutor(num_threads, initializer=torch.set_num_threads,
+                                      initargs=(max(1, intra_op_threads // num_threads),))
+        heterogeneous_update(actors, optimizers, batches, advantages, pool)  # warm up
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            heterogeneous_update(actors, optimizers, batches, advantages, pool)
+        print("{:>10}{:>16.2f}".format(num_threads, (time.perf_counter() - start) / args.steps * 1e3))
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,95 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+cold start and batched throughput of the ray-free inference runtime on a trained checkpoint,
+optionally compared with restoring a full RLlib trainer through examples/eval.py::load_model
+
+usage: python examples/benchmark/inference_cold_start.py --params_path examples/checkpoint/params.json \
+    --model_path examples/checkpoint/checkpoint-6250 --compare_trainer
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+RUNTIME_COLD_START = """
+import time
+start = time.perf_counter()
+from marllib.marl.inference import InferenceRuntime
+runtime = InferenceRuntime.from_checkpoint("{params_path}", "{model_path}")
+print(time.perf_counter() - start)
+"""
+
+TRAINER_COLD_START = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, "examples")
+from eval import load_model
+load_model({{"params_path": "{params_path}", "model_path": "{model_path}"}})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code):
+    """Seconds from a fresh interpreter to a ready-to-serve model."""
+    proc = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--params_path", type=str, default="examples/checkpoint/params.json")
+    parser.add_argument("--model_path", type=str, default="examples/checkpoint/checkpoint-6250")
+    parser.add_argument("--agents", type=int, nargs="+", default=[3, 32, 256])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--compare_trainer", action="store_true")
+    args = parser.parse_args()
+
+    paths = dict(params_path=args.params_path, model_path=args.model_path)
+    print("cold start, inference runtime: {:.3f} s".format(cold_start(RUNTIME_COLD_START.format(**paths))))
+    if args.compare_trainer:
+        print("cold start, rllib trainer:     {:.3f} s".format(cold_start(TRAINER_COLD_START.format(**paths))))
+
+    import numpy as np
+    from marllib.marl.inference import InferenceRuntime
+
+    runtime = InferenceRuntime.from_checkpoint(args.params_path, args.model_path)
+    policy_id, policy = next(iter(runtime.policies.items()))
+    obs_space = policy.model.custom_config["space_obs"]
+    runtime.policy_mapping_fn = lambda agent_id: policy_id  # serve every agent with the first policy
+
+    for n_agents in args.agents:
+        obs = {"agent_{}".format(i): {key: space.sample() for key, space in obs_space.spaces.items()}
+               for i in range(n_agents)}
+        runtime.reset()
+        runtime.compute_actions(obs)
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            runtime.compute_actions(obs)
+        elapsed = (time.perf_counter() - start) / args.steps
+        print("{:>5} agents: {:8.3f} ms per compute_actions, {:10.1f} agent-steps / s".format(
+            n_agents, elapsed * 1e3, n_agents / elapsed))
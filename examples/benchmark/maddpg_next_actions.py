@@ -0,0 +1,83 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+cost of building next_opponent_actions in the MADDPG before_learn_on_batch hook for a shared-policy batch:
+splitting the target actor output by agent and dropping the ego agent with per-row np.delete, as before,
+against the agent regrouping and one precomputed gather now used
+
+usage: python examples/benchmark/maddpg_next_actions.py --agents 3 8 24 --timesteps 1000 --repeat 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from marllib.marl.algos.utils.agent_rows import stack_agent_rows, gather_opponent_rows
+
+
+def loop_next_opponent_actions(next_action, agent_index, n_agents):
+    all_agent_next_action = []
+    for a_id in np.unique(agent_index):
+        all_agent_next_action.append(next_action[np.where(agent_index == a_id)[0], :])
+    all_agent_next_action = np.stack(all_agent_next_action, 1)
+    agent_num = len(np.unique(agent_index))
+    next_action_batch = np.stack([all_agent_next_action] * agent_num, 1).reshape((len(agent_index), n_agents, -1))
+    return np.stack([np.delete(next_action_batch[i], agent_index[i], axis=0) for i in range(len(agent_index))], 0)
+
+
+def gather_next_opponent_actions(next_action, agent_index, n_agents):
+    all_agent_next_action = stack_agent_rows(next_action, agent_index)
+    return gather_opponent_rows(all_agent_next_action, agent_index).reshape((len(agent_index), n_agents - 1, -1))
+
+
+def timed(fn, actor, next_obs, agent_index, n_agents, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with torch.no_grad():
+            next_action = actor(next_obs).numpy()
+        out = fn(next_action, agent_index, n_agents)
+    return (time.perf_counter() - start) / repeat * 1e3, out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, nargs="+", default=[3, 8, 24])
+    parser.add_argument("--timesteps", type=int, default=1000)
+    parser.add_argument("--obs_dim", type=int, default=64)
+    parser.add_argument("--action_dim", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    actor = nn.Sequential(nn.Linear(args.obs_dim, 64), nn.ReLU(), nn.Linear(64, args.action_dim), nn.Tanh())
+    print("{:>8}{:>10}{:>18}{:>18}".format("agents", "rows", "per-row (ms)", "gather (ms)"))
+    for n_agents in args.agents:
+        agent_index = np.tile(np.arange(n_agents), args.timesteps)
+        next_obs = torch.randn(len(agent_index), args.obs_dim)
+        loop_ms, loop_out = timed(loop_next_opponent_actions, actor, next_obs, agent_index, n_agents, args.repeat)
+        gather_ms, gather_out = timed(gather_next_opponent_actions, actor, next_obs, agent_index, n_agents,
+                                      args.repeat)
+        assert np.array_equal(loop_out, gather_out)
+        print("{:>8}{:>10}{:>18.2f}{:>18.2f}".format(n_agents, len(agent_index), loop_ms, gather_ms))
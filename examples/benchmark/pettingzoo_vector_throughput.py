@@ -0,0 +1,88 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+env-step throughput of M copies of the per-agent-dict PettingZoo wrappers (RLlibMPE / RLlibMAgent)
+against the vectorized VectorPettingZooEnv on simple_spread and MAgent adversarial_pursuit
+
+usage: python examples/benchmark/pettingzoo_vector_throughput.py --num_envs 1 8 32 --steps 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from marllib.envs.base_env import ENV_REGISTRY
+from marllib.envs.vector_env import VectorPettingZooEnv
+
+SCENARIOS = {
+    "simple_spread": ("mpe", {"map_name": "simple_spread", "max_cycles": 25, "continuous_actions": False}),
+    "adversarial_pursuit": ("magent", {"map_name": "adversarial_pursuit", "minimap_mode": True, "max_cycles": 200}),
+}
+
+
+def bench_dict_envs(env, env_config, num_envs, steps):
+    envs = [ENV_REGISTRY[env](dict(env_config)) for _ in range(num_envs)]
+    action_space = envs[0].action_space
+    obs = [e.reset() for e in envs]
+    start = time.perf_counter()
+    for _ in range(steps):
+        for m, e in enumerate(envs):
+            actions = {agent: action_space.sample() for agent in obs[m]}
+            obs[m], _, dones, _ = e.step(actions)
+            if dones["__all__"]:
+                obs[m] = e.reset()
+    elapsed = time.perf_counter() - start
+    for e in envs:
+        e.close()
+    return num_envs * steps / elapsed
+
+
+def bench_vector_env(env, env_config, num_envs, steps):
+    vector_env = VectorPettingZooEnv.from_config(env, env_config, num_envs)
+    n = vector_env.action_space.n
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = np.random.randint(0, n, size=(num_envs, vector_env.num_agents))
+        _, _, _, all_dones = vector_env.vector_step(actions)
+        for m in np.flatnonzero(all_dones):
+            vector_env.vector_reset_at(m)
+    elapsed = time.perf_counter() - start
+    vector_env.stop()
+    return num_envs * steps / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", type=str, nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    print("{:<22}{:>6}{:>22}{:>22}".format("scenario", "M", "dict envs (steps/s)", "vector env (steps/s)"))
+    for scenario in args.scenarios:
+        env, env_config = SCENARIOS[scenario]
+        for num_envs in args.num_envs:
+            dict_sps = bench_dict_envs(env, env_config, num_envs, args.steps)
+            vector_sps = bench_vector_env(env, env_config, num_envs, args.steps)
+            print("{:<22}{:>6}{:>22.1f}{:>22.1f}".format(scenario, num_envs, dict_sps, vector_sps))
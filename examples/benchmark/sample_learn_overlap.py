@@ -0,0 +1,217 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+synchronous vs one-step-stale (sample_learn_overlap) on-policy training under the same wall-clock budget. remote
+samplers are processes stepping a vectorized numpy cart-pole with a sleep per step standing in for a heavier
+simulator, the learner runs PPO epochs on the main process. in overlap mode the samplers get the previous weights
+and start on batch k+1 before the learner trains on batch k, as rllib's async rollouts with a queued weight
+broadcast do. reports env steps/s and mean episode return at equal wall-clock checkpoints.
+
+usage: python examples/benchmark/sample_learn_overlap.py --workers 2 --seconds 30 --env_step_ms 4
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+class VecCartPole:
+    """classic cart-pole dynamics for n independent copies, auto-reset on termination or 200 steps"""
+
+    def __init__(self, n, seed):
+        self.n = n
+        self.rng = np.random.RandomState(seed)
+        self.state = self.rng.uniform(-0.05, 0.05, (n, 4))
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.returns = np.zeros(n)
+
+    def step(self, action):
+        x, x_dot, theta, theta_dot = self.state.T
+        force = np.where(action == 1, 10.0, -10.0)
+        cos, sin = np.cos(theta), np.sin(theta)
+        temp = (force + 0.05 * theta_dot ** 2 * sin) / 1.1
+        theta_acc = (9.8 * sin - cos * temp) / (0.5 * (4.0 / 3.0 - 0.1 * cos ** 2 / 1.1))
+        x_acc = temp - 0.05 * theta_acc * cos / 1.1
+        self.state = np.stack([x + 0.02 * x_dot, x_dot + 0.02 * x_acc,
+                               theta + 0.02 * theta_dot, theta_dot + 0.02 * theta_acc], 1)
+        self.steps += 1
+        self.returns += 1.0
+        done = (np.abs(self.state[:, 0]) > 2.4) | (np.abs(self.state[:, 2]) > 0.2095) | (self.steps >= 200)
+        finished = self.returns[done].tolist()
+        self.state[done] = self.rng.uniform(-0.05, 0.05, (int(done.sum()), 4))
+        self.steps[done] = 0
+        self.returns[done] = 0.0
+        return np.ones(self.n, dtype=np.float32), done, finished
+
+
+class ActorCritic(nn.Module):
+
+    def __init__(self, hidden=64):
+        super().__init__()
+        self.pi = nn.Sequential(nn.Linear(4, hidden), nn.Tanh(), nn.Linear(hidden, hidden), nn.Tanh(),
+                                nn.Linear(hidden, 2))
+        self.vf = nn.Sequential(nn.Linear(4, hidden), nn.Tanh(), nn.Linear(hidden, hidden), nn.Tanh(),
+                                nn.Linear(hidden, 1))
+
+    def forward(self, obs):
+        return self.pi(obs), self.vf(obs).squeeze(-1)
+
+
+def sampler(conn, seed, num_envs, fragment, env_step_ms):
+    torch.set_num_threads(1)
+    env = VecCartPole(num_envs, seed)
+    model = ActorCritic()
+    while True:
+        weights = conn.recv()
+        if weights is None:
+            return
+        model.load_state_dict(weights)
+        obs_buf, act_buf, logp_buf, rew_buf, done_buf, finished = [], [], [], [], [], []
+        with torch.no_grad():
+            for _ in range(fragment):
+                obs = torch.as_tensor(env.state, dtype=torch.float32)
+                dist = torch.distributions.Categorical(logits=model(obs)[0])
+                action = dist.sample()
+                reward, done, ended = env.step(action.numpy())
+                time.sleep(env_step_ms / 1e3)
+                obs_buf.append(obs)
+                act_buf.append(action)
+                logp_buf.append(dist.log_prob(action))
+                rew_buf.append(torch.as_tensor(reward))
+                done_buf.append(torch.as_tensor(done, dtype=torch.float32))
+                finished.extend(ended)
+        conn.send((torch.stack(obs_buf), torch.stack(act_buf), torch.stack(logp_buf), torch.stack(rew_buf),
+                   torch.stack(done_buf), torch.as_tensor(env.state, dtype=torch.float32), finished))
+
+
+def ppo_update(model, optimizer, fragments, args):
+    obs, actions, logp_old, adv, targets = [], [], [], [], []
+    with torch.no_grad():
+        for o, a, lp, r, d, last_obs, _ in fragments:
+            values = model(o)[1]
+            next_value = model(last_obs)[1]
+            gae, advantages = torch.zeros_like(next_value), torch.zeros_like(r)
+            for t in reversed(range(r.shape[0])):
+                v_next = next_value if t == r.shape[0] - 1 else values[t + 1]
+                delta = r[t] + args.gamma * v_next * (1 - d[t]) - values[t]
+                gae = delta + args.gamma * 0.95 * (1 - d[t]) * gae
+                advantages[t] = gae
+            obs.append(o.reshape(-1, 4))
+            actions.append(a.reshape(-1))
+            logp_old.append(lp.reshape(-1))
+            adv.append(advantages.reshape(-1))
+            targets.append((advantages + values).reshape(-1))
+    obs, actions, logp_old, adv, targets = map(torch.cat, (obs, actions, logp_old, adv, targets))
+    adv = (adv - adv.mean()) / (adv.std() + 1e-8)
+    for _ in range(args.num_sgd_iter):
+        for idx in torch.randperm(obs.shape[0]).split(args.minibatch):
+            logits, values = model(obs[idx])
+            dist = torch.distributions.Categorical(logits=logits)
+            ratio = torch.exp(dist.log_prob(actions[idx]) - logp_old[idx])
+            surrogate = torch.min(ratio * adv[idx], torch.clamp(ratio, 0.8, 1.2) * adv[idx])
+            loss = -surrogate.mean() + 0.5 * (values - targets[idx]).pow(2).mean() - 0.01 * dist.entropy().mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+
+def train(args, overlap):
+    torch.manual_seed(args.seed)
+    model = ActorCritic()
+    optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
+    pipes, procs = [], []
+    for i in range(args.workers):
+        parent, child = mp.Pipe()
+        proc = mp.Process(target=sampler, args=(child, args.seed + i, args.num_envs, args.fragment, args.env_step_ms),
+                          daemon=True)
+        proc.start()
+        pipes.append(parent)
+        procs.append(proc)
+
+    def weights():
+        return {k: v.clone() for k, v in model.state_dict().items()}
+
+    start = time.perf_counter()
+    curve, episodes, steps = [], [], 0
+    for conn in pipes:
+        conn.send(weights())
+    while time.perf_counter() - start < args.seconds:
+        fragments = [conn.recv() for conn in pipes]
+        if overlap:  # samplers go on with the pre-update weights while the learner trains
+            current = weights()
+            for conn in pipes:
+                conn.send(current)
+        ppo_update(model, optimizer, fragments, args)
+        if not overlap:
+            current = weights()
+            for conn in pipes:
+                conn.send(current)
+        steps += sum(f[1].numel() for f in fragments)
+        for f in fragments:
+            episodes.extend(f[-1])
+        curve.append((time.perf_counter() - start, steps, np.mean(episodes[-50:]) if episodes else 0.0))
+
+    for conn in pipes:
+        conn.recv()  # drain the request in flight
+        conn.send(None)
+    for proc in procs:
+        proc.join()
+    return curve
+
+
+def at(curve, seconds):
+    passed = [point for point in curve if point[0] <= seconds]
+    return passed[-1] if passed else (seconds, 0, 0.0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--num_envs", type=int, default=16)
+    parser.add_argument("--fragment", type=int, default=64)
+    parser.add_argument("--env_step_ms", type=float, default=4.0)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--num_sgd_iter", type=int, default=4)
+    parser.add_argument("--minibatch", type=int, default=256)
+    parser.add_argument("--lr", type=float, default=3e-4)
+    parser.add_argument("--gamma", type=float, default=0.99)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    curves = {name: train(args, overlap) for name, overlap in [("sync", False), ("overlap", True)]}
+
+    print("{:<10}{:>14}{:>14}".format("mode", "iterations", "env steps/s"))
+    for name, curve in curves.items():
+        print("{:<10}{:>14}{:>14.0f}".format(name, len(curve), curve[-1][1] / curve[-1][0]))
+    print()
+    print("{:>8}{:>26}{:>26}".format("wall s", "sync steps / return", "overlap steps / return"))
+    for seconds in np.linspace(args.seconds / 6, args.seconds, 6):
+        row = [seconds]
+        for name in ("sync", "overlap"):
+            _, steps, ret = at(curves[name], seconds)
+            row += [steps, ret]
+        print("{:>8.0f}{:>16}{:>10.1f}{:>16}{:>10.1f}".format(*row))
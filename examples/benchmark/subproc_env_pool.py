@@ -0,0 +1,115 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+steps/s of K envs stepped one after another in the worker process against the subprocess env pool,
+with an optional fixed policy latency to show simulation overlapping with inference
+
+usage: python examples/benchmark/subproc_env_pool.py --scenarios smac:3m football:academy_3_vs_1_with_keeper \
+    --num_envs 1 4 8 --steps 200 --policy_ms 2
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import yaml
+
+from marllib.envs import base_env
+from marllib.envs.base_env import ENV_REGISTRY
+from marllib.envs.subproc_env import SubprocEnvPool
+
+
+def load_env_args(env, map_name):
+    with open(os.path.join(os.path.dirname(base_env.__file__), "config", "{}.yaml".format(env))) as f:
+        env_args = yaml.load(f, Loader=yaml.FullLoader)["env_args"]
+    env_args["map_name"] = map_name
+    return env_args
+
+
+def sample_actions(agent_obs, action_space):
+    actions = {}
+    for agent, obs in agent_obs.items():
+        if "action_mask" in obs:  # only pick available actions
+            actions[agent] = int(np.random.choice(np.flatnonzero(obs["action_mask"])))
+        else:
+            actions[agent] = action_space.sample()
+    return actions
+
+
+def bench_serial(env, env_args, num_envs, steps, policy_ms):
+    envs = [ENV_REGISTRY[env](dict(env_args)) for _ in range(num_envs)]
+    action_space = envs[0].action_space
+    obs = [e.reset() for e in envs]
+    start = time.perf_counter()
+    for _ in range(steps):
+        time.sleep(policy_ms / 1e3)  # one batched forward for all envs
+        for m, e in enumerate(envs):
+            obs[m], _, dones, _ = e.step(sample_actions(obs[m], action_space))
+            if dones["__all__"]:
+                obs[m] = e.reset()
+    elapsed = time.perf_counter() - start
+    for e in envs:
+        e.close()
+    return num_envs * steps / elapsed
+
+
+def bench_pool(env, env_args, num_envs, steps, policy_ms):
+    single = ENV_REGISTRY[env](dict(env_args))
+    agents, observation_space, action_space = single.agents, single.observation_space, single.action_space
+    single.close()
+    pool = SubprocEnvPool(env, env_args, num_envs, agents, observation_space, action_space)
+
+    obs = {}
+    while len(obs) < num_envs:  # initial resets
+        obs.update(pool.poll()[0])
+    env_steps = 0
+    start = time.perf_counter()
+    while env_steps < num_envs * steps:
+        time.sleep(policy_ms / 1e3)  # forward for the envs that are ready
+        pool.send_actions({m: sample_actions(agent_obs, action_space) for m, agent_obs in obs.items()})
+        obs, _, dones, _, _ = pool.poll()
+        env_steps += len(obs)
+        for m in [m for m in obs if dones[m]["__all__"]]:
+            obs[m] = pool.try_reset(m)
+    elapsed = time.perf_counter() - start
+    pool.stop()
+    return env_steps / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", type=str, nargs="+", default=["smac:3m", "football:academy_3_vs_1_with_keeper"])
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--policy_ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print("{:<40}{:>5}{:>20}{:>20}".format("scenario", "K", "serial (steps/s)", "pool (steps/s)"))
+    for scenario in args.scenarios:
+        env, map_name = scenario.split(":")
+        env_args = load_env_args(env, map_name)
+        for num_envs in args.num_envs:
+            serial = bench_serial(env, env_args, num_envs, args.steps, args.policy_ms)
+            pooled = bench_pool(env, env_args, num_envs, args.steps, args.policy_ms)
+            print("{:<40}{:>5}{:>20.1f}{:>20.1f}".format(scenario, num_envs, serial, pooled))
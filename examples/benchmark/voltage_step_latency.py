@@ -0,0 +1,109 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+step latency benchmark of the voltage control environment on the 33/141/322-bus networks,
+together with the cost of the transactional rollback snapshot compared with deep copying the power grid
+
+usage: python examples/benchmark/voltage_step_latency.py --data_root marllib/patch/dpn/var_voltage_control/data
+"""
+
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+
+from marllib.patch.dpn.var_voltage_control.voltage_control_env import VoltageControl
+
+NETWORKS = {
+    "case33_3min_final": 0.8,
+    "case141_3min_final": 0.6,
+    "case322_3min_final": 0.8,
+}
+
+
+def make_env(data_root, net_topology):
+    env_args = {
+        "data_path": os.path.join(data_root, net_topology),
+        "voltage_barrier_type": "l1",
+        "voltage_weight": 1.0,
+        "q_weight": 0.1,
+        "line_weight": None,
+        "dq_dv_weight": None,
+        "history": 1,
+        "pv_scale": 1.0,
+        "demand_scale": 1.0,
+        "state_space": ["pv", "demand", "reactive", "vm_pu", "va_degree"],
+        "v_upper": 1.05,
+        "v_lower": 0.95,
+        "episode_limit": 240,
+        "action_scale": NETWORKS[net_topology],
+        "action_bias": 0.0,
+        "mode": "distributed",
+        "reset_action": True,
+        "seed": 0,
+    }
+    return VoltageControl(env_args)
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def benchmark(env, steps):
+    env.reset()
+    step_times = []
+    for _ in range(steps):
+        action = env.get_action()
+        start = time.perf_counter()
+        _, done, _ = env.step(action)
+        step_times.append(time.perf_counter() - start)
+        env.get_obs()
+        if done:
+            env.reset()
+    step_times = np.array(step_times) * 1e3
+    return {
+        "step_mean_ms": step_times.mean(),
+        "step_p95_ms": np.percentile(step_times, 95),
+        "snapshot_ms": time_per_call(env._snapshot_powergrid, 100),
+        "deepcopy_ms": time_per_call(lambda: copy.deepcopy(env.powergrid), 20),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_root", type=str, default="marllib/patch/dpn/var_voltage_control/data")
+    parser.add_argument("--steps", type=int, default=480)
+    parser.add_argument("--networks", nargs="+", default=list(NETWORKS.keys()))
+    args = parser.parse_args()
+
+    print("{:<20} {:>14} {:>13} {:>13} {:>13}".format(
+        "network", "step mean(ms)", "step p95(ms)", "snapshot(ms)", "deepcopy(ms)"))
+    for net_topology in args.networks:
+        result = benchmark(make_env(args.data_root, net_topology), args.steps)
+        print("{:<20} {:>14.3f} {:>13.3f} {:>13.4f} {:>13.3f}".format(
+            net_topology, result["step_mean_ms"], result["step_p95_ms"], result["snapshot_ms"], result["deepcopy_ms"]))
@@ -1,8 +1,6 @@
 from __future__ import annotations
 
 import argparse
-import importlib
-import inspect
 import json
 import logging
 import os
@@ -14,6 +12,7 @@ from ray.rllib.agents.trainer import Trainer
 from ray.rllib.models import ModelCatalog
 
 from marllib import marl
+from marllib.marl.algos.registry import ALGO_SPECS, TRAINER_REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -70,28 +69,14 @@ def find_key(dictionary: dict, target_key: str):
 
 
 def form_algo_dict() -> dict[str, tuple[str, Trainer]]:
-    trainers_dict = {}
-
-    core_path = os.path.join(os.path.dirname(marl.__file__), "algos/core")
-    for algo_type in os.listdir(core_path):
-        if not os.path.isdir(os.path.join(core_path, algo_type)):
-            continue
-        for algo in os.listdir(os.path.join(core_path, algo_type)):
-            if algo.endswith(".py") and not algo.startswith("__"):
-                module_name = algo[:-3]  # remove .py extension
-                module_path = f"marllib.marl.algos.core.{algo_type}.{module_name}"
-                module = importlib.import_module(module_path)
-
-                trainer_class_name = module_name.upper() + "Trainer"
-                trainer_class = getattr(module, trainer_class_name, None)
-                if trainer_class is None:
-                    for name, obj in inspect.getmembers(module):
-                        if name.endswith("Trainer"):
-                            trainers_dict[module_name] = obj
-                else:
-                    trainers_dict[module_name] = (algo_type, trainer_class)
-
-    return trainers_dict
+    """algorithm name -> (learning style, trainer class), only importing the trainers actually looked up"""
+    return _LazyAlgoDict()
+
+
+class _LazyAlgoDict(dict):
+    def __missing__(self, algo_name):
+        self[algo_name] = (ALGO_SPECS[algo_name].algo_type, TRAINER_REGISTRY[algo_name])
+        return self[algo_name]
 
 
 def update_config(config: dict):
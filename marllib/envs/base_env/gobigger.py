@@ -72,11 +72,21 @@ class RLlibGoBigger(MultiAgentEnv):
         self.obs_dim = self.rectangle_dim + self.food_dim + self.thorns_dim + \
                        self.clone_dim + self.team_name_dim + self.score_dim
 
+        # (overlap key, fields per item, offset, capacity in items) of each fixed-size block in the obs vector
+        food_offset = self.rectangle_dim
+        thorns_offset = food_offset + self.food_dim
+        clone_offset = thorns_offset + self.thorns_dim
+        self.overlap_layout = [
+            ("food", 4, food_offset, self.food_dim // 4),
+            ("thorns", 6, thorns_offset, self.thorns_dim // 6),
+            ("clone", 10, clone_offset, self.clone_dim // 10),
+        ]
+
         self.observation_space = GymDict({"obs": Box(
             low=-1e6,
             high=1e6,
             shape=(self.obs_dim,),
-            dtype=float)})
+            dtype=np.float32)})
 
         self.agents = []
         for team_index in range(self.num_teams):
@@ -88,48 +98,7 @@ class RLlibGoBigger(MultiAgentEnv):
 
     def reset(self):
         original_obs = self.env.reset()
-        obs = {}
-        for agent_index, agent_name in enumerate(self.agents):
-
-            rectangle = list(original_obs[1][agent_index]["rectangle"])
-
-            overlap_dict = original_obs[1][agent_index]["overlap"]
-
-            food = overlap_dict["food"]
-            if 4 * len(food) > self.food_dim:
-                food = food[:self.food_dim // 4]
-            else:
-                padding = [0] * (self.food_dim - 4 * len(food))
-                food.append(padding)
-            food = [item for sublist in food for item in sublist]
-
-            thorns = overlap_dict["thorns"]
-            if 6 * len(thorns) > self.thorns_dim:
-                thorns = thorns[:self.thorns_dim // 6]
-            else:
-                padding = [0] * (self.thorns_dim - 6 * len(thorns))
-                thorns.append(padding)
-            thorns = [item for sublist in thorns for item in sublist]
-
-            clone = overlap_dict["clone"]
-            if 10 * len(clone) > self.clone_dim:
-                clone = clone[:self.clone_dim // 10]
-            else:
-                padding = [0] * (self.clone_dim - 10 * len(clone))
-                clone.append(padding)
-            clone = [item for sublist in clone for item in sublist]
-
-            team = original_obs[1][agent_index]["team_name"]
-            score = original_obs[1][agent_index]["score"]
-
-            all_elements = rectangle + food + thorns + clone + [team] + [score]
-            all_elements = np.array(all_elements, dtype=float)
-
-            obs[agent_name] = {
-                "obs": all_elements
-            }
-
-        return obs
+        return self.encode_obs(original_obs[1])
 
     def step(self, action_dict):
         actions = {}
@@ -139,54 +108,49 @@ class RLlibGoBigger(MultiAgentEnv):
 
         original_obs, team_rewards, done, info = self.env.step(actions)
 
+        obs = self.encode_obs(original_obs[1])
         rewards = {}
-        obs = {}
-        infos = {}
-
         for agent_index, agent_name in enumerate(self.agents):
-
-            rectangle = list(original_obs[1][agent_index]["rectangle"])
-
-            overlap_dict = original_obs[1][agent_index]["overlap"]
-
-            food = overlap_dict["food"]
-            if 4 * len(food) > self.food_dim:
-                food = food[:self.food_dim // 4]
-            else:
-                padding = [0] * (self.food_dim - 4 * len(food))
-                food.append(padding)
-            food = [item for sublist in food for item in sublist]
-
-            thorns = overlap_dict["thorns"]
-            if 6 * len(thorns) > self.thorns_dim:
-                thorns = thorns[:self.thorns_dim // 6]
-            else:
-                padding = [0] * (self.thorns_dim - 6 * len(thorns))
-                thorns.append(padding)
-            thorns = [item for sublist in thorns for item in sublist]
-
-            clone = overlap_dict["clone"]
-            if 10 * len(clone) > self.clone_dim:
-                clone = clone[:self.clone_dim // 10]
-            else:
-                padding = [0] * (self.clone_dim - 10 * len(clone))
-                clone.append(padding)
-            clone = [item for sublist in clone for item in sublist]
-
-            team = original_obs[1][agent_index]["team_name"]
-            score = original_obs[1][agent_index]["score"]
-
-            all_elements = rectangle + food + thorns + clone + [team] + [score]
-            all_elements = np.array(all_elements, dtype=float)
-
-            obs[agent_name] = {
-                "obs": all_elements
-            }
-
-            rewards[agent_name] = team_rewards[team]
+            rewards[agent_name] = team_rewards[original_obs[1][agent_index]["team_name"]]
 
         dones = {"__all__": done}
-        return obs, rewards, dones, infos
+        return obs, rewards, dones, {}
+
+    def encode_obs(self, player_obs):
+        """
+        encode every agent's observation into one float32 [n_agents, obs_dim] block:
+        rectangle | nearest food | nearest thorns | nearest clones | team name | score,
+        overlap items are sorted by distance to the center of the agent's view and zero padded
+        """
+        # a new block every step, rllib keeps references to the returned rows
+        buffer = np.zeros((self.num_agents, self.obs_dim), dtype=np.float32)
+        obs = {}
+        for agent_index, agent_name in enumerate(self.agents):
+            row = buffer[agent_index]
+            rectangle = player_obs[agent_index]["rectangle"]
+            row[:self.rectangle_dim] = rectangle
+            center_x = (rectangle[0] + rectangle[2]) / 2
+            center_y = (rectangle[1] + rectangle[3]) / 2
+
+            overlap_dict = player_obs[agent_index]["overlap"]
+            for key, width, offset, capacity in self.overlap_layout:
+                items = overlap_dict[key]
+                if len(items) == 0:
+                    continue
+                items = np.asarray(items, dtype=np.float32)[:, :width]
+                distance = (items[:, 0] - center_x) ** 2 + (items[:, 1] - center_y) ** 2
+                if len(items) > capacity:
+                    nearest = np.argpartition(distance, capacity - 1)[:capacity]
+                    items = items[nearest[np.argsort(distance[nearest], kind="stable")]]
+                else:
+                    items = items[np.argsort(distance, kind="stable")]
+                row[offset:offset + items.size] = items.ravel()
+
+            row[-2] = player_obs[agent_index]["team_name"]
+            row[-1] = player_obs[agent_index]["score"]
+            obs[agent_name] = {"obs": row}
+
+        return obs
 
     def get_env_info(self):
         env_info = {
@@ -35,6 +35,15 @@ REGISTRY["combined_arms"] = combined_arms_v5.env
 REGISTRY["gather"] = gather_v3.env
 REGISTRY["tiger_deer"] = tiger_deer_v3.env
 
+# parallel api of the same scenarios, used by the vectorized env
+PARALLEL_REGISTRY = {}
+PARALLEL_REGISTRY["adversarial_pursuit"] = adversarial_pursuit_v3.parallel_env
+PARALLEL_REGISTRY["battle"] = battle_v3.parallel_env
+PARALLEL_REGISTRY["battlefield"] = battlefield_v3.parallel_env
+PARALLEL_REGISTRY["combined_arms"] = combined_arms_v5.parallel_env
+PARALLEL_REGISTRY["gather"] = gather_v3.parallel_env
+PARALLEL_REGISTRY["tiger_deer"] = tiger_deer_v3.parallel_env
+
 mini_channel_dim_dict = {
     "adversarial_pursuit": 4,
     "battle": 4,
@@ -24,8 +24,6 @@ from ray.rllib.env.multi_agent_env import MultiAgentEnv
 from gym.spaces import Dict as GymDict, Discrete, Box
 from metadrive.envs.marl_envs import MultiAgentBottleneckEnv, MultiAgentParkingLotEnv, MultiAgentRoundaboutEnv, \
     MultiAgentIntersectionEnv, MultiAgentTollgateEnv
-from collections import defaultdict
-from metadrive.utils import norm
 import numpy as np
 
 SUPER_REGISTRY = {}
@@ -56,11 +54,11 @@ def dynamic_inheritance(super_class):
             self.__name__ = map
             self.__qualname__ = map
             self.neighbours_distance = NE_distance
-            self.distance_map = defaultdict(lambda: defaultdict(lambda: float("inf")))
+            self.vehicle_ids, self.distance_map = [], np.zeros((0, 0))
 
         def step(self, actions):
             obs, reward, done, info = super(super_class, self).step(actions)
-            update_neighbours_map(self.distance_map, self.vehicles, reward, info, self.config)
+            self.vehicle_ids, self.distance_map = update_neighbours_map(self.vehicles, reward, info, self.config)
             return obs, reward, done, info
 
     return RLlibMetaDrive_Scenario
@@ -126,44 +124,41 @@ class RLlibMetaDrive(MultiAgentEnv):
         return env_info
 
 
-def update_neighbours_map(distance_map, vehicles, reward, info, config):
-    distance_map.clear()
+def update_neighbours_map(vehicles, reward, info, config):
+    """
+    fill the neighbours / neighbours_distance / nei_rewards / global_rewards entries of info,
+    neighbours are the other vehicles closer than config["neighbours_distance"], nearest first
+
+    Returns:
+        (list, np.ndarray): vehicle ids & their [N, N] pairwise distance matrix (inf on the diagonal)
+    """
     keys = list(vehicles.keys())
-    for c1 in range(0, len(keys) - 1):
-        for c2 in range(c1 + 1, len(keys)):
-            k1 = keys[c1]
-            k2 = keys[c2]
-            p1 = vehicles[k1].position
-            p2 = vehicles[k2].position
-            distance = norm(p1[0] - p2[0], p1[1] - p2[1])
-            distance_map[k1][k2] = distance
-            distance_map[k2][k1] = distance
+    index = {k: i for i, k in enumerate(keys)}
+    position = np.array([vehicles[k].position[:2] for k in keys], dtype=np.float64).reshape(-1, 2)
+    delta = position[:, None, :] - position[None, :, :]
+    distance_map = np.sqrt(delta[..., 0] ** 2 + delta[..., 1] ** 2)
+    np.fill_diagonal(distance_map, np.inf)
+
+    # stable sort keeps the vehicle order among equal distances
+    order = np.argsort(distance_map, axis=1, kind="stable")
+    sorted_distance = np.take_along_axis(distance_map, order, axis=1)
+    in_range = sorted_distance < config["neighbours_distance"]
+    count = in_range.sum(axis=1)
+
+    vehicle_reward = np.array([reward.get(k, 0.0) for k in keys], dtype=np.float64)
+    nei_reward_sum = np.where(in_range, vehicle_reward[order], 0.0).sum(axis=1)
+    global_rewards = sum(reward.values()) / len(reward.values())
 
     for kkk in info.keys():
-        neighbours, nei_distances = find_in_range(kkk, config["neighbours_distance"], distance_map)
-        info[kkk]["neighbours"] = neighbours
-        info[kkk]["neighbours_distance"] = nei_distances
-        nei_rewards = [reward[kkkkk] for kkkkk in neighbours]
-        if nei_rewards:
-            info[kkk]["nei_rewards"] = sum(nei_rewards) / len(nei_rewards)
-        else:
-            # i[kkk]["nei_rewards"] = r[kkk]
+        i = index.get(kkk)
+        if i is None or count[i] == 0:
+            info[kkk]["neighbours"] = []
+            info[kkk]["neighbours_distance"] = []
             info[kkk]["nei_rewards"] = 0.0  # Do not provides neighbour rewards
-        info[kkk]["global_rewards"] = sum(reward.values()) / len(reward.values())
-
-
-def find_in_range(v_id, distance, distance_map):
-    if distance <= 0:
-        return []
-    max_distance = distance
-    dist_to_others = distance_map[v_id]
-    dist_to_others_list = sorted(dist_to_others, key=lambda k: dist_to_others[k])
-    ret = [
-        dist_to_others_list[i] for i in range(len(dist_to_others_list))
-        if dist_to_others[dist_to_others_list[i]] < max_distance
-    ]
-    ret2 = [
-        dist_to_others[dist_to_others_list[i]] for i in range(len(dist_to_others_list))
-        if dist_to_others[dist_to_others_list[i]] < max_distance
-    ]
-    return ret, ret2
+        else:
+            info[kkk]["neighbours"] = [keys[j] for j in order[i, :count[i]]]
+            info[kkk]["neighbours_distance"] = sorted_distance[i, :count[i]].tolist()
+            info[kkk]["nei_rewards"] = float(nei_reward_sum[i] / count[i])
+        info[kkk]["global_rewards"] = global_rewards
+
+    return keys, distance_map
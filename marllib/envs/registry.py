@@ -0,0 +1,96 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+name -> environment class registry that resolves ``module:Class`` entries on first lookup,
+so importing marllib (and every ray rollout worker unpickling it) only pays for the env it uses
+"""
+
+from collections.abc import MutableMapping
+import importlib
+
+
+class LazyEnvRegistry(MutableMapping):
+    """Dict-like env registry whose values are imported lazily.
+
+    Entries are registered either as ``"package.module:ClassName"`` strings, which are imported the
+    first time the name is looked up, or directly as classes (e.g. ``ENV_REGISTRY["my_env"] = MyEnv``).
+    Like the eager registry it replaces, looking up an env whose import fails returns the error
+    message as a ``str`` instead of raising. The result of every import attempt is cached.
+    """
+
+    def __init__(self, entries=None):
+        self._targets = {}
+        self._resolved = {}
+        for name, target in (entries or {}).items():
+            self[name] = target
+
+    def __getitem__(self, name):
+        if name not in self._resolved:
+            target = self._targets[name]
+            module_name, _, attr = target.partition(":")
+            try:
+                self._resolved[name] = getattr(importlib.import_module(module_name), attr)
+            except Exception as e:
+                self._resolved[name] = str(e)
+        return self._resolved[name]
+
+    def __setitem__(self, name, target):
+        if isinstance(target, str):
+            if ":" not in target:
+                raise ValueError("lazy env entry \"{}\" must be of the form \"module:Class\", got \"{}\"".format(
+                    name, target))
+            self._targets[name] = target
+            self._resolved.pop(name, None)
+        else:
+            self._targets[name] = "{}:{}".format(target.__module__, target.__qualname__)
+            self._resolved[name] = target
+
+    def __delitem__(self, name):
+        del self._targets[name]
+        self._resolved.pop(name, None)
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self):
+        return len(self._targets)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self._targets)
+
+    def is_loaded(self, name):
+        """Whether `name` has already been resolved (successfully or not), without importing anything."""
+        return name in self._resolved
+
+    def is_available(self, name):
+        """Import `name` once and report whether it is usable; later calls hit the cache."""
+        return name in self._targets and not isinstance(self[name], str)
+
+    def error(self, name):
+        """The cached import error of `name`, or None if it is available or has not been resolved yet."""
+        resolved = self._resolved.get(name)
+        return resolved if isinstance(resolved, str) else None
+
+    def target(self, name):
+        """The ``module:Class`` location of `name`."""
+        return self._targets[name]
@@ -0,0 +1,303 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+subprocess env pool: K copies of a registered MARLlib env, each in its own process, stepped
+asynchronously through the RLlib BaseEnv interface so that slow simulators (SMAC, football,
+metadrive, aircombat, voltage control...) run while the rollout worker computes actions
+
+observations, rewards, dones and actions travel through shared memory,
+the pipes only carry commands and info dicts
+"""
+
+from ray.rllib.env.base_env import BaseEnv
+from gym.spaces import Box, Discrete, MultiDiscrete
+from multiprocessing.connection import wait
+import multiprocessing as mp
+import traceback
+import numpy as np
+
+
+def _buffer_layout(num_envs, num_agents, observation_space, action_space):
+    """name -> (shape, dtype) of every shared array"""
+    layout = {}
+    for key, space in observation_space.spaces.items():
+        layout["obs/" + key] = ((num_envs, num_agents) + space.shape, np.dtype(space.dtype))
+    if isinstance(action_space, Discrete):
+        layout["action"] = ((num_envs, num_agents), np.dtype(np.int64))
+    elif isinstance(action_space, MultiDiscrete):
+        layout["action"] = ((num_envs, num_agents) + action_space.shape, np.dtype(np.int64))
+    elif isinstance(action_space, Box):
+        layout["action"] = ((num_envs, num_agents) + action_space.shape, np.dtype(action_space.dtype))
+    else:
+        raise NotImplementedError("action space {} not supported by the subprocess env pool".format(action_space))
+    layout["acted"] = ((num_envs, num_agents), np.dtype(bool))
+    layout["alive"] = ((num_envs, num_agents), np.dtype(bool))
+    layout["reward"] = ((num_envs, num_agents), np.dtype(np.float64))
+    layout["done"] = ((num_envs, num_agents), np.dtype(bool))
+    layout["all_done"] = ((num_envs,), np.dtype(bool))
+    return layout
+
+
+def _as_arrays(raw_buffers, layout):
+    return {name: np.frombuffer(raw_buffers[name], dtype=dtype).reshape(shape)
+            for name, (shape, dtype) in layout.items()}
+
+
+_MISSING = object()
+
+
+def _env_worker(conn, index, env_class, env_config, agents, raw_buffers, layout, discrete):
+    arrays = _as_arrays(raw_buffers, layout)
+    obs_keys = [name[4:] for name in layout if name.startswith("obs/")]
+    agent_index = {agent: i for i, agent in enumerate(agents)}
+
+    def write_obs(obs):
+        arrays["alive"][index] = False
+        for agent, agent_obs in obs.items():
+            i = agent_index[agent]
+            for key in obs_keys:
+                arrays["obs/" + key][index, i] = agent_obs[key]
+            arrays["alive"][index, i] = True
+
+    try:
+        env = env_class(dict(env_config))
+        while True:
+            cmd = conn.recv()
+            if isinstance(cmd, tuple):  # ("getattr", name) / ("call", name, args, kwargs) from a _SubprocEnvHandle
+                try:
+                    if cmd[0] == "getattr":
+                        value = getattr(env, cmd[1], _MISSING)
+                        if value is _MISSING:
+                            reply = ("missing", None)
+                        else:
+                            reply = ("callable", None) if callable(value) else ("value", value)
+                    else:
+                        reply = getattr(env, cmd[1])(*cmd[2], **cmd[3])
+                    conn.send(("ok", reply))
+                except Exception:
+                    conn.send(("error", traceback.format_exc()))
+            elif cmd == "reset":
+                write_obs(env.reset())
+                arrays["all_done"][index] = False
+                conn.send(("ok", {}))
+            elif cmd == "step":
+                actions = arrays["action"][index]
+                action_dict = {
+                    agent: int(actions[i]) if discrete else actions[i].copy()
+                    for i, agent in enumerate(agents) if arrays["acted"][index, i]}
+                obs, rewards, dones, infos = env.step(action_dict)
+                write_obs(obs)
+                arrays["reward"][index] = 0.0
+                arrays["done"][index] = False
+                for agent, reward in rewards.items():
+                    arrays["reward"][index, agent_index[agent]] = reward
+                for agent, done in dones.items():
+                    if agent != "__all__":
+                        arrays["done"][index, agent_index[agent]] = done
+                arrays["all_done"][index] = dones["__all__"]
+                conn.send(("ok", infos))
+            elif cmd == "close":
+                env.close()
+                conn.close()
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+
+
+class _SubprocEnvHandle:
+    """Stands in for one env of a SubprocEnvPool in `get_unwrapped` / `foreach_env`:
+    attribute reads and method calls are forwarded to the env in its subprocess."""
+
+    def __init__(self, pool, index):
+        self._pool = pool
+        self._index = index
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        kind, value = self._pool._call(self._index, ("getattr", name))
+        if kind == "missing":
+            raise AttributeError("{} has no attribute {!r}".format(self, name))
+        if kind == "callable":
+            return lambda *args, **kwargs: self._pool._call(self._index, ("call", name, args, kwargs))
+        return value
+
+    def __repr__(self):
+        return "_SubprocEnvHandle({})".format(self._index)
+
+
+class SubprocEnvPool(BaseEnv):
+    """K copies of a MARLlib env stepped in parallel subprocesses.
+
+    `send_actions` only hands the actions over and returns, `poll` blocks until at least one env has
+    finished its step and returns every env that is ready by then, so the policy can compute actions
+    for those while the other simulators are still stepping.
+    """
+
+    def __init__(self, env_name, env_config, num_envs, agents, observation_space, action_space,
+                 force_coop=False, poll_timeout=0.0, context=None):
+        """
+        Args:
+            :param env_name: name of the env in ENV_REGISTRY / COOP_ENV_REGISTRY
+            :param env_config: env_args passed to every copy
+            :param num_envs: number of subprocesses K
+            :param agents: agent ids of the env
+            :param observation_space: per agent GymDict observation space
+            :param action_space: per agent action space
+            :param force_coop: take the env from COOP_ENV_REGISTRY
+            :param poll_timeout: after the first env is ready, seconds to wait for more envs in `poll`
+            :param context: multiprocessing start method, default "forkserver" where available else "spawn",
+                ray workers must not be forked (they hold locks and grpc threads)
+        """
+        from marllib.envs.base_env import ENV_REGISTRY
+        from marllib.envs.global_reward_env import COOP_ENV_REGISTRY
+
+        # resolved here so envs registered at runtime also reach the subprocesses
+        env_class = (COOP_ENV_REGISTRY if force_coop else ENV_REGISTRY)[env_name]
+        if isinstance(env_class, str):
+            raise ValueError("env \"{}\" could not be imported: {}".format(env_name, env_class))
+
+        if context is None:
+            context = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(context)
+
+        self.num_envs = num_envs
+        self.agents = list(agents)
+        self.observation_space = observation_space
+        self.action_space = action_space
+        self.poll_timeout = poll_timeout
+
+        self.layout = _buffer_layout(num_envs, len(self.agents), observation_space, action_space)
+        raw_buffers = {name: ctx.RawArray("b", max(int(np.prod(shape)) * dtype.itemsize, 1))
+                       for name, (shape, dtype) in self.layout.items()}
+        self.arrays = _as_arrays(raw_buffers, self.layout)
+        self.obs_keys = list(observation_space.spaces.keys())
+        self.agent_index = {agent: i for i, agent in enumerate(self.agents)}
+
+        self.conns, self.processes = [], []
+        for index in range(num_envs):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_env_worker,
+                args=(child_conn, index, env_class, env_config, self.agents, raw_buffers, self.layout,
+                      isinstance(action_space, Discrete)),
+                daemon=True)
+            process.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+
+        # every env starts with an asynchronous reset
+        self.running = set(range(num_envs))
+        self.resetting = set(range(num_envs))
+        self.finished = {}  # env -> infos of a step received early by a _SubprocEnvHandle call
+        for conn in self.conns:
+            conn.send("reset")
+
+    def _recv(self, m):
+        status, payload = self.conns[m].recv()
+        if status == "error":
+            raise RuntimeError("env subprocess {} failed:\n{}".format(m, payload))
+        return payload
+
+    def _agent_obs(self, m):
+        # copies, rllib keeps references to the observations
+        return {agent: {key: self.arrays["obs/" + key][m, i].copy() for key in self.obs_keys}
+                for agent, i in self.agent_index.items() if self.arrays["alive"][m, i]}
+
+    def _call(self, m, cmd):
+        if m in self.running and m not in self.finished:  # keep the pending step result for the next poll
+            self.finished[m] = self._recv(m)
+        self.conns[m].send(cmd)
+        return self._recv(m)
+
+    def poll(self):
+        if not self.running:  # no env is stepping, e.g. every agent of an env is dead but it is not done yet
+            return {}, {}, {}, {}, {}
+
+        pending = [self.conns[m] for m in self.running if m not in self.finished]
+        ready = set()
+        if pending:
+            ready = set(wait(pending, timeout=0 if self.finished else None))
+            if self.poll_timeout > 0:
+                ready |= set(wait(pending, timeout=self.poll_timeout))
+        ready_envs = sorted(m for m in self.running if m in self.finished or self.conns[m] in ready)
+
+        obs, rewards, dones, infos = {}, {}, {}, {}
+        for m in ready_envs:
+            env_infos = self.finished.pop(m) if m in self.finished else self._recv(m)
+            self.running.discard(m)
+            obs[m] = self._agent_obs(m)
+            if m in self.resetting:
+                self.resetting.discard(m)
+                rewards[m] = {agent: None for agent in obs[m]}
+                dones[m] = {agent: False for agent in obs[m]}
+                dones[m]["__all__"] = False
+            else:
+                rewards[m] = {agent: float(self.arrays["reward"][m, self.agent_index[agent]]) for agent in obs[m]}
+                dones[m] = {agent: bool(self.arrays["done"][m, self.agent_index[agent]]) for agent in obs[m]}
+                dones[m]["__all__"] = bool(self.arrays["all_done"][m])
+            infos[m] = {agent: env_infos.get(agent, {}) for agent in obs[m]}
+        return obs, rewards, dones, infos, {}
+
+    def send_actions(self, action_dict):
+        for m, agent_actions in action_dict.items():
+            self.arrays["acted"][m] = False
+            for agent, action in agent_actions.items():
+                i = self.agent_index[agent]
+                self.arrays["action"][m, i] = action
+                self.arrays["acted"][m, i] = True
+            self.conns[m].send("step")
+            self.running.add(m)
+
+    def try_reset(self, env_id=None):
+        m = 0 if env_id is None else env_id
+        self.conns[m].send("reset")
+        self._recv(m)
+        return self._agent_obs(m)
+
+    def get_unwrapped(self):
+        return [_SubprocEnvHandle(self, m) for m in range(self.num_envs)]
+
+    def get_sub_environments(self):
+        return self.get_unwrapped()
+
+    def stop(self):
+        for m, conn in enumerate(self.conns):
+            if m in self.running and m not in self.finished:  # drain the pending step before closing
+                try:
+                    conn.recv()
+                except EOFError:
+                    pass
+            try:
+                conn.send("close")
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.running.clear()
+        self.finished.clear()
@@ -0,0 +1,197 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+vectorized adapter for the PettingZoo-backed env families (mpe / sisl / magent):
+M copies of a scenario stepped by one worker, with observations padded once into
+preallocated [M, n_agents, ...] buffers and exposed through the RLlib BaseEnv interface
+"""
+
+from ray.rllib.env.base_env import BaseEnv
+from marllib.envs.base_env import ENV_REGISTRY
+from marllib.envs.global_reward_env import COOP_ENV_REGISTRY
+import supersuit as ss
+import numpy as np
+import importlib
+
+# env -> (module holding the parallel env constructors, its registry name)
+PARALLEL_REGISTRIES = {
+    "mpe": ("marllib.envs.base_env.mpe", "REGISTRY"),
+    "sisl": ("marllib.envs.base_env.sisl", "REGISTRY"),
+    "magent": ("marllib.envs.base_env.magent", "PARALLEL_REGISTRY"),
+}
+
+
+class VectorPettingZooEnv(BaseEnv):
+    """Steps `num_envs` copies of a PettingZoo parallel env.
+
+    `vector_reset` / `vector_step` work on whole batches: actions are an [M, n_agents] array and
+    observations come back as {key: [M, n_agents, ...]} arrays (same keys as the single env wrapper,
+    e.g. "obs" and "state" for MAgent), together with [M, n_agents] rewards, agent dones and an
+    `alive` mask. These buffers are reused by the next call, copy them if they are kept.
+
+    `poll` / `send_actions` / `try_reset` expose the same envs through the RLlib BaseEnv
+    interface, handing out copies of the buffers so sample collectors can keep them.
+    """
+
+    def __init__(self, env_fn, num_envs, agents, observation_space, action_space, channel_split=None,
+                 global_reward=False):
+        """
+        Args:
+            :param env_fn: creates one action padded PettingZoo parallel env
+            :param num_envs: number of copies M
+            :param agents: agent ids, fixing the agent axis of every buffer
+            :param observation_space: per agent observation space (GymDict) of the single env wrapper
+            :param action_space: per agent action space
+            :param channel_split: for MAgent, number of trailing channels that form the "state" key
+            :param global_reward: give every agent the team reward divided by the number of agents (force_coop)
+        """
+        self.envs = [env_fn() for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.agents = list(agents)
+        self.num_agents = len(self.agents)
+        self.agent_index = {agent: i for i, agent in enumerate(self.agents)}
+        self.observation_space = observation_space
+        self.action_space = action_space
+        self.global_reward = global_reward
+
+        # agents are padded to the largest observation shape, zeros at the end of every axis
+        raw_shapes = [self.envs[0].observation_spaces[agent].shape for agent in self.agents]
+        full_shape = tuple(np.max(raw_shapes, axis=0))
+        dtype = observation_space.spaces["obs"].dtype
+        self.full_obs = np.zeros((num_envs, self.num_agents) + full_shape, dtype=dtype)
+        self.agent_slices = [tuple(slice(0, d) for d in shape) for shape in raw_shapes]
+        if channel_split:
+            self.obs = {"obs": self.full_obs[..., :-channel_split], "state": self.full_obs[..., -channel_split:]}
+        else:
+            self.obs = {"obs": self.full_obs}
+
+        self.rewards = np.zeros((num_envs, self.num_agents), dtype=np.float32)
+        self.dones = np.zeros((num_envs, self.num_agents), dtype=bool)
+        self.alive = np.zeros((num_envs, self.num_agents), dtype=bool)
+        self.all_dones = np.zeros(num_envs, dtype=bool)
+        self.infos = [{} for _ in range(num_envs)]
+
+        self.vector_reset()
+        self._pending = set(range(num_envs))  # envs whose results were not polled yet
+
+    @classmethod
+    def from_config(cls, env, env_config, num_envs, force_coop=False):
+        """
+        build M copies of `env` ("mpe", "sisl" or "magent") with the same env_config as the single env wrapper
+        """
+        registry = COOP_ENV_REGISTRY if force_coop else ENV_REGISTRY
+        single = registry[env](dict(env_config))
+        observation_space, action_space, agents = single.observation_space, single.action_space, single.agents
+        single.close()
+
+        module_name, registry_name = PARALLEL_REGISTRIES[env]
+        module = importlib.import_module(module_name)
+        scenario_args = {k: v for k, v in env_config.items() if k != "map_name"}
+        creator = getattr(module, registry_name)[env_config["map_name"]]
+        # same action padding as the single env wrapper, observations are padded into the buffers instead
+        env_fn = lambda: ss.pad_action_space_v0(creator(**scenario_args))
+        channel_split = module.mini_channel_dim_dict[env_config["map_name"]] if env == "magent" else None
+        return cls(env_fn, num_envs, agents, observation_space, action_space, channel_split, force_coop)
+
+    def _write(self, m, obs, rewards=None, dones=None):
+        self.alive[m] = False
+        for agent, o in obs.items():
+            i = self.agent_index[agent]
+            self.full_obs[m, i][self.agent_slices[i]] = o
+            self.alive[m, i] = True
+        if rewards is not None:
+            self.rewards[m] = 0.0
+            self.dones[m] = False
+            for agent, r in rewards.items():
+                self.rewards[m, self.agent_index[agent]] = r
+            if self.global_reward:
+                self.rewards[m] = self.rewards[m].sum() / self.num_agents
+            for agent, d in dones.items():
+                self.dones[m, self.agent_index[agent]] = d
+            self.all_dones[m] = all(dones.values())
+
+    def vector_reset_at(self, m):
+        self._write(m, self.envs[m].reset())
+        self.rewards[m] = 0.0
+        self.dones[m] = False
+        self.all_dones[m] = False
+        self.infos[m] = {}
+
+    def vector_reset(self):
+        for m in range(self.num_envs):
+            self.vector_reset_at(m)
+        return self.obs
+
+    def vector_step(self, actions):
+        """
+        Args:
+            :param actions: [M, n_agents] actions (rows of envs that are done are ignored)
+
+        Returns:
+            (dict, np.ndarray, np.ndarray, np.ndarray): obs {key: [M, n_agents, ...]}, rewards & dones
+            [M, n_agents], all agents done [M]
+        """
+        for m, env in enumerate(self.envs):
+            if self.all_dones[m]:
+                continue
+            action_dict = {agent: actions[m][self.agent_index[agent]] for agent in env.agents}
+            o, r, d, self.infos[m] = env.step(action_dict)
+            self._write(m, o, r, d)
+        return self.obs, self.rewards, self.dones, self.all_dones
+
+    def _agent_dicts(self, m, obs):
+        agents = [agent for agent, i in self.agent_index.items() if self.alive[m, i]]
+        return {agent: {key: value[m, self.agent_index[agent]] for key, value in obs.items()} for agent in agents}
+
+    def poll(self):
+        obs, rewards, dones, infos = {}, {}, {}, {}
+        snapshot = {key: value.copy() for key, value in self.obs.items()}
+        for m in sorted(self._pending):
+            obs[m] = self._agent_dicts(m, snapshot)
+            rewards[m] = {agent: float(self.rewards[m, self.agent_index[agent]]) for agent in obs[m]}
+            dones[m] = {agent: bool(self.dones[m, self.agent_index[agent]]) for agent in obs[m]}
+            dones[m]["__all__"] = bool(self.all_dones[m])
+            infos[m] = {agent: self.infos[m].get(agent, {}) for agent in obs[m]}
+        self._pending.clear()
+        return obs, rewards, dones, infos, {}
+
+    def send_actions(self, action_dict):
+        for m, agent_actions in action_dict.items():
+            o, r, d, self.infos[m] = self.envs[m].step(agent_actions)
+            self._write(m, o, r, d)
+            self._pending.add(m)
+
+    def try_reset(self, env_id=None):
+        m = 0 if env_id is None else env_id
+        self.vector_reset_at(m)
+        return self._agent_dicts(m, {key: value.copy() for key, value in self.obs.items()})
+
+    def get_unwrapped(self):
+        return self.envs
+
+    def get_sub_environments(self):
+        return self.envs
+
+    def stop(self):
+        for env in self.envs:
+            env.close()
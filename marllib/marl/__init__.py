@@ -21,23 +21,22 @@
 # SOFTWARE.
 
 from marllib.marl.common import dict_update, get_model_config, check_algo_type, \
-    recursive_dict_update
-from marllib.marl.algos import run_il, run_vd, run_cc
-from marllib.marl.algos.scripts import POlICY_REGISTRY
+    recursive_dict_update, load_config, load_yaml, parse_user_args, check_algo_args
+from marllib.marl.algos.registry import ALGO_SPECS, POlICY_REGISTRY
+from marllib.marl.models.registry import get_model_class
 from marllib.envs.base_env import ENV_REGISTRY
 from marllib.envs.global_reward_env import COOP_ENV_REGISTRY
-from marllib.marl.models import BaseRNN, BaseMLP, CentralizedCriticRNN, CentralizedCriticMLP, ValueDecompRNN, \
-    ValueDecompMLP, JointQMLP, JointQRNN, DDPGSeriesRNN, DDPGSeriesMLP
-from ray.rllib.env.multi_agent_env import MultiAgentEnv
-from ray.tune import register_env
 from copy import deepcopy
 from tabulate import tabulate
-from typing import Any, Dict, Tuple
-import yaml
+from typing import Any, Dict, Tuple, TYPE_CHECKING
 import os
 import sys
 
+if TYPE_CHECKING:  # ray is imported by the functions that need it, so marllib.marl.inference stays ray-free
+    from ray.rllib.env.multi_agent_env import MultiAgentEnv
+
 SYSPARAMs = deepcopy(sys.argv)
+USER_ARGs = parse_user_args(SYSPARAMs)
 
 
 def set_ray(config: Dict):
@@ -45,23 +44,9 @@ def set_ray(config: Dict):
     function of combining ray config with other configs
     :param config: dictionary of config to be combined with
     """
-    # default config
-    with open(os.path.join(os.path.dirname(__file__), "ray/ray.yaml"), "r") as f:
-        ray_config_dict = yaml.load(f, Loader=yaml.FullLoader)
-        f.close()
-
-    # user config
-    user_ray_args = {}
-    for param in SYSPARAMs:
-        if param.startswith("--ray_args"):
-            if "=" in param:
-                key, value = param.split(".")[1].split("=")
-                user_ray_args[key] = value
-            else:  # local_mode
-                user_ray_args[param.split(".")[1]] = True
-
-    # update config
-    ray_config_dict = dict_update(ray_config_dict, user_ray_args, True)
+    # default config updated with user config
+    ray_config_dict = load_config(os.path.join(os.path.dirname(__file__), "ray/ray.yaml"), None,
+                                  USER_ARGs["ray_args"])
 
     for key, value in ray_config_dict.items():
         config[key] = value
@@ -75,7 +60,7 @@ def make_env(
         force_coop: bool = False,
         abs_path: str = "",
         **env_params
-) -> Tuple[MultiAgentEnv, Dict]:
+) -> Tuple["MultiAgentEnv", Dict]:
     """
     construct the environment and register.
     Args:
@@ -88,6 +73,9 @@ def make_env(
     Returns:
         Tuple[MultiAgentEnv, Dict]: env instance & env configuration dict
     """
+    from ray.tune import register_env
+    from marllib.envs.subproc_env import SubprocEnvPool
+
     if abs_path != "":
         env_config_file_path = os.path.join(os.path.dirname(__file__), abs_path)
     else:
@@ -95,42 +83,28 @@ def make_env(
         env_config_file_path = os.path.join(os.path.dirname(__file__),
                                             "../envs/base_env/config/{}.yaml".format(environment_name))
 
-    with open(env_config_file_path, "r") as f:
-        env_config_dict = yaml.load(f, Loader=yaml.FullLoader)
-        f.close()
-
-    # update function-fixed config
-    env_config_dict["env_args"] = dict_update(env_config_dict["env_args"], env_params, True)
-
-    # user commandline config
-    user_env_args = {}
-    for param in SYSPARAMs:
-        if param.startswith("--env_args"):
-            key, value = param.split(".")[1].split("=")
-            user_env_args[key] = value
-
-    # update commandline config
-    env_config_dict["env_args"] = dict_update(env_config_dict["env_args"], user_env_args, True)
+    # update function-fixed config, then commandline config
+    env_config_dict = load_config(env_config_file_path, "env_args", env_params, USER_ARGs["env_args"])
     env_config_dict["env_args"]["map_name"] = map_name
     env_config_dict["force_coop"] = force_coop
 
     # combine with exp running config
     env_config = set_ray(env_config_dict)
 
-    # initialize env
+    # initialize env, only the requested one is imported
+    registry = COOP_ENV_REGISTRY if env_config["force_coop"] else ENV_REGISTRY
+    check_current_used_env_flag = env_config["env"] in registry and registry.is_available(env_config["env"])
+
     env_reg_ls = []
-    check_current_used_env_flag = False
     for env_n in ENV_REGISTRY.keys():
-        if isinstance(ENV_REGISTRY[env_n], str):  # error
-            info = [env_n, "Error", ENV_REGISTRY[env_n], "envs/base_env/config/{}.yaml".format(env_n),
-                    "envs/base_env/{}.py".format(env_n)]
-            env_reg_ls.append(info)
+        if not ENV_REGISTRY.is_loaded(env_n):
+            status, error_log = "Not Loaded", "Null"
+        elif ENV_REGISTRY.error(env_n) is not None:  # error
+            status, error_log = "Error", ENV_REGISTRY.error(env_n)
         else:
-            info = [env_n, "Ready", "Null", "envs/base_env/config/{}.yaml".format(env_n),
-                    "envs/base_env/{}.py".format(env_n)]
-            env_reg_ls.append(info)
-            if env_n == env_config["env"]:
-                check_current_used_env_flag = True
+            status, error_log = "Ready", "Null"
+        env_reg_ls.append([env_n, status, error_log, "envs/base_env/config/{}.yaml".format(env_n),
+                           "envs/base_env/{}.py".format(env_n)])
 
     print(tabulate(env_reg_ls,
                    headers=['Env_Name', 'Check_Status', "Error_Log", "Config_File_Location", "Env_File_Location"],
@@ -138,8 +112,8 @@ def make_env(
 
     if not check_current_used_env_flag:
         raise ValueError(
-            "environment \"{}\" not installed properly or not registered yet, please see the Error_Log below".format(
-                env_config["env"]))
+            "environment \"{}\" not installed properly or not registered yet, please see the Error_Log below: {}".format(
+                env_config["env"], registry.error(env_config["env"])))
 
     env_reg_name = env_config["env"] + "_" + env_config["env_args"]["map_name"]
 
@@ -150,11 +124,32 @@ def make_env(
         register_env(env_reg_name, lambda _: ENV_REGISTRY[env_config["env"]](env_config["env_args"]))
         env = ENV_REGISTRY[env_config["env"]](env_config["env_args"])
 
+    num_env_subprocs = int(env_config["num_env_subprocs"])
+    num_vector_envs = int(env_config["num_vector_envs"])
+    if num_env_subprocs > 0 and num_vector_envs > 0:
+        raise ValueError("num_env_subprocs and num_vector_envs can not be used together")
+
+    if num_vector_envs > 0:
+        # each rollout worker steps its env copies through one vectorized PettingZoo env
+        from marllib.envs.vector_env import VectorPettingZooEnv, PARALLEL_REGISTRIES
+        if env_config["env"] not in PARALLEL_REGISTRIES:
+            raise ValueError("num_vector_envs only supports {}, not \"{}\"".format(
+                list(PARALLEL_REGISTRIES), env_config["env"]))
+        register_env(env_reg_name, lambda _: VectorPettingZooEnv.from_config(
+            env_config["env"], env_config["env_args"], num_vector_envs, force_coop=env_config["force_coop"]))
+
+    if num_env_subprocs > 0:
+        # each rollout worker steps its env copies in subprocesses
+        env_meta = (env.agents, env.observation_space, env.action_space)
+        register_env(env_reg_name, lambda _: SubprocEnvPool(
+            env_config["env"], env_config["env_args"], num_env_subprocs, *env_meta,
+            force_coop=env_config["force_coop"]))
+
     return env, env_config
 
 
 def build_model(
-        environment: Tuple[MultiAgentEnv, Dict],
+        environment: Tuple["MultiAgentEnv", Dict],
         algorithm: str,
         model_preference: Dict,
 ) -> Tuple[Any, Dict]:
@@ -169,34 +164,7 @@ def build_model(
         Tuple[Any, Dict]: model class & model configuration
     """
 
-    if algorithm.name in ["iddpg", "facmac", "maddpg"]:
-        if model_preference["core_arch"] in ["gru", "lstm"]:
-            model_class = DDPGSeriesRNN
-        else:
-            model_class = DDPGSeriesMLP
-
-    elif algorithm.name in ["qmix", "vdn", "iql"]:
-        if model_preference["core_arch"] in ["gru", "lstm"]:
-            model_class = JointQRNN
-        else:
-            model_class = JointQMLP
-
-    else:
-        if algorithm.algo_type == "IL":
-            if model_preference["core_arch"] in ["gru", "lstm"]:
-                model_class = BaseRNN
-            else:
-                model_class = BaseMLP
-        elif algorithm.algo_type == "CC":
-            if model_preference["core_arch"] in ["gru", "lstm"]:
-                model_class = CentralizedCriticRNN
-            else:
-                model_class = CentralizedCriticMLP
-        else:  # VD
-            if model_preference["core_arch"] in ["gru", "lstm"]:
-                model_class = ValueDecompRNN
-            else:
-                model_class = ValueDecompMLP
+    model_class = get_model_class(algorithm.name, algorithm.algo_type, model_preference["core_arch"])
 
     if model_preference["core_arch"] in ["gru", "lstm"]:
         model_config = get_model_config("rnn")
@@ -260,31 +228,20 @@ class _Algo:
         if not os.path.exists(os.path.join(os.path.dirname(__file__), rel_path)):
             rel_path = "../../examples/config/algo_config/{}.yaml".format(self.name)
 
-        with open(os.path.join(os.path.dirname(__file__), rel_path), "r") as f:
-            algo_config_dict = yaml.load(f, Loader=yaml.FullLoader)
-            f.close()
+        # update function-fixed config, then commandline config
+        algo_config_path = os.path.join(os.path.dirname(__file__), rel_path)
+        algo_config_dict = load_config(algo_config_path, "algo_args", algo_params, USER_ARGs["algo_args"])
 
-        # update function-fixed config
-        algo_config_dict["algo_args"] = dict_update(algo_config_dict["algo_args"],
-                                                    algo_params, True)
-
-        # user config
-        user_algo_args = {}
-        for param in SYSPARAMs:
-            if param.startswith("--algo_args"):
-                value = param.split("=")[1]
-                key = param.split("=")[0].split(".")[1]
-                user_algo_args[key] = value
-
-        # update commandline config
-        algo_config_dict["algo_args"] = dict_update(algo_config_dict["algo_args"],
-                                                    user_algo_args, True)
+        # type every hyperparameter once, checked against the common config of the algorithm
+        common_path = os.path.join(os.path.dirname(__file__), "algos/hyperparams/common/{}.yaml".format(self.name))
+        reference = load_yaml(common_path)["algo_args"] if os.path.exists(common_path) else None
+        algo_config_dict["algo_args"] = check_algo_args(algo_config_dict["algo_args"], reference, algo_config_path)
 
         self.algo_parameters = algo_config_dict
 
         return self
 
-    def fit(self, env: Tuple[MultiAgentEnv, Dict], model: Tuple[Any, Dict], stop: Dict = None,
+    def fit(self, env: Tuple["MultiAgentEnv", Dict], model: Tuple[Any, Dict], stop: Dict = None,
             **running_params) -> None:
         """
         Entering point of the whole training
@@ -308,6 +265,10 @@ class _Algo:
 
         self.config_dict['algorithm'] = self.name
 
+        from marllib.marl.algos.run_il import run_il
+        from marllib.marl.algos.run_vd import run_vd
+        from marllib.marl.algos.run_cc import run_cc
+
         if self.algo_type == "IL":
             return run_il(self.config_dict, env_instance, model_class, stop=stop)
         elif self.algo_type == "VD":
@@ -317,7 +278,7 @@ class _Algo:
         else:
             raise ValueError("not supported type {}".format(self.algo_type))
 
-    def render(self, env: Tuple[MultiAgentEnv, Dict], model: Tuple[Any, Dict], stop: Dict = None,
+    def render(self, env: Tuple["MultiAgentEnv", Dict], model: Tuple[Any, Dict], stop: Dict = None,
                **running_params) -> None:
         """
         Entering point of the rendering, running a one iteration fit instead
@@ -337,8 +298,8 @@ class _AlgoManager:
     def __init__(self):
         """An algorithm pool class
         """
-        for algo_name in POlICY_REGISTRY:
-            setattr(_AlgoManager, algo_name, _Algo(algo_name))
+        for algo_name, spec in ALGO_SPECS.items():
+            setattr(_AlgoManager, algo_name, _Algo(algo_name + "_" + spec.algo_type))
 
     def register_algo(self, algo_name: str, style: str, script: Any):
         """
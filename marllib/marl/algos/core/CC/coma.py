@@ -33,6 +33,7 @@ from ray.rllib.policy.sample_batch import SampleBatch
 from ray.rllib.utils.torch_ops import convert_to_torch_tensor
 from typing import Dict
 from marllib.marl.algos.utils.centralized_critic import CentralizedValueMixin, centralized_critic_postprocessing
+from marllib.marl.algos.utils.overlap_execution_plan import A2C_OVERLAP_CONFIG, a2c_overlap_execution_plan
 
 torch, nn = try_import_torch()
 
@@ -40,6 +41,21 @@ torch, nn = try_import_torch()
 ### COMA ###
 ############
 
+def counterfactual_baseline(q_values, pi, avail_actions=None):
+    """
+    expected Q under the current policy, evaluated for all actions in one pass
+    Args:
+        :param q_values: [B, n_actions] all-action central critic output
+        :param pi: [B, n_actions] action probabilities
+        :param avail_actions: optional [B, n_actions] 0/1 action mask
+    Returns:
+        [B] counterfactual baseline
+    """
+    if avail_actions is not None:
+        pi = pi * avail_actions
+    return torch.einsum("ba,ba->b", q_values, pi)
+
+
 def central_critic_coma_loss(policy: Policy, model: ModelV2,
                              dist_class: ActionDistribution,
                              train_batch: SampleBatch) -> TensorType:
@@ -77,8 +93,12 @@ def central_critic_coma_loss(policy: Policy, model: ModelV2,
     log_probs = dist.logp(train_batch[SampleBatch.ACTIONS]).reshape(-1)
 
     # here the coma loss & calculate the mean values as baseline:
-    select_action_Q_value = values.gather(1, train_batch[SampleBatch.ACTIONS].unsqueeze(1)).squeeze()
-    advantages = (select_action_Q_value - torch.sum(values * pi, dim=1)).detach()
+    # the critic forward above already holds Q for all actions, reuse it for both terms
+    avail_actions = None
+    if policy.config["model"]["custom_model_config"]["mask_flag"]:
+        avail_actions = train_batch[SampleBatch.OBS][:, :pi.shape[1]]
+    select_action_Q_value = values.gather(1, train_batch[SampleBatch.ACTIONS].long().unsqueeze(1)).squeeze(1)
+    advantages = (select_action_Q_value - counterfactual_baseline(values, pi, avail_actions)).detach()
     coma_pi_err = -torch.sum(torch.masked_select(log_probs * advantages, valid_mask))
 
     # Compute coma critic loss.
@@ -134,4 +154,6 @@ COMATrainer = A2CTrainer.with_updates(
     name="COMATrainer",
     default_policy=None,
     get_policy_class=get_policy_class_coma,
+    default_config=A2C_OVERLAP_CONFIG,
+    execution_plan=a2c_overlap_execution_plan,
 )
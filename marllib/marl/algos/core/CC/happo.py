@@ -46,6 +46,8 @@ from marllib.marl.algos.utils.setup_utils import get_device
 from ray.rllib.agents.ppo.ppo_torch_policy import PPOTorchPolicy, KLCoeffMixin
 import torch
 from marllib.marl.algos.utils.heterogeneous_updateing import update_m_advantage, get_each_agent_train
+from marllib.marl.algos.utils.overlap_execution_plan import OVERLAP_CONFIG, ppo_overlap_execution_plan
+from ray.tune.utils import merge_dicts
 
 
 def happo_surrogate_loss(
@@ -81,18 +83,15 @@ def happo_surrogate_loss(
 
     m_advantage = train_batch[Postprocessing.ADVANTAGES]
 
-    for i, iter_train_info in enumerate(get_each_agent_train(model, policy, dist_class, train_batch)):
-        iter_model, iter_dist_class, iter_train_batch, iter_mask, \
-            iter_reduce_mean, iter_actions, iter_policy, iter_prev_action_logp = iter_train_info
+    agent_update_threads = policy.config["model"]["custom_model_config"].get("agent_update_threads", 0)
 
-        iter_model.train()
+    for i, iter_train_info in enumerate(
+            get_each_agent_train(model, policy, dist_class, train_batch, agent_update_threads)):
+        iter_model, iter_dist_class, iter_train_batch, iter_mask, iter_reduce_mean, iter_actions, \
+            iter_policy, iter_prev_action_logp, iter_current_action_dist, logp_ratio = iter_train_info
 
         iter_prev_action_dist = iter_dist_class(iter_train_batch[SampleBatch.ACTION_DIST_INPUTS], iter_model)
 
-        iter_logits, iter_state = iter_model(iter_train_batch)
-        iter_current_action_dist = iter_dist_class(iter_logits, iter_model)
-        logp_ratio = torch.exp(iter_current_action_dist.logp(iter_actions) - iter_prev_action_logp)
-
         iter_action_kl = iter_prev_action_dist.kl(iter_current_action_dist)
         iter_mean_kl_loss = iter_reduce_mean(iter_action_kl)
 
@@ -202,4 +201,6 @@ HAPPOTrainer = lambda ppo_with_critic: PPOTrainer.with_updates(
     name="HAPPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_happo(ppo_with_critic),
+    default_config=merge_dicts(ppo_with_critic, OVERLAP_CONFIG),
+    execution_plan=ppo_overlap_execution_plan,
 )
@@ -51,6 +51,7 @@ from marllib.marl.algos.utils.heterogeneous_updateing import update_m_advantage,
 
 from ray.rllib.examples.centralized_critic import CentralizedValueMixin
 from marllib.marl.algos.utils.setup_utils import get_device
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 tf1, tf, tfv = try_import_tf()
 torch, nn = try_import_torch()
@@ -130,15 +131,12 @@ def hatrpo_loss_fn(
 
     agent_num = 1
 
-    model.train()
-    for i, iter_agent_info in enumerate(get_each_agent_train(model, policy, dist_class, train_batch)):
-        iter_model, iter_dist_class, iter_train_batch, iter_mask, \
-            iter_reduce_mean, iter_actions, iter_policy, iter_prev_action_logp = iter_agent_info
+    agent_update_threads = policy.config["model"]["custom_model_config"].get("agent_update_threads", 0)
 
-        iter_logits, iter_state = iter_model(iter_train_batch)
-        iter_current_action_dist = iter_dist_class(iter_logits, iter_model)
-        iter_prev_action_logp = iter_train_batch[SampleBatch.ACTION_LOGP]
-        iter_logp_ratio = torch.exp(iter_current_action_dist.logp(iter_actions) - iter_prev_action_logp)
+    for i, iter_agent_info in enumerate(
+            get_each_agent_train(model, policy, dist_class, train_batch, agent_update_threads)):
+        iter_model, iter_dist_class, iter_train_batch, iter_mask, iter_reduce_mean, iter_actions, \
+            iter_policy, iter_prev_action_logp, iter_current_action_dist, iter_logp_ratio = iter_agent_info
 
         iter_loss = get_trpo_loss(
             reduce_mean=iter_reduce_mean,
@@ -218,4 +216,6 @@ HATRPOTrainer = PPOTrainer.with_updates(
     name="HATRPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_hatrpo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
\ No newline at end of file
@@ -29,6 +29,7 @@ from ray.rllib.agents.a3c.a3c_torch_policy import A3CTorchPolicy
 from ray.rllib.agents.a3c.a2c import A2C_DEFAULT_CONFIG as A2C_CONFIG, A2CTrainer
 from ray.rllib.policy.sample_batch import SampleBatch
 from marllib.marl.algos.utils.centralized_critic import CentralizedValueMixin, centralized_critic_postprocessing
+from marllib.marl.algos.utils.overlap_execution_plan import A2C_OVERLAP_CONFIG, a2c_overlap_execution_plan
 
 
 #############
@@ -86,4 +87,6 @@ MAA2CTrainer = A2CTrainer.with_updates(
     name="MAA2CTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_maa2c,
+    default_config=A2C_OVERLAP_CONFIG,
+    execution_plan=a2c_overlap_execution_plan,
 )
@@ -78,17 +78,20 @@ def central_critic_ddpg_loss(policy: Policy, model: ModelV2,
         "prev_rewards": train_batch[SampleBatch.REWARDS],
     }
 
-    target_model_out_tp1, target_state_in_tp1 = target_model(
-        input_dict_next, state_batches, seq_lens)
-    target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
-                                                     ["policy", "q", "twin_q"])
+    # the target branch only feeds the detached bellman target, build it without autograd
+    with torch.no_grad():
+        target_model_out_tp1, target_state_in_tp1 = target_model(
+            input_dict_next, state_batches, seq_lens)
+        target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
+                                                         ["policy", "q", "twin_q"])
 
     # Policy network evaluation.
     policy_t = model.get_policy_output(
         model_out_t, states_in_t["policy"], seq_lens)[0]
 
-    policy_tp1 = target_model.get_policy_output(
-        target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
+    with torch.no_grad():
+        policy_tp1 = target_model.get_policy_output(
+            target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
 
     # Action outputs.
     if policy.config["smooth_target_policy"]:
@@ -125,8 +128,9 @@ def central_critic_ddpg_loss(policy: Policy, model: ModelV2,
     q_t_det_policy = torch.squeeze(input=q_t_det_policy, axis=len(q_t_det_policy.shape) - 1)
 
     # Target q-net(s) evaluation.
-    q_tp1 = target_model.get_cc_q_values(
-        target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
+    with torch.no_grad():
+        q_tp1 = target_model.get_cc_q_values(
+            target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
 
     q_t_selected = torch.squeeze(q_t, axis=len(q_t.shape) - 1)
     q_tp1_best = torch.squeeze(input=q_tp1, axis=len(q_tp1.shape) - 1)
@@ -337,6 +341,7 @@ MADDPGTorchPolicy = IDDPGTorchPolicy.with_updates(
     make_model_and_action_dist=build_maddpg_models_and_action_dist,
     loss_fn=central_critic_ddpg_loss,
     mixins=[
+        PolyakTargetNetworkMixin,
         TargetNetworkMixin,
         ComputeTDErrorMixin,
         CentralizedQValueMixin
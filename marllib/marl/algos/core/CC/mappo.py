@@ -32,6 +32,7 @@ from ray.rllib.policy.torch_policy import EntropyCoeffSchedule, \
 from ray.rllib.utils.typing import TensorType, TrainerConfigDict
 from marllib.marl.algos.utils.centralized_critic import CentralizedValueMixin, centralized_critic_postprocessing
 from marllib.marl.algos.core import setup_torch_mixins
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 #############
 ### MAPPO ###
@@ -89,4 +90,6 @@ MAPPOTrainer = PPOTrainer.with_updates(
     name="MAPPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_mappo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
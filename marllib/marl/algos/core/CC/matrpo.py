@@ -35,6 +35,7 @@ from ray.rllib.utils.typing import TensorType
 from ray.rllib.evaluation.postprocessing import Postprocessing
 from ray.rllib.utils.torch_ops import explained_variance, sequence_mask
 from marllib.marl.algos.core import setup_torch_mixins
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 torch, nn = try_import_torch()
 
@@ -178,4 +179,6 @@ MATRPOTrainer = PPOTrainer.with_updates(
     name="MATRPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_mappo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
@@ -22,6 +22,7 @@
 
 from ray.rllib.agents.a3c.a3c_torch_policy import A3CTorchPolicy
 from ray.rllib.agents.a3c.a2c import A2C_DEFAULT_CONFIG as A2C_CONFIG, A2CTrainer
+from marllib.marl.algos.utils.overlap_execution_plan import A2C_OVERLAP_CONFIG, a2c_overlap_execution_plan
 
 ###########
 ### A2C ###
@@ -43,4 +44,6 @@ IA2CTrainer = A2CTrainer.with_updates(
     name="IA2CTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_ia2c,
+    default_config=A2C_OVERLAP_CONFIG,
+    execution_plan=a2c_overlap_execution_plan,
 )
@@ -22,7 +22,7 @@
 
 from typing import Type
 from ray.rllib.agents.ddpg.ddpg import DDPGTrainer, DEFAULT_CONFIG as DDPG_DEFAULT_CONFIG
-from ray.rllib.agents.ddpg.ddpg_torch_policy import DDPGTorchPolicy
+from ray.rllib.agents.ddpg.ddpg_torch_policy import DDPGTorchPolicy, TargetNetworkMixin, ComputeTDErrorMixin
 import copy
 import gym
 from typing import Tuple
@@ -44,6 +44,7 @@ from ray.rllib.models.catalog import ModelCatalog
 from ray.rllib.execution.replay_buffer import *
 
 from marllib.marl.algos.utils.episode_execution_plan import episode_execution_plan
+from marllib.marl.algos.utils.target_network import PolyakTargetNetworkMixin
 
 torch, nn = try_import_torch()
 
@@ -94,17 +95,20 @@ def ddpg_actor_critic_loss(policy: Policy, model: ModelV2, _,
         "prev_rewards": train_batch[SampleBatch.REWARDS],
     }
 
-    target_model_out_tp1, target_state_in_tp1 = target_model(
-        input_dict_next, state_batches, seq_lens)
-    target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
-                                                     ["policy", "q", "twin_q"])
+    # the target branch only feeds the detached bellman target, build it without autograd
+    with torch.no_grad():
+        target_model_out_tp1, target_state_in_tp1 = target_model(
+            input_dict_next, state_batches, seq_lens)
+        target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
+                                                         ["policy", "q", "twin_q"])
 
     # Policy network evaluation.
     policy_t = model.get_policy_output(
         model_out_t, states_in_t["policy"], seq_lens)[0]
 
-    policy_tp1 = target_model.get_policy_output(
-        target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
+    with torch.no_grad():
+        policy_tp1 = target_model.get_policy_output(
+            target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
 
     # Action outputs.
     if policy.config["smooth_target_policy"]:
@@ -141,8 +145,9 @@ def ddpg_actor_critic_loss(policy: Policy, model: ModelV2, _,
     q_t_det_policy = torch.squeeze(input=q_t_det_policy, axis=len(q_t_det_policy.shape) - 1)
 
     # Target q-net(s) evaluation.
-    q_tp1 = target_model.get_q_values(
-        target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
+    with torch.no_grad():
+        q_tp1 = target_model.get_q_values(
+            target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
 
     q_t_selected = torch.squeeze(q_t, axis=len(q_t.shape) - 1)
 
@@ -553,6 +558,11 @@ IDDPGTorchPolicy = DDPGTorchPolicy.with_updates(
     action_distribution_fn=action_distribution_fn,
     make_model_and_action_dist=build_iddpg_models_and_action_dist,
     loss_fn=ddpg_actor_critic_loss,
+    mixins=[
+        PolyakTargetNetworkMixin,
+        TargetNetworkMixin,
+        ComputeTDErrorMixin,
+    ]
 )
 
 
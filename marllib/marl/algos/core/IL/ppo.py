@@ -22,6 +22,7 @@
 
 from ray.rllib.agents.ppo.ppo_torch_policy import PPOTorchPolicy
 from ray.rllib.agents.ppo.ppo import PPOTrainer as PPOTrainer, DEFAULT_CONFIG as PPO_CONFIG
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 ###########
 ### PPO ###
@@ -43,4 +44,6 @@ IPPOTrainer = PPOTrainer.with_updates(
     name="IPPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_ppo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
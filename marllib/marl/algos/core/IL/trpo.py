@@ -46,6 +46,7 @@ from marllib.marl.algos.utils.trust_regions import TrustRegionUpdator
 
 from ray.rllib.examples.centralized_critic import CentralizedValueMixin
 from icecream import ic
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 torch, nn = try_import_torch()
 
@@ -186,4 +187,6 @@ TRPOTrainer = PPOTrainer.with_updates(
     name="TRPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_trpo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
@@ -132,31 +132,34 @@ class FACMAC_TorchModel(IDDPGTorchModel):
                                 state_in: List[TensorType],
                                 net,
                                 actions,
-                                seq_lens: TensorType):
+                                seq_lens: TensorType,
+                                **overrides):
         # Continuous case -> concat actions to model_out.
-        model_out = copy.deepcopy(model_out)
-        if actions is not None:
-            model_out["actions"] = actions
-        else:
+        if actions is None:
             actions = torch.zeros(
-                list(model_out[SampleBatch.OBS]["obs"].shape[:-1]) + [self.action_dim])
-            model_out["actions"] = actions.to(state_in[0].device)
+                list(model_out[SampleBatch.OBS]["obs"].shape[:-1]) + [self.action_dim],
+                device=state_in[0].device)
 
-        # Switch on training mode (when getting Q-values, we are usually in
-        # training).
-        model_out["is_training"] = True
+        # The per-call inputs go into a new top-level dict, the batch tensors of model_out are shared
+        # rather than copied. Switch on training mode (when getting Q-values, we are usually in training).
+        q_in = dict(model_out, actions=actions, is_training=True, **overrides)
 
-        out, state_out = net(model_out, state_in, seq_lens)
-        mixing_out = net.mixing_value(torch.cat((out, model_out["opponent_q"]), 1), model_out["state"])
+        out, state_out = net(q_in, state_in, seq_lens)
+        mixing_out = net.mixing_value(torch.cat((out, q_in["opponent_q"]), 1), q_in["state"])
         return mixing_out, state_out
 
     def get_q_values_and_mixing(self,
                                 model_out: TensorType,
                                 state_in: List[TensorType],
                                 seq_lens: TensorType,
-                                actions: Optional[TensorType] = None) -> TensorType:
+                                actions: Optional[TensorType] = None,
+                                **overrides) -> TensorType:
+        """
+        Q(s, a) of this agent mixed with the opponent Qs in model_out.
+        Keyword overrides (e.g. opponent_q or state) replace the model_out entry for this call only.
+        """
         return self._get_q_value_and_mixing(model_out, state_in, self.q_model, actions,
-                                            seq_lens)
+                                            seq_lens, **overrides)
 
 
 # Copied from rnnddpg but optimizing the central q function.
@@ -203,10 +206,12 @@ def value_mixing_ddpg_loss(policy, model, dist_class, train_batch):
     #     input_dict_next, state_batches, seq_lens)
     # states_in_tp1 = model.select_state(state_in_tp1, ["policy", "q", "twin_q"])
 
-    target_model_out_tp1, target_state_in_tp1 = target_model(
-        input_dict_next, state_batches, seq_lens)
-    target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
-                                                     ["policy", "q", "twin_q"])
+    # the target branch only feeds the detached bellman target, build it without autograd
+    with torch.no_grad():
+        target_model_out_tp1, target_state_in_tp1 = target_model(
+            input_dict_next, state_batches, seq_lens)
+        target_states_in_tp1 = target_model.select_state(target_state_in_tp1,
+                                                         ["policy", "q", "twin_q"])
 
     # Policy network evaluation.
     # prev_update_ops = set(tf1.get_collection(tf.GraphKeys.UPDATE_OPS))
@@ -215,8 +220,9 @@ def value_mixing_ddpg_loss(policy, model, dist_class, train_batch):
     # policy_batchnorm_update_ops = list(
     #    set(tf1.get_collection(tf.GraphKeys.UPDATE_OPS)) - prev_update_ops)
 
-    policy_tp1 = target_model.get_policy_output(
-        target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
+    with torch.no_grad():
+        policy_tp1 = target_model.get_policy_output(
+            target_model_out_tp1, target_states_in_tp1["policy"], seq_lens)[0]
 
     # Action outputs.
     if policy.config["smooth_target_policy"]:
@@ -255,8 +261,9 @@ def value_mixing_ddpg_loss(policy, model, dist_class, train_batch):
     actor_loss = -torch.mean(q_t_det_policy)
 
     # Target q-net(s) evaluation.
-    q_tp1 = target_model.get_q_values_and_mixing(
-        target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
+    with torch.no_grad():
+        q_tp1 = target_model.get_q_values_and_mixing(
+            target_model_out_tp1, target_states_in_tp1["q"], seq_lens, policy_tp1_smoothed)[0]
 
     q_t_selected = torch.squeeze(q_t, axis=len(q_t.shape) - 1)
 
@@ -318,6 +325,7 @@ FACMACTorchPolicy = IDDPGTorchPolicy.with_updates(
     make_model_and_action_dist=build_facmac_models_and_action_dist,
     loss_fn=value_mixing_ddpg_loss,
     mixins=[
+        PolyakTargetNetworkMixin,
         TargetNetworkMixin,
         ComputeTDErrorMixin,
         MixingQValueMixin
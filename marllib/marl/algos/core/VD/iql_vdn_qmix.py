@@ -43,6 +43,7 @@ from marllib.marl.models.zoo.mlp.jointQ_mlp import JointQMLP
 
 from marllib.marl.models.zoo.mixer import QMixer, VDNMixer
 from marllib.marl.algos.utils.episode_execution_plan import episode_execution_plan
+from marllib.marl.algos.utils.target_network import target_network_pair
 
 # original _unroll_mac for next observation is different from Pymarl.
 # thus we provide a new JointQLoss here
@@ -462,9 +463,9 @@ class JointQPolicy(Policy):
         self.set_epsilon(state["cur_epsilon"])
 
     def update_target(self):
-        self.target_model.load_state_dict(self.model.state_dict())
+        target_network_pair(self, self.model, self.target_model).hard_update()
         if self.mixer is not None:
-            self.target_mixer.load_state_dict(self.mixer.state_dict())
+            target_network_pair(self, self.mixer, self.target_mixer).hard_update()
         logger.debug("Updated target networks")
 
     def set_epsilon(self, epsilon):
@@ -33,6 +33,7 @@ from ray.rllib.agents.a3c.a3c_torch_policy import A3CTorchPolicy
 from ray.rllib.agents.a3c.a2c import A2C_DEFAULT_CONFIG as A2C_CONFIG, A2CTrainer
 from ray.rllib.agents.ppo.ppo_torch_policy import ValueNetworkMixin
 from marllib.marl.algos.utils.mixing_critic import MixingValueMixin, value_mixing_postprocessing
+from marllib.marl.algos.utils.overlap_execution_plan import A2C_OVERLAP_CONFIG, a2c_overlap_execution_plan
 
 torch, nn = try_import_torch()
 
@@ -112,4 +113,6 @@ VDA2CTrainer = A2CTrainer.with_updates(
     name="VDA2CTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_vda2c,
+    default_config=A2C_OVERLAP_CONFIG,
+    execution_plan=a2c_overlap_execution_plan,
 )
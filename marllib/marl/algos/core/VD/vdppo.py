@@ -35,6 +35,7 @@ from ray.rllib.agents.ppo.ppo_torch_policy import PPOTorchPolicy, KLCoeffMixin,
 from ray.rllib.policy.torch_policy import LearningRateSchedule, EntropyCoeffSchedule
 from ray.rllib.agents.ppo.ppo import PPOTrainer, DEFAULT_CONFIG as PPO_CONFIG
 from marllib.marl.algos.utils.mixing_critic import MixingValueMixin, value_mixing_postprocessing
+from marllib.marl.algos.utils.overlap_execution_plan import PPO_OVERLAP_CONFIG, ppo_overlap_execution_plan
 
 torch, nn = try_import_torch()
 
@@ -162,4 +163,6 @@ VDPPOTrainer = PPOTrainer.with_updates(
     name="VDPPOTrainer",
     default_policy=None,
     get_policy_class=get_policy_class_vdppo,
+    default_config=PPO_OVERLAP_CONFIG,
+    execution_plan=ppo_overlap_execution_plan,
 )
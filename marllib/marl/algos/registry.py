@@ -0,0 +1,106 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+declarative algorithm registry: algorithm name -> learning style, running script and trainer,
+given as ``module:attr`` strings and only imported when that algorithm is actually used
+"""
+
+from collections import namedtuple
+from collections.abc import MutableMapping
+import importlib
+
+AlgoSpec = namedtuple("AlgoSpec", ["algo_type", "script", "trainer"])
+
+_SCRIPTS = "marllib.marl.algos.scripts"
+_CORE = "marllib.marl.algos.core"
+
+ALGO_SPECS = {
+    "ia2c": AlgoSpec("IL", _SCRIPTS + ".ia2c:run_ia2c", _CORE + ".IL.a2c:IA2CTrainer"),
+    "ippo": AlgoSpec("IL", _SCRIPTS + ".ippo:run_ippo", _CORE + ".IL.ppo:IPPOTrainer"),
+    "iddpg": AlgoSpec("IL", _SCRIPTS + ".iddpg:run_iddpg", _CORE + ".IL.ddpg:IDDPGTrainer"),
+    "itrpo": AlgoSpec("IL", _SCRIPTS + ".itrpo:run_itrpo", _CORE + ".IL.trpo:TRPOTrainer"),
+    "iql": AlgoSpec("VD", _SCRIPTS + ".vdn_qmix_iql:run_joint_q", _CORE + ".VD.iql_vdn_qmix:JointQTrainer"),
+    "qmix": AlgoSpec("VD", _SCRIPTS + ".vdn_qmix_iql:run_joint_q", _CORE + ".VD.iql_vdn_qmix:JointQTrainer"),
+    "vdn": AlgoSpec("VD", _SCRIPTS + ".vdn_qmix_iql:run_joint_q", _CORE + ".VD.iql_vdn_qmix:JointQTrainer"),
+    "vda2c": AlgoSpec("VD", _SCRIPTS + ".vda2c:run_vda2c", _CORE + ".VD.vda2c:VDA2CTrainer"),
+    "vdppo": AlgoSpec("VD", _SCRIPTS + ".vdppo:run_vdppo", _CORE + ".VD.vdppo:VDPPOTrainer"),
+    "facmac": AlgoSpec("VD", _SCRIPTS + ".facmac:run_facmac", _CORE + ".VD.facmac:FACMACTrainer"),
+    "maa2c": AlgoSpec("CC", _SCRIPTS + ".maa2c:run_maa2c", _CORE + ".CC.maa2c:MAA2CTrainer"),
+    "mappo": AlgoSpec("CC", _SCRIPTS + ".mappo:run_mappo", _CORE + ".CC.mappo:MAPPOTrainer"),
+    "coma": AlgoSpec("CC", _SCRIPTS + ".coma:run_coma", _CORE + ".CC.coma:COMATrainer"),
+    "maddpg": AlgoSpec("CC", _SCRIPTS + ".maddpg:run_maddpg", _CORE + ".CC.maddpg:MADDPGTrainer"),
+    "happo": AlgoSpec("CC", _SCRIPTS + ".happo:run_happo", _CORE + ".CC.happo:HAPPOTrainer"),
+    "hatrpo": AlgoSpec("CC", _SCRIPTS + ".hatrpo:run_hatrpo", _CORE + ".CC.hatrpo:HATRPOTrainer"),
+    "matrpo": AlgoSpec("CC", _SCRIPTS + ".matrpo:run_matrpo", _CORE + ".CC.matrpo:MATRPOTrainer"),
+}
+
+
+def load_target(target: str):
+    """Import ``module:attr`` and return the attribute."""
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class LazyAlgoRegistry(MutableMapping):
+    """Dict-like view of one field of `ALGO_SPECS` ("script" or "trainer"), imported on first lookup.
+
+    Algorithms registered at runtime (e.g. through `marl.algos.register_algo`) are stored as given.
+    Unlike the env registry, a failing import raises, since every built-in algorithm is expected to load.
+    """
+
+    def __init__(self, field: str):
+        self._field = field
+        self._names = list(ALGO_SPECS)
+        self._resolved = {}
+
+    def __getitem__(self, name):
+        if name not in self._resolved:
+            if name not in ALGO_SPECS:
+                raise KeyError(name)
+            self._resolved[name] = load_target(getattr(ALGO_SPECS[name], self._field))
+        return self._resolved[name]
+
+    def __setitem__(self, name, value):
+        if name not in self._names:
+            self._names.append(name)
+        self._resolved[name] = value
+
+    def __delitem__(self, name):
+        self._names.remove(name)
+        self._resolved.pop(name, None)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __repr__(self):
+        return "{}({!r}, {})".format(type(self).__name__, self._field, self._names)
+
+
+POlICY_REGISTRY = LazyAlgoRegistry("script")
+TRAINER_REGISTRY = LazyAlgoRegistry("trainer")
@@ -26,6 +26,7 @@ from ray import tune
 from ray.rllib.utils.framework import try_import_tf, try_import_torch
 from marllib.marl.algos.scripts import POlICY_REGISTRY
 from marllib.marl.common import recursive_dict_update, dict_update
+from marllib.marl.algos.utils.obs_filter import observation_filter
 
 torch, nn = try_import_torch()
 
@@ -174,6 +175,7 @@ def run_cc(exp_info, env, model, stop=None):
         },
         "framework": exp_info["framework"],
         "evaluation_interval": exp_info["evaluation_interval"],
+        "observation_filter": observation_filter(exp_info["env_args"], env_info["space_obs"]),
         "simple_optimizer": False  # force using better optimizer
     }
 
@@ -27,6 +27,7 @@ from ray.rllib.utils.framework import try_import_tf, try_import_torch
 from ray.rllib.policy.policy import PolicySpec
 from marllib.marl.algos.scripts import POlICY_REGISTRY
 from marllib.marl.common import recursive_dict_update, dict_update
+from marllib.marl.algos.utils.obs_filter import observation_filter
 from marllib.marl.algos.run_cc import restore_config_update
 
 tf1, tf, tfv = try_import_tf()
@@ -133,6 +134,7 @@ def run_il(exp_info, env, model, stop=None):
         },
         "framework": exp_info["framework"],
         "evaluation_interval": exp_info["evaluation_interval"],
+        "observation_filter": observation_filter(exp_info["env_args"], env_info["space_obs"]),
         "simple_optimizer": False  # force using better optimizer
     }
 
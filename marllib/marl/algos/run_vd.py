@@ -29,6 +29,7 @@ from ray.rllib.utils.framework import try_import_tf, try_import_torch
 from marllib.marl.algos.scripts import POlICY_REGISTRY
 from marllib.envs.global_reward_env import COOP_ENV_REGISTRY as ENV_REGISTRY
 from marllib.marl.common import recursive_dict_update, dict_update
+from marllib.marl.algos.utils.obs_filter import observation_filter
 from marllib.marl.algos.run_cc import restore_config_update
 
 tf1, tf, tfv = try_import_tf()
@@ -121,10 +122,12 @@ def run_vd(exp_info, env, model, stop=None):
         register_env(env_reg_name,
                      lambda _: ENV_REGISTRY[exp_info["env"]](exp_info["env_args"]).with_agent_groups(
                          grouping, obs_space=obs_space, act_space=act_space))
+        policy_obs_space = obs_space
     else:
         env_reg_name = exp_info["env"] + "_" + exp_info["env_args"]["map_name"]
         register_env(env_reg_name,
                      lambda _: ENV_REGISTRY[exp_info["env"]](exp_info["env_args"]))
+        policy_obs_space = env_info["space_obs"]
 
     if exp_info["algorithm"] in ["qmix", "vdn", "iql"]:
         policies = None
@@ -188,6 +191,7 @@ def run_vd(exp_info, env, model, stop=None):
         },
         "framework": exp_info["framework"],
         "evaluation_interval": exp_info["evaluation_interval"],
+        "observation_filter": observation_filter(exp_info["env_args"], policy_obs_space),
         "simple_optimizer": False  # force using better optimizer
     }
 
@@ -26,6 +26,7 @@ from ray.tune.utils import merge_dicts
 from ray.tune import CLIReporter
 from marllib.marl.algos.core.CC.happo import HAPPOTrainer
 from marllib.marl.algos.utils.setup_utils import AlgVar
+from marllib.marl.algos.utils.batch_planner import plan_learner_batches
 from marllib.marl.algos.utils.log_dir_util import available_local_dir
 from marllib.marl.algos.scripts.coma import restore_model
 from ray.rllib.agents.ppo.ppo import DEFAULT_CONFIG as PPO_CONFIG
@@ -85,12 +86,14 @@ def run_happo(model: Any, exp: Dict, run: Dict, env: Dict,
     exp['actor_lr'] = lr
     exp['critic_lr'] = critic_lr
     exp['gain'] = _param['gain']
+    exp['agent_update_threads'] = _param['agent_update_threads']
 
     seed = random.randint(0, 10)
     back_up_config = merge_dicts(exp, env)
     back_up_config.pop("algo_args")  # clean for grid_search
 
     config = {
+        "sample_learn_overlap": exp["sample_learn_overlap"],
         "seed": seed,
         "horizon": episode_limit,
         "batch_mode": batch_mode,
@@ -114,6 +117,7 @@ def run_happo(model: Any, exp: Dict, run: Dict, env: Dict,
         },
     }
     config.update(run)
+    config = plan_learner_batches(config, exp, env)
 
     TRAIN_MARK = 'append-data'
 
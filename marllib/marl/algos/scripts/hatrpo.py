@@ -26,6 +26,7 @@ from ray.tune import CLIReporter
 from marllib.marl.algos.core.CC.hatrpo import HATRPOTrainer
 from marllib.marl.algos.utils.log_dir_util import available_local_dir
 from marllib.marl.algos.utils.setup_utils import AlgVar
+from marllib.marl.algos.utils.batch_planner import plan_learner_batches
 from marllib.marl.algos.utils.trust_regions import TrustRegionUpdator
 from marllib.marl.algos.scripts.coma import restore_model
 from ray.rllib.models import ModelCatalog
@@ -87,10 +88,12 @@ def run_hatrpo(model: Any, exp: Dict, run: Dict, env: Dict,
     vf_loss_coeff = _param["vf_loss_coeff"]
     entropy_coeff = _param["entropy_coeff"]
     vf_clip_param = _param["vf_clip_param"]
+    exp['agent_update_threads'] = _param['agent_update_threads']
     back_up_config = merge_dicts(exp, env)
     back_up_config.pop("algo_args")  # clean for grid_search
 
     config = {
+        "sample_learn_overlap": exp["sample_learn_overlap"],
         "batch_mode": batch_mode,
         "use_gae": use_gae,
         "lambda": gae_lambda,
@@ -111,6 +114,7 @@ def run_hatrpo(model: Any, exp: Dict, run: Dict, env: Dict,
         },
     }
     config.update(run)
+    config = plan_learner_batches(config, exp, env)
 
     algorithm = exp["algorithm"]
     arch = exp["model_arch_args"]["core_arch"]
@@ -27,6 +27,7 @@ from ray.rllib.models import ModelCatalog
 from marllib.marl.algos.core.CC.matrpo import MATRPOTrainer
 from marllib.marl.algos.utils.log_dir_util import available_local_dir
 from marllib.marl.algos.utils.setup_utils import AlgVar
+from marllib.marl.algos.utils.batch_planner import plan_learner_batches
 from marllib.marl.algos.utils.trust_regions import TrustRegionUpdator
 from marllib.marl.algos.scripts.coma import restore_model
 import json
@@ -89,6 +90,7 @@ def run_matrpo(model: Any, exp: Dict, run: Dict, env: Dict,
     back_up_config.pop("algo_args")  # clean for grid_search
 
     config = {
+        "sample_learn_overlap": exp["sample_learn_overlap"],
         "batch_mode": batch_mode,
         "use_gae": use_gae,
         "lambda": gae_lambda,
@@ -108,6 +110,7 @@ def run_matrpo(model: Any, exp: Dict, run: Dict, env: Dict,
         },
     }
     config.update(run)
+    config = plan_learner_batches(config, exp, env)
 
     algorithm = exp["algorithm"]
     map_name = exp["env_args"]["map_name"]
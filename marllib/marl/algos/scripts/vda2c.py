@@ -70,6 +70,7 @@ def run_vda2c(model: Any, exp: Dict, run: Dict, env: Dict,
     back_up_config.pop("algo_args")  # clean for grid_search
 
     config = {
+        "sample_learn_overlap": exp["sample_learn_overlap"],
         "train_batch_size": train_batch_size,
         "batch_mode": batch_mode,
         "use_gae": use_gae,
@@ -26,6 +26,7 @@ from ray.tune import CLIReporter
 from ray.rllib.models import ModelCatalog
 from marllib.marl.algos.core.VD.vdppo import VDPPOTrainer
 from marllib.marl.algos.utils.setup_utils import AlgVar
+from marllib.marl.algos.utils.batch_planner import plan_learner_batches
 from marllib.marl.algos.utils.log_dir_util import available_local_dir
 from marllib.marl.algos.scripts.coma import restore_model
 import json
@@ -81,6 +82,7 @@ def run_vdppo(model: Any, exp: Dict, run: Dict, env: Dict,
     back_up_config.pop("algo_args")  # clean for grid_search
 
     config = {
+        "sample_learn_overlap": exp["sample_learn_overlap"],
         "batch_mode": batch_mode,
         "train_batch_size": train_batch_size,
         "sgd_minibatch_size": sgd_minibatch_size,
@@ -101,6 +103,7 @@ def run_vdppo(model: Any, exp: Dict, run: Dict, env: Dict,
     }
 
     config.update(run)
+    config = plan_learner_batches(config, exp, env)
 
     algorithm = exp["algorithm"]
     map_name = exp["env_args"]["map_name"]
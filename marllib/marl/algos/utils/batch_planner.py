@@ -0,0 +1,304 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+startup batch planner for the on-policy run_* scripts: profile the actor/critic model once on a dummy batch and
+size sgd_minibatch_size / num_sgd_iter / rollout_fragment_length for a target learner time per iteration
+"""
+
+import contextlib
+import logging
+import math
+import time
+
+import numpy as np
+from gym.spaces import Box, MultiDiscrete
+
+from ray.rllib.models import ModelCatalog, MODEL_DEFAULTS
+from ray.rllib.utils.framework import try_import_torch
+from ray.tune.utils import merge_dicts
+
+torch, nn = try_import_torch()
+
+logger = logging.getLogger(__name__)
+
+MIN_MINIBATCH = 128
+
+
+def _dummy_obs(obs_space, n_samples, device, key=None):
+    """
+    a dummy batch laid out like restore_original_dimensions leaves it: one tensor per sub-space of a dict space
+    (obs / state / action_mask), all actions allowed
+    """
+    if isinstance(getattr(obs_space, "spaces", None), dict):
+        return {k: _dummy_obs(space, n_samples, device, k) for k, space in obs_space.spaces.items()}
+    if key == "action_mask":
+        return torch.ones((n_samples,) + obs_space.shape, device=device)
+    return torch.rand((n_samples,) + obs_space.shape, device=device)
+
+
+def _flatten_obs(obs):
+    if isinstance(obs, dict):
+        return torch.cat([_flatten_obs(obs[k]) for k in sorted(obs)], -1)
+    return obs.reshape(obs.shape[0], -1)
+
+
+def _critic_values(model, n_samples, device):
+    """
+    value predictions of the critic the algorithm loss trains: the centralized value function of the CC models
+    (fed the postprocessed "state" and opponent actions), the mixer over all agents values of the VD models,
+    the local value branch otherwise
+    """
+    custom_config = model.custom_config
+    n_agents = custom_config["num_agents"]
+    space_obs = custom_config["space_obs"]
+    obs_dim = int(np.prod(space_obs["obs"].shape))
+
+    if hasattr(model, "central_value_function"):
+        if custom_config["global_state_flag"]:
+            state = torch.rand(n_samples, int(np.prod(space_obs["state"].shape)) + obs_dim, device=device)
+        else:
+            state = torch.rand(n_samples, n_agents, obs_dim, device=device)
+        opponent_actions = None
+        if custom_config["opp_action_in_cc"]:
+            space_act = custom_config["space_act"]
+            if isinstance(space_act, Box):
+                opponent_actions = torch.rand(n_samples, n_agents - 1, space_act.shape[0], device=device)
+            elif isinstance(space_act, MultiDiscrete):
+                opponent_actions = torch.zeros(n_samples, n_agents - 1, len(space_act.nvec), device=device)
+            else:
+                opponent_actions = torch.zeros(n_samples, n_agents - 1, device=device)
+        return model.central_value_function(state, opponent_actions)
+
+    if hasattr(model, "mixing_value"):
+        if custom_config["global_state_flag"]:
+            state = torch.rand(n_samples, int(np.prod(space_obs["state"].shape)), device=device)
+        else:
+            state = torch.rand(n_samples, n_agents, obs_dim, device=device)
+        opponent_vf_preds = torch.rand(n_samples, n_agents - 1, device=device)
+        all_vf_pred = torch.cat((model.value_function().unsqueeze(1), opponent_vf_preds), 1)
+        return model.mixing_value(all_vf_pred, state)
+
+    return model.value_function()
+
+
+def _forward_backward(model, n_seq, max_seq_len, device):
+    """
+    one forward + backward of the policy head and the trained critic over n_seq full-length sequences
+    Returns:
+        bytes saved for backward, None on torch builds without saved tensor hooks
+    """
+    saved_bytes = [0]
+
+    def pack(tensor):
+        saved_bytes[0] += tensor.numel() * tensor.element_size()
+        return tensor
+
+    if hasattr(torch.autograd.graph, "saved_tensors_hooks"):
+        count_saved = torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor)
+    else:
+        count_saved, saved_bytes[0] = contextlib.nullcontext(), None
+
+    n_samples = n_seq * max_seq_len
+    state = [s.unsqueeze(0).repeat(n_seq, *([1] * s.dim())) for s in model.get_initial_state()]
+    seq_lens = torch.full((n_seq,), max_seq_len, dtype=torch.int32, device=device) if state else None
+    obs = _dummy_obs(getattr(model.obs_space, "original_space", model.obs_space), n_samples, device)
+    input_dict = {"obs": obs, "obs_flat": _flatten_obs(obs)}
+    with count_saved:
+        # forward directly, the obs are already restored to the original (dict) space
+        logits, _ = model.forward(input_dict, state, seq_lens)
+        loss = logits.float().clamp(-1e6, 1e6).sum() + _critic_values(model, n_samples, device).sum()
+    loss.backward()
+    model.zero_grad(set_to_none=True)
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    return saved_bytes[0]
+
+
+def _build_probe_model(obs_space, action_space, model_config, device):
+    prep = ModelCatalog.get_preprocessor_for_space(obs_space)
+    # the models read obs_space["obs"] etc. from original_space, as on the rollout workers
+    model_obs_space = prep.observation_space
+    model_obs_space.original_space = obs_space
+    _, num_outputs = ModelCatalog.get_action_dist(action_space, model_config, framework="torch")
+    model = ModelCatalog.get_model_v2(model_obs_space, action_space, num_outputs, model_config,
+                                      framework="torch", name="batch_planner_probe").to(device)
+    model.train()
+    return model
+
+
+def profile_model_cost(obs_space, action_space, model_config, device, probe_samples=(256, 2048), repeats=3):
+    """
+    measure the learner cost of one minibatch as fixed_ms + n_samples * per_sample_ms
+    Args:
+        :param obs_space: per-agent observation space
+        :param action_space: per-agent action space
+        :param model_config: rllib model config with the registered custom model
+        :param device: torch device the learner runs on
+        :param probe_samples: two probe sizes, rounded up to whole sequences of max_seq_len for rnn models
+        :param repeats: timed runs per probe size, the fastest is kept
+    Returns:
+        fixed_ms, per_sample_ms, per_sample_bytes (None when activation memory could not be measured)
+    """
+    model_config = merge_dicts(MODEL_DEFAULTS, model_config)
+    model = _build_probe_model(obs_space, action_space, model_config, device)
+
+    max_seq_len = model_config["max_seq_len"] if model.get_initial_state() else 1
+    samples, costs, saved = [], [], []
+    for n_samples in probe_samples:
+        seqs = max(1, math.ceil(n_samples / max_seq_len))
+        _forward_backward(model, seqs, max_seq_len, device)  # warm up
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            saved_bytes = _forward_backward(model, seqs, max_seq_len, device)
+            best = min(best, (time.perf_counter() - start) * 1e3)
+        samples.append(seqs * max_seq_len)
+        costs.append(best)
+        saved.append(saved_bytes)
+
+    per_sample_ms = max((costs[1] - costs[0]) / (samples[1] - samples[0]), 1e-6)
+    fixed_ms = max(costs[0] - per_sample_ms * samples[0], 0.0)
+    per_sample_bytes = None
+    if saved[0] is not None:
+        per_sample_bytes = max((saved[1] - saved[0]) / (samples[1] - samples[0]), 1.0)
+    return fixed_ms, per_sample_ms, per_sample_bytes
+
+
+def plan_batches(train_batch_size, num_sgd_iter, episode_limit, fixed_ms, per_sample_ms, per_sample_bytes,
+                 target_ms, memory_budget_bytes=None, num_rollout_envs=1, truncate_episodes=True,
+                 policy_rows=None, num_policies=1):
+    """
+    smallest sgd minibatch whose num_sgd_iter epochs over every policy batch fit in target_ms and whose activations
+    fit in the memory budget. if even the largest minibatch that fits in memory misses the target, num_sgd_iter is
+    cut to what fits
+    Args:
+        :param train_batch_size: env steps per training iteration, left unchanged
+        :param num_sgd_iter: epochs over the train batch asked for by the algorithm config
+        :param episode_limit: minibatches never go below it, see ray-project/ray#20743
+        :param fixed_ms: per-minibatch overhead from profile_model_cost
+        :param per_sample_ms: per-sample forward + backward time from profile_model_cost
+        :param per_sample_bytes: per-sample activation memory from profile_model_cost, None if unknown
+        :param target_ms: learner time per training iteration to aim for
+        :param memory_budget_bytes: activation memory cap for one minibatch, None for no cap
+        :param num_rollout_envs: num_workers * num_envs_per_worker sampling in parallel
+        :param truncate_episodes: whether rollout_fragment_length applies to the batch_mode
+        :param policy_rows: agent rows one policy trains on per iteration, train_batch_size if None
+        :param num_policies: policies trained one after another, each on policy_rows rows
+    Returns:
+        dict with sgd_minibatch_size, num_sgd_iter, rollout_fragment_length (None when not planned)
+        and the estimated learner_ms
+    """
+    policy_rows = policy_rows or train_batch_size
+    floor = max(episode_limit, min(MIN_MINIBATCH, policy_rows))
+    candidates = []
+    size = floor
+    while size < policy_rows:
+        candidates.append(size)
+        size *= 2
+    candidates.append(max(policy_rows, floor))
+
+    def epoch_ms(minibatch):
+        return num_policies * (math.ceil(policy_rows / minibatch) * fixed_ms + policy_rows * per_sample_ms)
+
+    if memory_budget_bytes is None or per_sample_bytes is None:
+        fitting = candidates
+    else:
+        fitting = [m for m in candidates if m * per_sample_bytes <= memory_budget_bytes]
+    if not fitting:
+        fitting = candidates[:1]
+    within_target = [m for m in fitting if num_sgd_iter * epoch_ms(m) <= target_ms]
+    if within_target:
+        minibatch = within_target[0]
+    else:
+        minibatch = fitting[-1]
+        num_sgd_iter = max(1, int(target_ms // epoch_ms(minibatch)))
+
+    rollout_fragment_length = None
+    if truncate_episodes:
+        rollout_fragment_length = max(1, math.ceil(train_batch_size / max(1, num_rollout_envs)))
+
+    return {
+        "sgd_minibatch_size": minibatch,
+        "num_sgd_iter": num_sgd_iter,
+        "rollout_fragment_length": rollout_fragment_length,
+        "learner_ms": num_sgd_iter * epoch_ms(minibatch),
+    }
+
+
+def plan_learner_batches(config, exp, env):
+    """
+    rewrite the batch keys of an on-policy trainer config from a startup profile of its model.
+    a no-op unless exp["learner_time_target_ms"] > 0
+    Args:
+        :param config: trainer config built by the run_* script, after config.update(run)
+        :param exp: experiment settings (ray.yaml + algo args)
+        :param env: env info with space_obs / space_act / episode_limit / num_agents
+    Returns:
+        config with sgd_minibatch_size, num_sgd_iter and rollout_fragment_length planned
+    """
+    target_ms = float(exp.get("learner_time_target_ms", 0))
+    if target_ms <= 0 or not isinstance(config["num_sgd_iter"], int):
+        return config
+
+    use_gpu = bool(config.get("num_gpus", 0)) and torch.cuda.is_available()
+    device = torch.device("cuda" if use_gpu else "cpu")
+    memory_budget_bytes = float(exp.get("learner_memory_mb", 0)) * 2 ** 20 or None
+    if memory_budget_bytes is None and use_gpu:
+        memory_budget_bytes = torch.cuda.mem_get_info(device)[0] / 2
+
+    # every agent mapped to a policy adds a row to its batch per env step, unless the batch counts agent steps
+    num_policies = max(1, len(config["multiagent"].get("policies") or ()))
+    if config["multiagent"].get("count_steps_by", "env_steps") == "agent_steps":
+        policy_rows = max(1, config["train_batch_size"] // num_policies)
+    else:
+        policy_rows = max(1, config["train_batch_size"] * env["num_agents"] // num_policies)
+
+    fixed_ms, per_sample_ms, per_sample_bytes = profile_model_cost(
+        env["space_obs"], env["space_act"], config["model"], device)
+    plan = plan_batches(
+        train_batch_size=config["train_batch_size"],
+        num_sgd_iter=config["num_sgd_iter"],
+        episode_limit=env["episode_limit"],
+        fixed_ms=fixed_ms,
+        per_sample_ms=per_sample_ms,
+        per_sample_bytes=per_sample_bytes,
+        target_ms=target_ms,
+        memory_budget_bytes=memory_budget_bytes,
+        num_rollout_envs=max(1, config.get("num_workers", 1)) * config.get("num_envs_per_worker", 1),
+        truncate_episodes=config.get("batch_mode") == "truncate_episodes",
+        policy_rows=policy_rows,
+        num_policies=num_policies,
+    )
+
+    logger.info(
+        "batch plan on %s: %.3f ms + %.4f ms/sample, %s KB/sample, %d policies x %d rows -> sgd_minibatch_size %d "
+        "(was %d), num_sgd_iter %d (was %d), rollout_fragment_length %s, ~%.0f ms learner time per iteration "
+        "(target %.0f)", device, fixed_ms, per_sample_ms,
+        "?" if per_sample_bytes is None else "{:.1f}".format(per_sample_bytes / 1024), num_policies, policy_rows,
+        plan["sgd_minibatch_size"], config["sgd_minibatch_size"], plan["num_sgd_iter"], config["num_sgd_iter"],
+        plan["rollout_fragment_length"], plan["learner_ms"], target_ms)
+
+    config = dict(config, sgd_minibatch_size=plan["sgd_minibatch_size"], num_sgd_iter=plan["num_sgd_iter"])
+    if plan["rollout_fragment_length"] is not None:
+        config["rollout_fragment_length"] = plan["rollout_fragment_length"]
+    return config
@@ -29,6 +29,7 @@ from ray.rllib.utils.torch_ops import convert_to_torch_tensor
 from ray.rllib.utils.numpy import convert_to_numpy
 from ray.rllib.policy.rnn_sequencing import pad_batch_to_sequences_of_same_size
 import copy
+from marllib.marl.algos.utils.agent_rows import drop_padding_rows, stack_agent_rows, next_opponent_actions
 
 torch, nn = try_import_torch()
 
@@ -170,17 +171,30 @@ def before_learn_on_batch(multi_agent_batch, policies, train_batch_size):
         custom_config = policy.config["model"]["custom_model_config"]
         obs_dim = get_dim(custom_config["space_obs"]["obs"].shape)
         global_state_flag = custom_config["global_state_flag"]
-        n_agents = custom_config["num_agents"]
-
-        policy_batch = copy.deepcopy(multi_agent_batch.policy_batches[pid])
-        policy_batch["agent_index"] = policy_batch["agent_index"] + 1
-        pad_batch_to_sequences_of_same_size(
-            batch=policy_batch,
-            max_seq_len=policy.max_seq_len,
-            shuffle=False,
-            batch_divisibility_req=policy.batch_divisibility_req,
-            view_requirements=policy.view_requirements,
-        )
+        recurrent = custom_config["model_arch_args"]["core_arch"] in ["gru", "lstm"]
+
+        policy_batch = multi_agent_batch.policy_batches[pid]
+        if recurrent:
+            # rnn target actors need whole sequences, pad a copy and shift the agent index so padding is 0
+            policy_batch = copy.deepcopy(policy_batch)
+            policy_batch["agent_index"] = policy_batch["agent_index"] + 1
+            pad_batch_to_sequences_of_same_size(
+                batch=policy_batch,
+                max_seq_len=policy.max_seq_len,
+                shuffle=False,
+                batch_divisibility_req=policy.batch_divisibility_req,
+                view_requirements=policy.view_requirements,
+            )
+            if "state_in_2" not in policy_batch:
+                state_in = [convert_to_torch_tensor(policy_batch["state_in_0"], policy.device)]
+            else:
+                state_in = [convert_to_torch_tensor(policy_batch["state_in_0"], policy.device),
+                            convert_to_torch_tensor(policy_batch["state_in_1"], policy.device)]
+            seq_lens = convert_to_torch_tensor(policy_batch["seq_lens"], policy.device)
+        else:
+            # mlp target actors ignore state and seq_lens, the batch is used as is
+            state_in, seq_lens = [], None
+
         target_policy_model = policy.target_model.policy_model.to(policy.device)
         next_obs = policy_batch["new_obs"]
 
@@ -190,47 +204,22 @@ def before_learn_on_batch(multi_agent_batch, policies, train_batch_size):
             input_dict["obs"]["obs"] = next_obs[:, :obs_dim]
             input_dict["state"] = next_obs[:, obs_dim:]
 
-        if "state_in_2" not in policy_batch:
-            state_in = policy_batch["state_in_0"]
-            state_in = [convert_to_torch_tensor(state_in, policy.device)]
-        else:
-            state_in = [convert_to_torch_tensor(policy_batch["state_in_0"], policy.device),
-                        convert_to_torch_tensor(policy_batch["state_in_1"], policy.device)]
-
-        seq_lens = policy_batch["seq_lens"]
-
         input_dict = convert_to_torch_tensor(input_dict, policy.device)
-        seq_lens = convert_to_torch_tensor(seq_lens, policy.device)
 
+        # one forward over all agents of this policy
         next_action_out, _ = target_policy_model.forward(input_dict, state_in, seq_lens)
         next_action = target_policy_model.action_out_squashed(next_action_out)
         next_action = convert_to_numpy(next_action)
 
-        agent_id = np.unique(policy_batch["agent_index"])
-        for a_id in agent_id:
-            if a_id == 0:  # zero padding
-                continue
-            valid_flag = np.where(policy_batch["agent_index"] == a_id)[0]
-            next_action_one_agent = next_action[valid_flag, :]
-            all_agent_next_action.append(next_action_one_agent)
+        agent_index = policy_batch["agent_index"]
+        if recurrent:  # drop the zero padding
+            next_action, agent_index = drop_padding_rows(next_action, agent_index)
+        all_agent_next_action.append(stack_agent_rows(next_action, agent_index))
 
-    # construct opponent next action for each batch
-    all_agent_next_action = np.stack(all_agent_next_action, 1)
-    for pid, policy in policies.items():
-        policy_batch = multi_agent_batch.policy_batches[pid]
-        agent_id = np.unique(policy_batch["agent_index"])
-        agent_num = len(agent_id)
-        ls = []
-        for a in range(agent_num):
-            ls.append(all_agent_next_action)
-        next_action_batch = np.stack(ls, 1).reshape((policy_batch.count, n_agents, -1))
-        other_next_action_batch_ls = []
-        for i in range(policy_batch.count):
-            current_agent_id = policy_batch["agent_index"][i]
-            next_action_ts = next_action_batch[i]
-            other_next_action_ts = np.delete(next_action_ts, current_agent_id, axis=0)
-            other_next_action_batch_ls.append(other_next_action_ts)
-        other_next_action_batch = np.stack(other_next_action_batch_ls, 0)
+    # construct opponent next action for each batch with one gather
+    batch_agent_indices = [multi_agent_batch.policy_batches[pid]["agent_index"] for pid in policies]
+    for pid, other_next_action_batch in zip(policies, next_opponent_actions(all_agent_next_action,
+                                                                             batch_agent_indices)):
         multi_agent_batch.policy_batches[pid]["next_opponent_actions"] = other_next_action_batch
 
     return multi_agent_batch
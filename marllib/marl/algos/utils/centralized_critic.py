@@ -39,6 +39,19 @@ centralized critic postprocessing for
 """
 
 
+def select_taken_action_values(q_values, actions):
+    """
+    pick the Q value of the taken action from an all-action critic output
+    Args:
+        :param q_values: [B, n_actions] critic output
+        :param actions: [B] taken discrete actions
+    Returns:
+        [B] Q values of the taken actions
+    """
+    actions = np.asarray(actions).astype(np.int64).reshape(-1, 1)
+    return np.take_along_axis(q_values, actions, axis=1)[:, 0]
+
+
 class CentralizedValueMixin:
 
     def __init__(self):
@@ -107,25 +120,17 @@ def centralized_critic_postprocessing(policy,
                 [opponent_batch[i]["actions"] for i in range(opponent_agents_num)],
                 1)
 
-            if algorithm in ["coma"]:
-                sample_batch[SampleBatch.VF_PREDS] = policy.compute_central_vf(
-                    convert_to_torch_tensor(
-                        sample_batch["state"], policy.device),
-                    convert_to_torch_tensor(
-                        sample_batch["opponent_actions"], policy.device) if opp_action_in_cc else None,
-                ) \
-                    .cpu().detach().numpy()
-                sample_batch[SampleBatch.VF_PREDS] = np.take(sample_batch[SampleBatch.VF_PREDS],
-                                                             np.expand_dims(sample_batch["actions"], axis=1)).squeeze(
-                    axis=1)
-            else:
-                sample_batch[SampleBatch.VF_PREDS] = policy.compute_central_vf(
-                    convert_to_torch_tensor(
-                        sample_batch["state"], policy.device),
-                    convert_to_torch_tensor(
-                        sample_batch["opponent_actions"], policy.device) if opp_action_in_cc else None,
-                ) \
-                    .cpu().detach().numpy()
+            sample_batch[SampleBatch.VF_PREDS] = policy.compute_central_vf(
+                convert_to_torch_tensor(
+                    sample_batch["state"], policy.device),
+                convert_to_torch_tensor(
+                    sample_batch["opponent_actions"], policy.device) if opp_action_in_cc else None,
+            ) \
+                .cpu().detach().numpy()
+
+        if algorithm in ["coma"]:
+            sample_batch[SampleBatch.VF_PREDS] = select_taken_action_values(
+                sample_batch[SampleBatch.VF_PREDS], sample_batch[SampleBatch.ACTIONS])
 
     else:
         # Policy hasn't been initialized yet, use zeros.
@@ -21,6 +21,7 @@
 # SOFTWARE.
 
 from ray.rllib.utils.framework import try_import_torch
+from concurrent.futures import ThreadPoolExecutor
 import random
 from ray.rllib.policy.sample_batch import SampleBatch
 from ray.rllib.utils.torch_ops import sequence_mask
@@ -29,6 +30,8 @@ from marllib.marl.algos.utils.centralized_critic_hetero import get_global_name,
 
 torch, nn = try_import_torch()
 
+_AGENT_FORWARD_POOLS = {}
+
 
 def get_mask_and_reduce_mean(model, train_batch, dist_class):
     logits, state = model(train_batch)
@@ -120,17 +123,68 @@ class IterTrainBatch(SampleBatch):
 
         self.pat = re.compile(r'^state_in_(\d+)')
 
-def get_each_agent_train(model, policy, dist_class, train_batch):
+def agent_forward_pool(num_threads):
+    """
+    thread pool for the per-agent actor forwards, the torch intra-op threads of this process are split evenly
+    across its workers
+    Args:
+        :param num_threads: number of agents evaluated at once
+    Returns:
+        ThreadPoolExecutor shared by every heterogeneous update asking for the same width
+    """
+    if num_threads not in _AGENT_FORWARD_POOLS:
+        intra_op_threads = max(1, torch.get_num_threads() // num_threads)
+        _AGENT_FORWARD_POOLS[num_threads] = ThreadPoolExecutor(
+            max_workers=num_threads,
+            thread_name_prefix="agent_forward",
+            initializer=torch.set_num_threads,
+            initargs=(intra_op_threads,))
+    return _AGENT_FORWARD_POOLS[num_threads]
+
+
+def agent_forward(iter_model, iter_dist_class, iter_train_batch):
+    """
+    the part of one agent's update that does not depend on the other agents: its actor forward before its own
+    update and the ratio against the behaviour policy
+    """
+    iter_model.train()
+    iter_mask, iter_reduce_mean, iter_current_action_dist = get_mask_and_reduce_mean(
+        iter_model, iter_train_batch, iter_dist_class)
+    iter_logp_ratio = torch.exp(
+        iter_current_action_dist.logp(iter_train_batch[SampleBatch.ACTIONS]) -
+        iter_train_batch[SampleBatch.ACTION_LOGP]
+    )
+    return iter_mask, iter_reduce_mean, iter_current_action_dist, iter_logp_ratio
+
+
+def get_each_agent_train(model, policy, dist_class, train_batch, num_threads=0):
+    """
+    yield the agents in a random order together with their pre-update actor forward.
+    with num_threads > 1 all forwards are run up front on a thread pool, the caller keeps chaining
+    m_advantage and stepping each agent in order
+    """
     all_policies_with_names = list(model.other_policies.items()) + [('self', policy)]
     random.shuffle(all_policies_with_names)
 
+    agents = []
     for policy_name, iter_policy in all_policies_with_names:
         is_self = (policy_name == 'self')
         iter_model = [iter_policy.model, model][is_self]
         iter_dist_class = [iter_policy.dist_class, dist_class][is_self]
         iter_train_batch = [IterTrainBatch(train_batch, policy_name), train_batch][is_self]
-        iter_mask, iter_reduce_mean, current_action_dist = get_mask_and_reduce_mean(iter_model, iter_train_batch, dist_class)
+        agents.append((iter_model, iter_dist_class, iter_train_batch, iter_policy))
+
+    distinct_models = len({id(iter_model) for iter_model, _, _, _ in agents}) == len(agents)
+    if num_threads > 1 and len(agents) > 1 and distinct_models:
+        pool = agent_forward_pool(min(num_threads, len(agents)))
+        forwards = list(pool.map(lambda agent: agent_forward(*agent[:3]), agents))
+    else:
+        forwards = (agent_forward(*agent[:3]) for agent in agents)
+
+    for (iter_model, iter_dist_class, iter_train_batch, iter_policy), \
+            (iter_mask, iter_reduce_mean, iter_current_action_dist, iter_logp_ratio) in zip(agents, forwards):
         iter_actions = iter_train_batch[SampleBatch.ACTIONS]
         iter_prev_action_logp = iter_train_batch[SampleBatch.ACTION_LOGP]
 
-        yield iter_model, iter_dist_class, iter_train_batch, iter_mask, iter_reduce_mean, iter_actions, iter_policy, iter_prev_action_logp
+        yield iter_model, iter_dist_class, iter_train_batch, iter_mask, iter_reduce_mean, iter_actions, \
+            iter_policy, iter_prev_action_logp, iter_current_action_dist, iter_logp_ratio
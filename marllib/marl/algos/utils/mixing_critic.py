@@ -23,7 +23,6 @@
 from ray.rllib.evaluation.postprocessing import compute_advantages
 from ray.rllib.utils.framework import try_import_torch
 from ray.rllib.utils.torch_ops import convert_to_torch_tensor
-from copy import deepcopy
 from ray.rllib.policy.sample_batch import SampleBatch
 from ray.rllib.utils.numpy import convert_to_numpy
 import numpy as np
@@ -45,6 +44,57 @@ class MixingValueMixin:
         self.mixing_vf = "mixing"
 
 
+def team_mixing_values(team, agent_ids, state_dim, obs_dim, action_mask_dim):
+    """
+    mixer inputs and vf_tot of several agents of one team, one mixer call per policy.
+    each agent keeps its own view: its vf first, then its opponents in team order, aligned to its own batch
+    Args:
+        :param team: ordered {agent_id: (policy, batch)} of the whole team
+        :param agent_ids: agents to compute the values for
+        :param state_dim: global state dim, None to stack all agents obs as state
+        :param obs_dim: obs dim
+        :param action_mask_dim: action mask dim in front of obs
+
+    Returns:
+        {agent_id: (state, opponent_vf_preds, vf_tot)}
+    """
+    views = {}
+    for agent_id in agent_ids:
+        policy, sample_batch = team[agent_id]
+        opponent_batch = [align_batch(batch, sample_batch) for opponent_id, (_, batch) in team.items()
+                          if opponent_id != agent_id]
+        if state_dim:
+            state = sample_batch['obs'][:, action_mask_dim + obs_dim:]
+        else:  # all other agent obs as state
+            state = np.stack(
+                [sample_batch['obs'][:, action_mask_dim:action_mask_dim + obs_dim]] + [
+                    batch["obs"][:, action_mask_dim:action_mask_dim + obs_dim] for batch in opponent_batch], 1)
+        opponent_vf_preds = np.stack([batch["vf_preds"] for batch in opponent_batch], 1)
+        views[agent_id] = (state, opponent_vf_preds)
+
+    # agents sharing a policy share the mixer, their rows go through it together
+    policy_groups = {}
+    for agent_id in agent_ids:
+        policy_groups.setdefault(id(team[agent_id][0]), []).append(agent_id)
+
+    values = {}
+    for group in policy_groups.values():
+        policy = team[group[0]][0]
+        all_vf_preds = np.concatenate([np.concatenate(
+            (np.expand_dims(team[agent_id][1]["vf_preds"], axis=1), views[agent_id][1]), axis=1)
+            for agent_id in group])
+        state = np.concatenate([views[agent_id][0] for agent_id in group])
+        vf_tot = convert_to_numpy(policy.model.mixing_value(
+            convert_to_torch_tensor(all_vf_preds, policy.device),
+            convert_to_torch_tensor(state, policy.device)))
+        offset = 0
+        for agent_id in group:
+            length = len(team[agent_id][1])
+            values[agent_id] = views[agent_id] + (vf_tot[offset:offset + length],)
+            offset += length
+    return values
+
+
 # get opponent value vf
 def value_mixing_postprocessing(policy,
                                 sample_batch,
@@ -73,31 +123,34 @@ def value_mixing_postprocessing(policy,
     if (pytorch and hasattr(policy, "mixing_vf")) or \
             (not pytorch and policy.loss_initialized()):
         assert other_agent_batches is not None
-        opponent_batch_list = list(other_agent_batches.values())
-        raw_opponent_batch = [opponent_batch_list[i][1] for i in range(opponent_agents_num)]
-        opponent_batch = []
-        for one_opponent_batch in raw_opponent_batch:
-            one_opponent_batch = align_batch(one_opponent_batch, sample_batch)
-            opponent_batch.append(one_opponent_batch)
-
-        if state_dim:
-            sample_batch["state"] = sample_batch['obs'][:, action_mask_dim + obs_dim:]
-        else:  # all other agent obs as state
-            # sample_batch["state"] = sample_batch['obs'][:, action_mask_dim:action_mask_dim + obs_dim]
-            sample_batch["state"] = np.stack(
-                [sample_batch['obs'][:, action_mask_dim:action_mask_dim + obs_dim]] + [
-                    opponent_batch[i]["obs"][:, action_mask_dim:action_mask_dim + obs_dim] for i in
-                    range(opponent_agents_num)], 1)
-
-        sample_batch["opponent_vf_preds"] = np.stack(
-            [opponent_batch[i]["vf_preds"] for i in range(opponent_agents_num)], 1)
-
+        opponents = list(other_agent_batches.items())[:opponent_agents_num]
+        agent_name_ls = custom_config.get("agent_name_ls", [])
+        own_id = [agent_name for agent_name in agent_name_ls if agent_name not in other_agent_batches]
+
+        # the first agent of the team computes vf_tot for all its teammates, the rest pick theirs up from the episode
+        team_cache = episode.user_data.setdefault("team_mixing_values", {}) if episode is not None else {}
+        cached = team_cache.pop(own_id[0], None) if len(own_id) == 1 else None
+        if cached is not None and cached[0] is sample_batch:
+            state, opponent_vf_preds, vf_tot = cached[1]
+        elif len(own_id) == 1 and len(opponents) + 1 == len(agent_name_ls):
+            team = dict(opponents)
+            team[own_id[0]] = (policy, sample_batch)
+            team = {agent_name: team[agent_name] for agent_name in agent_name_ls}
+            values = team_mixing_values(team, list(team), state_dim, obs_dim, action_mask_dim)
+            state, opponent_vf_preds, vf_tot = values.pop(own_id[0])
+            team_cache.clear()
+            team_cache.update({agent_name: (team[agent_name][1], value) for agent_name, value in values.items()})
+        else:  # agent names unknown, mix this agent only
+            team = {None: (policy, sample_batch)}
+            team.update(opponents)
+            state, opponent_vf_preds, vf_tot = team_mixing_values(
+                team, [None], state_dim, obs_dim, action_mask_dim)[None]
+
+        sample_batch["state"] = state
+        sample_batch["opponent_vf_preds"] = opponent_vf_preds
         sample_batch["all_vf_preds"] = np.concatenate(
             (np.expand_dims(sample_batch["vf_preds"], axis=1), sample_batch["opponent_vf_preds"]), axis=1)
-
-        sample_batch["vf_tot"] = convert_to_numpy(policy.model.mixing_value(
-            convert_to_torch_tensor(sample_batch["all_vf_preds"], policy.device),
-            convert_to_torch_tensor(sample_batch["state"], policy.device)))
+        sample_batch["vf_tot"] = vf_tot
 
     else:
         # Policy hasn't been initialized yet, use zeros.
@@ -116,17 +169,12 @@ def value_mixing_postprocessing(policy,
             dtype=sample_batch["obs"].dtype)
         sample_batch["all_vf_preds"] = np.concatenate(
             (np.expand_dims(sample_batch["vf_preds"], axis=1), sample_batch["opponent_vf_preds"]), axis=1)
-
-        sample_batch["vf_tot"] = convert_to_numpy(policy.model.mixing_value(
-            convert_to_torch_tensor(sample_batch["all_vf_preds"], policy.device),
-            convert_to_torch_tensor(sample_batch["state"], policy.device)))
+        sample_batch["vf_tot"] = np.zeros_like(sample_batch["vf_preds"])
 
     completed = sample_batch["dones"][-1]
     if completed:
         last_r = 0.0
     else:
-        # if isinstance(sample_batch["vf_tot"], float):
-        #     print(1)
         last_r = sample_batch["vf_tot"][-1]
 
     train_batch = compute_advantages_vf_tot(
@@ -144,8 +192,8 @@ def compute_advantages_vf_tot(rollout: SampleBatch,
                               lambda_: float = 1.0,
                               use_gae: bool = True,
                               use_critic: bool = True):
-    # save the original vf
-    vf_saved = deepcopy(rollout[SampleBatch.VF_PREDS])
+    # save the original vf, compute_advantages only reads it so no copy is needed
+    vf_saved = rollout[SampleBatch.VF_PREDS]
     rollout[SampleBatch.VF_PREDS] = rollout["vf_tot"]
     rollout = compute_advantages(
         rollout,
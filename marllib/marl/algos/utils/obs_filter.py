@@ -0,0 +1,109 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+running mean / std normalization of the agent "obs" as an RLlib observation filter. RLlib syncs the filter
+statistics across rollout workers every iteration and saves them in the checkpoints, the state, action_mask...
+parts of the flattened observation pass through unchanged
+"""
+
+import functools
+from collections import OrderedDict
+
+import numpy as np
+from gym.spaces import Dict as GymDict, Tuple as GymTuple
+from ray.rllib.models import ModelCatalog
+from ray.rllib.utils.filter import MeanStdFilter
+
+
+def obs_key_mask(obs_space, key="obs"):
+    """
+    positions of `key` in the flattened observation RLlib builds for obs_space, found by running the RLlib
+    preprocessor itself so the layout always matches
+    Args:
+        :param obs_space: agent observation space, a Dict or a Tuple of Dicts for grouped agents
+        :param key: observation key to select
+
+    Returns:
+        np.ndarray: bool mask over the flattened observation
+    """
+    prep = ModelCatalog.get_preprocessor_for_space(obs_space)
+    template = obs_space.sample()
+
+    def fill(space, sample, value, selected=False):
+        if isinstance(space, GymDict):
+            return OrderedDict(
+                (k, fill(sub_space, sample[k], value, selected or k == key)) for k, sub_space in space.spaces.items())
+        if isinstance(space, GymTuple):
+            return tuple(fill(sub_space, x, value, selected) for sub_space, x in zip(space.spaces, sample))
+        if selected:
+            return np.clip(np.full(space.shape, value, dtype=space.dtype), space.low, space.high)
+        return sample
+
+    return prep.transform(fill(obs_space, template, 0.0)) != prep.transform(fill(obs_space, template, 1.0))
+
+
+class ObsKeyMeanStdFilter(MeanStdFilter):
+    """
+    MeanStdFilter normalizing only the masked part of the flattened observation
+    Args:
+        :param shape: flattened observation shape, given by RLlib
+        :param mask: bool mask of the normalized positions, see obs_key_mask
+    """
+
+    def __init__(self, shape, mask, demean=True, destd=True, clip=10.0):
+        super().__init__(shape, demean, destd, clip)
+        self.mask = np.asarray(mask, dtype=bool)
+        if self.mask.shape != tuple(shape):
+            raise ValueError("obs mask of shape {} for observations of shape {}".format(self.mask.shape, shape))
+
+    def __call__(self, x, update=True):
+        x = np.asarray(x)
+        normalized = super().__call__(x, update)
+        return np.where(self.mask, normalized, x).astype(x.dtype, copy=False)
+
+    def copy(self):
+        other = ObsKeyMeanStdFilter(self.shape, self.mask, self.demean, self.destd, self.clip)
+        other.sync(self)
+        return other
+
+    def as_serializable(self):
+        return self.copy()
+
+    def __repr__(self):
+        return "ObsKeyMeanStdFilter({}, {}, {}, {}, {}, {})".format(
+            self.shape, int(self.mask.sum()), self.demean, self.destd, self.clip, self.rs)
+
+
+def observation_filter(env_args, obs_space):
+    """
+    the observation_filter entry of the trainer config
+    Args:
+        :param env_args: env_args of the experiment, normalize_obs switches the filter on
+        :param obs_space: observation space of the policies
+
+    Returns:
+        "NoFilter" or a factory RLlib calls with the flattened observation shape
+    """
+    if not env_args.get("normalize_obs", False):
+        return "NoFilter"
+    return functools.partial(ObsKeyMeanStdFilter, mask=obs_key_mask(obs_space))
@@ -0,0 +1,122 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+
+from ray.rllib.agents.a3c.a2c import A2C_DEFAULT_CONFIG as A2C_CONFIG, execution_plan as a2c_execution_plan
+from ray.rllib.agents.ppo.ppo import DEFAULT_CONFIG as PPO_CONFIG, UpdateKL, warn_about_bad_reward_scales, \
+    execution_plan as ppo_execution_plan
+from ray.rllib.execution.metric_ops import StandardMetricsReporting
+from ray.rllib.execution.rollout_ops import ParallelRollouts, ConcatBatches, SelectExperiences, StandardizeFields
+from ray.rllib.execution.train_ops import TrainOneStep, MultiGPUTrainOneStep
+from ray.tune.utils import merge_dicts
+
+"""
+one-step-stale sampling/learning overlap for the on-policy trainers.
+
+the synchronous rllib plans sample with every remote worker, learn on the local worker, then broadcast weights, so
+either side idles while the other runs. with "sample_learn_overlap" the rollouts are gathered asynchronously:
+every remote worker keeps an iteration's worth of sample requests in flight while the learner trains on the
+previous batch. the weight broadcast at the end of a train step is queued behind those requests, so batch k+1 is
+sampled with the weights learned from batch k-1.
+"""
+
+OVERLAP_CONFIG = {
+    # sample the next train batch on the remote workers while the local worker learns on the current one
+    "sample_learn_overlap": False,
+}
+
+PPO_OVERLAP_CONFIG = merge_dicts(PPO_CONFIG, OVERLAP_CONFIG)
+A2C_OVERLAP_CONFIG = merge_dicts(A2C_CONFIG, OVERLAP_CONFIG)
+
+
+def _overlap_enabled(workers, config):
+    return config["sample_learn_overlap"] and bool(workers.remote_workers())
+
+
+def overlapped_rollouts(workers, config):
+    """
+    ParallelRollouts in async mode with enough requests in flight per remote worker to fill one train batch
+    Args:
+        :param workers: trainer WorkerSet, must have remote workers
+        :param config: trainer config
+    Returns:
+        LocalIterator over sample batches, in completion order
+    """
+    fragment = config["rollout_fragment_length"] * config["num_envs_per_worker"]
+    num_async = max(1, math.ceil(config["train_batch_size"] / (fragment * len(workers.remote_workers()))))
+    return ParallelRollouts(workers, mode="async", num_async=num_async)
+
+
+def ppo_overlap_execution_plan(*args, **kwargs):
+    """
+    rllib PPO execution plan, with the rollouts overlapped with learning when config["sample_learn_overlap"] is set
+    """
+    # rllib calls execution plans as (workers, config) or (trainer, workers, config) depending on the version
+    workers, config = args[-2:]
+    if not _overlap_enabled(workers, config):
+        return ppo_execution_plan(*args, **kwargs)
+
+    rollouts = overlapped_rollouts(workers, config) \
+        .for_each(SelectExperiences(workers.trainable_policies())) \
+        .combine(ConcatBatches(
+            min_batch_size=config["train_batch_size"],
+            count_steps_by=config["multiagent"]["count_steps_by"])) \
+        .for_each(StandardizeFields(["advantages"]))
+
+    if config["simple_optimizer"]:
+        train_op = rollouts.for_each(TrainOneStep(
+            workers,
+            num_sgd_iter=config["num_sgd_iter"],
+            sgd_minibatch_size=config["sgd_minibatch_size"]))
+    else:
+        train_op = rollouts.for_each(MultiGPUTrainOneStep(
+            workers=workers,
+            sgd_minibatch_size=config["sgd_minibatch_size"],
+            num_sgd_iter=config["num_sgd_iter"],
+            num_gpus=config["num_gpus"],
+            shuffle_sequences=config["shuffle_sequences"],
+            _fake_gpus=config["_fake_gpus"],
+            framework=config.get("framework")))
+
+    train_op = train_op.for_each(lambda t: t[1]).for_each(UpdateKL(workers))
+
+    return StandardMetricsReporting(train_op, workers, config) \
+        .for_each(lambda result: warn_about_bad_reward_scales(config, result))
+
+
+def a2c_overlap_execution_plan(*args, **kwargs):
+    """
+    rllib A2C execution plan, with the rollouts overlapped with learning when config["sample_learn_overlap"] is set.
+    microbatched A2C keeps the synchronous plan
+    """
+    workers, config = args[-2:]
+    if not _overlap_enabled(workers, config) or config["microbatch_size"]:
+        return a2c_execution_plan(*args, **kwargs)
+
+    train_op = overlapped_rollouts(workers, config) \
+        .combine(ConcatBatches(
+            min_batch_size=config["train_batch_size"],
+            count_steps_by=config["multiagent"]["count_steps_by"])) \
+        .for_each(TrainOneStep(workers))
+
+    return StandardMetricsReporting(train_op, workers, config)
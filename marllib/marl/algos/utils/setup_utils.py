@@ -20,10 +20,10 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import re
 from ray.rllib.agents.ppo.ppo_torch_policy import KLCoeffMixin
 from ray.rllib.policy.torch_policy import LearningRateSchedule, EntropyCoeffSchedule
 from ray.rllib.utils.framework import try_import_torch
+from marllib.marl.common import coerce_hyperparameter
 
 torch, nn = try_import_torch()
 
@@ -51,37 +51,26 @@ def setup_torch_mixins(policy, obs_space, action_space, config):
 
 
 class AlgVar(dict):
+    """
+    read-only view of exp["algo_args"] with every value coerced once on construction, lookups are plain dict reads.
+    pickles as its typed values, so it is cheap to ship to workers
+    """
+
     def __init__(self, base_dict: dict, key="algo_args"):
         key = key or list(base_dict.keys())[0]
-        super().__init__(base_dict[key])
+        super().__init__((name, coerce_hyperparameter(value)) for name, value in base_dict[key].items())
 
     def __getitem__(self, item):
-        expr = self.get(item, None)
-
-        if expr is None: raise KeyError(f'{item} not exists')
-        elif not isinstance(expr, str):
-            return expr
-        else:
-            float_express = (r'\d*\.\d*', float)
-            sci_float = (r'\d+\.?\d*e-\d+|\d+\.\d*e\d+', float)
-            sci_int = (r'\d+e\d+', lambda n: int(float(n)))
-            bool_express = (r'True|False', lambda s: s == 'True')
-            int_express = (r'\d+', int)
-
-            express_matches = [
-                float_express, sci_float, sci_int, bool_express, int_express
-            ]
-
-            value = expr
-
-            for pat, type_f in express_matches:
-                if re.search(pat, expr):
-                    value = type_f(expr)
-                    break
-
-            return value
-
-
+        value = self.get(item, None)
+        if value is None:
+            raise KeyError(f'{item} not exists')
+        return value
 
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("AlgVar is read-only, override hyperparameters in the yaml or on the command line")
 
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    update = pop = popitem = setdefault = clear = _read_only
 
+    def __reduce__(self):
+        return self.__class__, ({"algo_args": dict(self)},)
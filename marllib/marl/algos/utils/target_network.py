@@ -0,0 +1,98 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+target network synchronization shared by the off-policy algorithms (IQL / VDN / QMIX, IDDPG / MADDPG / FACMAC).
+The parameters and floating point buffers of a network pair are collected once into two flat lists,
+soft updates then run as two fused in-place foreach ops instead of rebuilding a state dict per update.
+"""
+
+from ray.rllib.utils.framework import try_import_torch
+
+torch, nn = try_import_torch()
+
+
+class TargetNetworkPair:
+    """
+    online / target network pair with in-place hard and soft (polyak) updates
+    Args:
+        :param source: online network
+        :param target: target network with the same state dict layout
+    """
+
+    def __init__(self, source, target):
+        source_state = source.state_dict(keep_vars=True)
+        target_state = target.state_dict(keep_vars=True)
+        self.float_pairs = ([], [])
+        self.other_pairs = ([], [])
+        for name, target_tensor in target_state.items():
+            pairs = self.float_pairs if target_tensor.is_floating_point() else self.other_pairs
+            pairs[0].append(target_tensor)
+            pairs[1].append(source_state[name])
+
+    @torch.no_grad()
+    def hard_update(self):
+        for targets, sources in (self.float_pairs, self.other_pairs):
+            if hasattr(torch, "_foreach_copy_"):
+                torch._foreach_copy_(targets, sources)
+            else:
+                for target, source in zip(targets, sources):
+                    target.copy_(source)
+
+    @torch.no_grad()
+    def soft_update(self, tau):
+        """
+        target = tau * source + (1 - tau) * target, integer buffers (e.g. batch norm counters) are copied
+        """
+        if tau >= 1.0:
+            return self.hard_update()
+        targets, sources = self.float_pairs
+        if targets:
+            torch._foreach_mul_(targets, 1.0 - tau)
+            torch._foreach_add_(targets, sources, alpha=tau)
+        for target, source in zip(*self.other_pairs):
+            target.copy_(source)
+
+
+def target_network_pair(owner, source, target):
+    """
+    the TargetNetworkPair of source and target, built on first use and kept on the owner (usually the policy).
+    Moving a network to another device replaces its buffers, so the pair is rebuilt when the device changes.
+    """
+    cache = owner.__dict__.setdefault("_target_network_pairs", {})
+    first = next(target.parameters(), None)
+    key = (id(source), id(target), None if first is None else first.device)
+    if key not in cache:
+        cache[key] = TargetNetworkPair(source, target)
+    return cache[key]
+
+
+class PolyakTargetNetworkMixin:
+    """
+    replaces the update_target of RLlib's DDPG TargetNetworkMixin, which rebuilds and reloads a full state dict
+    on every update, with in-place foreach updates. Must precede TargetNetworkMixin in the policy mixins.
+    """
+
+    def update_target(self, tau=None):
+        tau = tau or self.config.get("tau")
+        for target in self.target_models.values():
+            target_network_pair(self, self.model, target).soft_update(tau)
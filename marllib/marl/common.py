@@ -23,7 +23,8 @@
 import yaml
 import os
 import collections
-from typing import Dict
+import warnings
+from typing import Dict, List
 
 algo_type_dict = {
     "IL": ["ia2c", "iddpg", "itrpo", "ippo"],
@@ -98,10 +99,199 @@ def get_model_config(model_arch: str) -> Dict:
     Returns:
         Dict: model config dict
     """
-    with open(os.path.join(os.path.dirname(__file__), "models/configs", "{}.yaml".format(model_arch)),
-              "r") as f:
-        try:
-            config_dict = yaml.load(f, Loader=yaml.FullLoader)
-        except yaml.YAMLError as exc:
-            assert False, "{}.yaml error: {}".format(model_arch, exc)
+    try:
+        config_dict = load_yaml(os.path.join(os.path.dirname(__file__), "models/configs", "{}.yaml".format(model_arch)))
+    except yaml.YAMLError as exc:
+        assert False, "{}.yaml error: {}".format(model_arch, exc)
     return config_dict
+
+
+# path -> (mtime, parsed yaml), the parsed configs are never handed out directly
+_YAML_CACHE = {}
+# (path, section, overrides) -> (mtime, merged config)
+_MERGED_CONFIG_CACHE = {}
+
+
+def copy_config(config):
+    """
+    copy the dict / list structure of a parsed config, scalar leaves are shared
+    """
+    if isinstance(config, dict):
+        return {key: copy_config(value) for key, value in config.items()}
+    if isinstance(config, list):
+        return [copy_config(value) for value in config]
+    return config
+
+
+def load_yaml(path: str) -> Dict:
+    """
+    read a yaml config, each file is parsed once and parsed again only after it changes on disk
+    Args:
+        :param path: path of the yaml file
+
+    Returns:
+        Dict: a private copy of the config that the caller is free to update
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _YAML_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as f:
+            cached = (mtime, yaml.load(f, Loader=yaml.FullLoader))
+        _YAML_CACHE[path] = cached
+    return copy_config(cached[1])
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return type(value), value  # True, 1 and 1.0 hash alike but must not share a merged config
+
+
+def load_config(path: str, section: str = None, *overrides: Dict) -> Dict:
+    """
+    read a yaml config and update it with overrides, the merged result is memoized for identical overrides
+    Args:
+        :param path: path of the yaml file
+        :param section: key of the sub dict the overrides apply to, the whole config if None
+        :param overrides: dicts applied in order, only keys already in the config are allowed
+
+    Returns:
+        Dict: a private copy of the merged config that the caller is free to update
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    try:
+        key = (path, section, _freeze(overrides))
+        hash(key)
+    except TypeError:  # unhashable override values, merge without memo
+        key = None
+
+    cached = _MERGED_CONFIG_CACHE.get(key) if key is not None else None
+    if cached is not None and cached[0] == mtime:
+        return copy_config(cached[1])
+
+    config = load_yaml(path)
+    target = config if section is None else config[section]
+    for override in overrides:
+        dict_update(target, override, True)
+    if key is not None:
+        _MERGED_CONFIG_CACHE[key] = (mtime, copy_config(config))
+    return config
+
+
+def clear_config_cache():
+    _YAML_CACHE.clear()
+    _MERGED_CONFIG_CACHE.clear()
+
+
+def parse_user_args(params: List[str]) -> Dict[str, Dict]:
+    """
+    collect the --env_args.key=value, --algo_args.key=value and --ray_args.key(=value) overrides of a command line
+    Args:
+        :param params: command line, usually sys.argv
+
+    Returns:
+        Dict[str, Dict]: override dict for each of "env_args", "algo_args" and "ray_args"
+    """
+    user_args = {"env_args": {}, "algo_args": {}, "ray_args": {}}
+    for param in params:
+        for group, args in user_args.items():
+            if param.startswith("--{}.".format(group)):
+                key, has_value, value = param[len(group) + 3:].partition("=")
+                args[key] = value if has_value else True  # bare flags like --ray_args.local_mode
+    return user_args
+
+
+_BOOL_STRINGS = {"True": True, "False": False}
+
+
+def _is_grid_search(value) -> bool:
+    return isinstance(value, dict) and list(value) == ["grid_search"] and isinstance(value["grid_search"], list)
+
+
+def _is_tune_domain(value) -> bool:
+    # tune.uniform / tune.choice / tune.sample_from ..., sampled by tune itself, ray is not imported for the check
+    return type(value).__module__.startswith("ray.tune") or callable(getattr(value, "sample", None))
+
+
+def coerce_hyperparameter(value):
+    """
+    turn a string hyperparameter into bool / int / float. yaml keeps 1e-5 style floats as str and command line
+    overrides are all str, anything that is not a number or a bool is returned unchanged.
+    the choices of a tune.grid_search are coerced one by one, other tune search spaces are left to tune
+    Args:
+        :param value: raw hyperparameter
+
+    Returns:
+        the typed value
+    """
+    if _is_grid_search(value):
+        return {"grid_search": [coerce_hyperparameter(choice) for choice in value["grid_search"]]}
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if text in _BOOL_STRINGS:
+        return _BOOL_STRINGS[text]
+    if not any(char.isdigit() for char in text):
+        return value
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+    except ValueError:
+        return value
+    mantissa, _, exponent = text.lower().partition("e")
+    if exponent and "." not in mantissa and not exponent.startswith("-") and number.is_integer():
+        return int(number)  # 1e6 style step counts
+    return number
+
+
+def _type_matches(value, reference) -> bool:
+    if value is None or reference is None:  # None leaves the parameter to be tuned
+        return True
+    if _is_grid_search(value):
+        return all(_type_matches(choice, reference) for choice in value["grid_search"])
+    if _is_tune_domain(value) or _is_grid_search(reference) or _is_tune_domain(reference):
+        return True
+    if isinstance(reference, bool) or isinstance(value, bool):
+        return isinstance(reference, bool) and isinstance(value, bool)
+    if isinstance(reference, float):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(reference))
+
+
+def check_algo_args(algo_args: Dict, reference: Dict = None, source: str = "") -> Dict:
+    """
+    coerce every algo_args value once and check the result against a reference config,
+    normally the algorithm's hyperparams/common yaml
+    Args:
+        :param algo_args: merged algo_args of the yaml, function and command line overrides
+        :param reference: algo_args giving the expected keys and types, no checking if None
+        :param source: name of the config for the error messages
+
+    Returns:
+        Dict: a typed copy of algo_args
+
+    Raises:
+        ValueError: a key of the reference is missing or a value has the wrong type
+    """
+    typed = {key: coerce_hyperparameter(value) for key, value in algo_args.items()}
+    if reference is None:
+        return typed
+
+    reference = {key: coerce_hyperparameter(value) for key, value in reference.items()}
+    missing = [key for key in reference if key not in typed]
+    mistyped = ["{}={!r} (expected {})".format(key, typed[key], type(reference[key]).__name__)
+                for key in reference if key in typed and not _type_matches(typed[key], reference[key])]
+    if missing or mistyped:
+        raise ValueError("algo_args of {}: missing {}, wrong type {}".format(source, missing, mistyped))
+
+    unknown = [key for key in typed if key not in reference]
+    if unknown:
+        warnings.warn("algo_args of {}: {} not in the common config, passed through as is".format(source, unknown))
+    return typed
@@ -0,0 +1,390 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+lightweight policy inference for trained MARLlib checkpoints
+
+rebuilds only the agent models of a checkpoint from its params.json and the pickled policy weights,
+without starting ray, building the environment or constructing an RLlib Trainer and its workers
+"""
+
+from marllib.marl.models.registry import get_model_class
+from marllib.marl.algos.registry import ALGO_SPECS
+from gym.spaces import Box, Discrete, MultiDiscrete
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import pickle
+import torch
+import json
+import io
+
+JOINT_Q_ALGOS = ["iql", "vdn", "qmix"]
+JOINT_Q_POLICY_ID = "default_policy"
+
+# the rllib MODEL_DEFAULTS entries read by the agent models, params.json normally carries them already
+MODEL_DEFAULTS = {"fcnet_activation": "tanh", "max_seq_len": 20, "_time_major": False}
+
+# modules whose classes are really needed to read the policy weights and spaces of a checkpoint
+_CHECKPOINT_MODULES = ("builtins", "collections", "copyreg", "numpy", "gym")
+
+
+class _Placeholder:
+    """Stands in for every class of a checkpoint that is not needed for inference (policy classes,
+    filters, cloudpickled mixins...), so unpickling does not import ray or the trainers."""
+
+    def __new__(cls, *args, **kwargs):
+        obj = object.__new__(cls)
+        obj.args = args
+        return obj
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Placeholder(*args, **kwargs)
+
+    def __setstate__(self, state):
+        self.state = state
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    # not a security boundary, only load checkpoints you trust
+    def find_class(self, module, name):
+        if module.split(".")[0] in _CHECKPOINT_MODULES:
+            return super().find_class(module, name)
+        return type(name, (_Placeholder,), {"qualified_name": "{}.{}".format(module, name)})
+
+
+def _loads(data: bytes) -> Any:
+    return _CheckpointUnpickler(io.BytesIO(data)).load()
+
+
+class ObsNormalizer:
+    """The running mean / std an ObsKeyMeanStdFilter applied to the agent "obs" during training."""
+
+    def __init__(self, mean: np.ndarray, std: np.ndarray, clip: float = None, demean: bool = True,
+                 destd: bool = True):
+        self.mean = mean
+        self.std = std
+        self.clip = clip
+        self.demean = demean
+        self.destd = destd
+
+    @classmethod
+    def from_filter_state(cls, state: Dict):
+        # rllib RunningStat: count _n, mean _M and sum of squared deviations _S over the flattened observation
+        stat = state["rs"].state
+        n, mean, squares = stat["_n"], np.asarray(stat["_M"]), np.asarray(stat["_S"])
+        var = squares / (n - 1) if n > 1 else np.square(mean)
+        mask = np.asarray(state["mask"], dtype=bool)
+        return cls(mean[mask], np.sqrt(var)[mask], state["clip"], state["demean"], state["destd"])
+
+    def __call__(self, obs: np.ndarray) -> np.ndarray:
+        flat = np.asarray(obs, dtype=np.float64).reshape(obs.shape[0], -1)
+        if self.demean:
+            flat = flat - self.mean
+        if self.destd:
+            flat = flat / (self.std + 1e-8)
+        if self.clip:
+            flat = np.clip(flat, -self.clip, self.clip)
+        return flat.astype(np.float32).reshape(obs.shape)
+
+
+def load_checkpoint(model_path: str) -> Tuple:
+    """
+    read policy states, spaces and observation filters out of an RLlib trainer checkpoint
+    Args:
+        :param model_path: path of the checkpoint file, e.g. "checkpoint_000010/checkpoint-10"
+
+    Returns:
+        Tuple[Dict, Dict, Dict]: policy id -> policy state, policy id -> (observation space, action space),
+        policy id -> ObsNormalizer or None
+    """
+    with open(model_path, "rb") as f:
+        worker = _loads(_loads(f.read())["worker"])
+
+    normalizers = {}
+    for policy_id, obs_filter in worker["filters"].items():
+        filter_name = type(obs_filter).__name__
+        if filter_name == "ObsKeyMeanStdFilter":
+            normalizers[policy_id] = ObsNormalizer.from_filter_state(obs_filter.state)
+        elif filter_name == "NoFilter":
+            normalizers[policy_id] = None
+        else:
+            raise NotImplementedError("observation filter {} of {} not supported".format(filter_name, policy_id))
+
+    # PolicySpec(policy_class, observation_space, action_space, config)
+    spaces = {policy_id: spec.args[1:3] for policy_id, spec in worker["policy_specs"].items()}
+    return worker["state"], spaces, normalizers
+
+
+def build_policy_mapping_fn(custom_config: Dict) -> Callable:
+    """
+    rebuild the agent id -> policy id mapping used during training
+    Args:
+        :param custom_config: the "custom_model_config" of the experiment
+
+    Returns:
+        Callable: policy_mapping_fn(agent_id)
+    """
+    if custom_config["algorithm"] in JOINT_Q_ALGOS:
+        return lambda agent_id: JOINT_Q_POLICY_ID
+
+    agent_name_ls = custom_config["agent_name_ls"]
+    policy_mapping_info = custom_config["policy_mapping_info"]
+    if "all_scenario" in policy_mapping_info:
+        policy_mapping_info = policy_mapping_info["all_scenario"]
+    else:
+        policy_mapping_info = policy_mapping_info[custom_config["env_args"]["map_name"]]
+    shared_policy_name = "default_policy" if custom_config["agent_level_batch_update"] else "shared_policy"
+    share_policy = custom_config["share_policy"]
+
+    if custom_config["algorithm"] in ["happo", "hatrpo"] or share_policy == "individual":
+        return lambda agent_id: "policy_{}".format(agent_name_ls.index(agent_id))
+    elif share_policy == "all" or (share_policy == "group" and len(policy_mapping_info["team_prefix"]) == 1):
+        return lambda agent_id: shared_policy_name
+    elif share_policy == "group":
+        return lambda agent_id: "policy_{}_".format(agent_id.split("_")[0])
+    else:
+        raise ValueError("wrong share_policy {}".format(share_policy))
+
+
+class _ScriptablePolicy(torch.nn.Module):
+    """Tensor-only forward of an agent model, used for the TorchScript export."""
+
+    def __init__(self, model, obs_keys: List[str], joint_q: bool):
+        super().__init__()
+        self.model = model
+        self.obs_keys = obs_keys
+        self.joint_q = joint_q
+
+    def forward(self, obs: Dict[str, torch.Tensor], state: List[torch.Tensor]):
+        batch = obs[self.obs_keys[0]].shape[0]
+        input_dict = {"obs": obs, "obs_flat": obs["obs"]}
+        outputs, state = self.model.forward(input_dict, state, torch.ones(batch, dtype=torch.int32))
+        if self.joint_q and "action_mask" in obs:
+            outputs = outputs.masked_fill(obs["action_mask"] == 0, -float("inf"))
+        return outputs, state
+
+
+class InferencePolicy:
+    """Batched action computation of one policy of a checkpoint."""
+
+    def __init__(self, model, action_space, joint_q: bool, unsquash_actions: bool, epsilon: float = 0.0,
+                 obs_normalizer: ObsNormalizer = None):
+        self.model = model
+        self.obs_normalizer = obs_normalizer
+        self.action_space = action_space
+        self.joint_q = joint_q
+        self.unsquash_actions = unsquash_actions
+        self.epsilon = epsilon
+        self.device = next(model.parameters()).device
+        self.initial_state = [s[0] if s.dim() > 1 else s for s in model.get_initial_state()]
+
+    @torch.inference_mode()
+    def compute_actions(self, obs_batch: Dict[str, np.ndarray], state_batch: List[torch.Tensor],
+                        explore: bool = False) -> Tuple:
+        """
+        Args:
+            :param obs_batch: observation key -> [B, ...] array
+            :param state_batch: list of [B, hidden] recurrent states, empty for mlp models
+            :param explore: sample from the action distribution instead of taking the greedy action
+
+        Returns:
+            Tuple[np.ndarray, List[torch.Tensor]]: actions & next recurrent states
+        """
+        if self.obs_normalizer is not None:
+            obs_batch = dict(obs_batch, obs=self.obs_normalizer(np.asarray(obs_batch["obs"])))
+        obs = {key: torch.as_tensor(value, dtype=torch.float32, device=self.device) for key, value in
+               obs_batch.items()}
+        batch = obs["obs"].shape[0]
+        input_dict = {"obs": obs, "obs_flat": obs["obs"]}
+        outputs, state_batch = self.model.forward(input_dict, state_batch,
+                                                  torch.ones(batch, dtype=torch.int32))
+        if self.joint_q:
+            return self._q_actions(outputs, obs.get("action_mask"), explore), state_batch
+        return self._dist_actions(outputs, explore), state_batch
+
+    def _q_actions(self, q_values, action_mask, explore):
+        if action_mask is not None:
+            q_values = q_values.masked_fill(action_mask == 0, -float("inf"))
+        actions = q_values.argmax(-1)
+        if explore and self.epsilon > 0:
+            avail = torch.ones_like(q_values) if action_mask is None else action_mask
+            random_actions = torch.multinomial(avail, 1).squeeze(-1)
+            pick_random = torch.rand(actions.shape, device=actions.device) < self.epsilon
+            actions = torch.where(pick_random, random_actions, actions)
+        return actions.cpu().numpy()
+
+    def _dist_actions(self, outputs, explore):
+        if isinstance(self.action_space, Discrete):
+            if explore:
+                return torch.distributions.Categorical(logits=outputs).sample().cpu().numpy()
+            return outputs.argmax(-1).cpu().numpy()
+        elif isinstance(self.action_space, MultiDiscrete):
+            logits = torch.split(outputs, list(self.action_space.nvec), dim=-1)
+            if explore:
+                actions = [torch.distributions.Categorical(logits=logit).sample() for logit in logits]
+            else:
+                actions = [logit.argmax(-1) for logit in logits]
+            return torch.stack(actions, -1).cpu().numpy()
+        elif isinstance(self.action_space, Box):  # diagonal gaussian
+            mean, log_std = torch.chunk(outputs, 2, dim=-1)
+            actions = mean + torch.exp(log_std) * torch.randn_like(mean) if explore else mean
+            actions = actions.cpu().numpy()
+            if self.unsquash_actions:
+                low, high = self.action_space.low, self.action_space.high
+                actions = low + (np.clip(actions, -1.0, 1.0) + 1.0) * (high - low) / 2.0
+            return actions
+        else:
+            raise NotImplementedError("action space {} not supported".format(self.action_space))
+
+
+class InferenceRuntime:
+    """Serve all agents of a trained checkpoint, one batched forward pass per policy.
+
+    Recurrent states are cached per agent id and carried over between `compute_actions` calls until
+    `reset` is called, e.g. at the start of every episode.
+    """
+
+    def __init__(self, policies: Dict[str, InferencePolicy], policy_mapping_fn: Callable):
+        self.policies = policies
+        self.policy_mapping_fn = policy_mapping_fn
+        self.states = {}
+
+    @classmethod
+    def from_checkpoint(cls, params_path: str, model_path: str, device: str = "cpu"):
+        """
+        Args:
+            :param params_path: path of the experiment "params.json"
+            :param model_path: path of the checkpoint file
+            :param device: torch device to run the models on
+        """
+        with open(params_path, "r") as f:
+            params = json.load(f)
+        policy_states, policy_spaces, obs_normalizers = load_checkpoint(model_path)
+
+        custom_config = params["model"]["custom_model_config"]
+        algo_name = custom_config["algorithm"]
+        if algo_name in ["iddpg", "maddpg", "facmac"]:
+            raise NotImplementedError("inference runtime does not support the DDPG family ({})".format(algo_name))
+        core_arch = custom_config["model_arch_args"]["core_arch"]
+        model_class = get_model_class(algo_name, ALGO_SPECS[algo_name].algo_type, core_arch)
+        joint_q = algo_name in JOINT_Q_ALGOS
+
+        policies = {}
+        for policy_id, (obs_space, action_space) in policy_spaces.items():
+            full_obs_space = getattr(obs_space, "original_space", obs_space)
+            if joint_q and obs_normalizers.get(policy_id) is not None:
+                raise NotImplementedError("observation filter of grouped agents ({}) not supported".format(algo_name))
+            if joint_q:  # grouped agents, the model sees a single agent's "obs"
+                full_obs_space = full_obs_space.spaces[0]
+                action_space = action_space.spaces[0]
+                obs_space = full_obs_space.spaces["obs"]
+                num_outputs = action_space.n
+                weights = policy_states[policy_id]["model"]
+            else:
+                num_outputs = _num_outputs(action_space)
+                weights = policy_states[policy_id]["weights"]
+
+            model_config = dict(MODEL_DEFAULTS, **params["model"])
+            model_config["custom_model_config"] = dict(custom_config, space_obs=full_obs_space,
+                                                       space_act=action_space)
+            model = model_class(obs_space, action_space, num_outputs, model_config, policy_id)
+            model.load_state_dict({key: torch.as_tensor(value) for key, value in weights.items()})
+            model.to(device).eval()
+
+            policies[policy_id] = InferencePolicy(
+                model, action_space, joint_q, params.get("normalize_actions", True),
+                policy_states[policy_id].get("cur_epsilon", 0.0), obs_normalizers.get(policy_id))
+
+        return cls(policies, build_policy_mapping_fn(custom_config))
+
+    def reset(self, agent_ids: List[str] = None):
+        """Drop the cached recurrent states of `agent_ids`, or of every agent by default."""
+        if agent_ids is None:
+            self.states.clear()
+        else:
+            for agent_id in agent_ids:
+                self.states.pop(agent_id, None)
+
+    def compute_actions(self, obs: Dict[str, Any], explore: bool = False) -> Dict[str, Any]:
+        """
+        Args:
+            :param obs: agent id -> observation dict ({"obs": ..., "action_mask": ..., "state": ...})
+            :param explore: sample actions instead of acting greedily
+
+        Returns:
+            Dict[str, Any]: agent id -> action
+        """
+        agents_of_policy = {}
+        for agent_id in obs:
+            agents_of_policy.setdefault(self.policy_mapping_fn(agent_id), []).append(agent_id)
+
+        actions = {}
+        for policy_id, agent_ids in agents_of_policy.items():
+            policy = self.policies[policy_id]
+            obs_batch = {key: np.stack([np.asarray(obs[agent_id][key]) for agent_id in agent_ids]) for key in
+                         obs[agent_ids[0]]}
+            state_batch = [
+                torch.stack([self.states.get(agent_id, policy.initial_state)[i] for agent_id in agent_ids])
+                for i in range(len(policy.initial_state))]
+
+            policy_actions, state_batch = policy.compute_actions(obs_batch, state_batch, explore)
+
+            for i, agent_id in enumerate(agent_ids):
+                actions[agent_id] = policy_actions[i]
+                if policy.initial_state:
+                    self.states[agent_id] = [s[i] for s in state_batch]
+        return actions
+
+    def export_torchscript(self, policy_id: str, example_obs: Dict[str, np.ndarray], path: str):
+        """
+        trace the model of one policy into a TorchScript module, callable as
+        module(obs_dict, state_list) -> (logits or masked q values, next state_list).
+        the module takes "obs" after the observation filter, see InferencePolicy.obs_normalizer
+        Args:
+            :param policy_id: policy to export
+            :param example_obs: observation key -> [B, ...] example batch used for tracing
+            :param path: output file
+        """
+        policy = self.policies[policy_id]
+        obs = {key: torch.as_tensor(value, dtype=torch.float32, device=policy.device) for key, value in
+               example_obs.items()}
+        batch = obs["obs"].shape[0]
+        state = [s.unsqueeze(0).repeat(batch, *([1] * s.dim())) for s in policy.initial_state]
+        wrapper = _ScriptablePolicy(policy.model, list(obs.keys()), policy.joint_q)
+        with torch.no_grad():
+            traced = torch.jit.trace(wrapper, (obs, state), strict=False)
+        torch.jit.save(traced, path)
+        return traced
+
+
+def _num_outputs(action_space) -> int:
+    if isinstance(action_space, Discrete):
+        return action_space.n
+    elif isinstance(action_space, MultiDiscrete):
+        return int(np.sum(action_space.nvec))
+    elif isinstance(action_space, Box):  # mean & log std
+        return 2 * int(np.prod(action_space.shape))
+    else:
+        raise NotImplementedError("action space {} not supported".format(action_space))
@@ -20,4 +20,13 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .zoo import *
\ No newline at end of file
+from marllib.marl.models.registry import MODEL_CLASSES, load_model_class
+
+__all__ = list(MODEL_CLASSES)
+
+
+def __getattr__(name):
+    # model classes import rllib, load them on first access
+    if name in MODEL_CLASSES:
+        return load_model_class(name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,85 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+model registry: class name -> ``module:attr`` of the agent models, imported only when a model is picked,
+so choosing a model class does not load ray until the class itself is needed
+"""
+
+from marllib.marl.algos.registry import load_target
+from typing import Any
+
+_ZOO = "marllib.marl.models.zoo"
+
+MODEL_CLASSES = {
+    "BaseMLP": _ZOO + ".mlp.base_mlp:BaseMLP",
+    "CentralizedCriticMLP": _ZOO + ".mlp.cc_mlp:CentralizedCriticMLP",
+    "DDPGSeriesMLP": _ZOO + ".mlp.ddpg_mlp:DDPGSeriesMLP",
+    "JointQMLP": _ZOO + ".mlp.jointQ_mlp:JointQMLP",
+    "ValueDecompMLP": _ZOO + ".mlp.vd_mlp:ValueDecompMLP",
+    "BaseRNN": _ZOO + ".rnn.base_rnn:BaseRNN",
+    "CentralizedCriticRNN": _ZOO + ".rnn.cc_rnn:CentralizedCriticRNN",
+    "DDPGSeriesRNN": _ZOO + ".rnn.ddpg_rnn:DDPGSeriesRNN",
+    "JointQRNN": _ZOO + ".rnn.jointQ_rnn:JointQRNN",
+    "ValueDecompRNN": _ZOO + ".rnn.vd_rnn:ValueDecompRNN",
+    "QMixer": _ZOO + ".mixer.monotonic_mixer:QMixer",
+    "VDNMixer": _ZOO + ".mixer.sum_mixer:VDNMixer",
+}
+
+
+def load_model_class(name: str) -> Any:
+    """
+    import one class of `MODEL_CLASSES`
+    Args:
+        :param name: class name, e.g. "BaseMLP"
+
+    Returns:
+        Any: model class
+    """
+    return load_target(MODEL_CLASSES[name])
+
+
+def get_model_class(algo_name: str, algo_type: str, core_arch: str) -> Any:
+    """
+    pick the agent model class of an algorithm
+    Args:
+        :param algo_name: name of the algorithm
+        :param algo_type: learning style of the algorithm from ["IL", "CC", "VD"]
+        :param core_arch: core architecture of the model from ["mlp", "gru", "lstm"]
+
+    Returns:
+        Any: model class
+    """
+    arch = "RNN" if core_arch in ["gru", "lstm"] else "MLP"
+
+    if algo_name in ["iddpg", "facmac", "maddpg"]:
+        family = "DDPGSeries"
+    elif algo_name in ["qmix", "vdn", "iql"]:
+        family = "JointQ"
+    elif algo_type == "IL":
+        family = "Base"
+    elif algo_type == "CC":
+        family = "CentralizedCritic"
+    else:  # VD
+        family = "ValueDecomp"
+
+    return load_model_class(family + arch)
@@ -121,10 +121,10 @@ class CentralizedCriticMLP(BaseMLP):
                     opponent_actions_ls.append(torch.cat(opponent_action_ls, axis=1))
 
             else:
+                # one scatter for all opponents, same layout as concatenating per-agent one-hots
                 opponent_actions_ls = [
-                    torch.nn.functional.one_hot(opponent_actions[:, i].long(), self.num_outputs).float()
-                    for i in
-                    range(self.n_agents - 1)]
+                    torch.zeros(B, self.n_agents - 1, self.num_outputs, device=x.device).scatter_(
+                        2, opponent_actions.long().reshape(B, -1, 1), 1.0).reshape(B, -1)]
 
             x = torch.cat([x.reshape(B, -1)] + opponent_actions_ls, 1)
 
@@ -125,9 +125,9 @@ class BaseEnv(gym.Env):
         info = {"current_step": self.current_step}
         # apply actions
         action = self._unpack(action)
+        a_actions = self.task.normalize_actions(self, action)
         for agent_id in self.agents.keys():
-            a_action = self.task.normalize_action(self, agent_id, action[agent_id])
-            self.agents[agent_id].set_property_values(self.task.action_var, a_action)
+            self.agents[agent_id].set_property_values(self.task.action_var, a_actions[agent_id])
         # run simulation
         for _ in range(self.agent_interaction_steps):
             for sim in self._jsbsims.values():
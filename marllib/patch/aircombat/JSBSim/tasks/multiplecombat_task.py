@@ -8,7 +8,7 @@ from ..core.catalog import Catalog as c
 from ..core.simulatior import MissileSimulator
 from ..reward_functions import AltitudeReward, PostureReward, EventDrivenReward, MissilePostureReward
 from ..termination_conditions import ExtremeState, LowAltitude, Overload, Timeout, SafeReturn
-from ..utils.utils import get_AO_TA_R, LLA2NEU, get_root_dir
+from ..utils.utils import get_AO_TA_R, get_pairwise_AO_TA_R, LLA2NEU, get_root_dir
 from ..model.baseline_actor import BaselineActor
 
 
@@ -84,36 +84,67 @@ class MultipleCombatTask(SingleCombatTask):
 
     def get_obs(self, env, agent_id):
         norm_obs = np.zeros(self.obs_length)
+        snapshot = self.get_state_snapshot(env)
+        ego_index = self._agent_index[agent_id]
+        other_index = self._relative_index[agent_id]
         # (1) ego info normalization
-        ego_state = np.array(env.agents[agent_id].get_property_values(self.state_var))
-        ego_cur_ned = LLA2NEU(*ego_state[:3], env.center_lon, env.center_lat, env.center_alt)
-        ego_feature = np.array([*ego_cur_ned, *(ego_state[6:9])])
+        ego_state = snapshot["state"][ego_index]
         norm_obs[0] = ego_state[2] / 5000            # 0. ego altitude   (unit: 5km)
         norm_obs[1] = np.sin(ego_state[3])           # 1. ego_roll_sin
         norm_obs[2] = np.cos(ego_state[3])           # 2. ego_roll_cos
         norm_obs[3] = np.sin(ego_state[4])           # 3. ego_pitch_sin
         norm_obs[4] = np.cos(ego_state[4])           # 4. ego_pitch_cos
-        norm_obs[5] = ego_state[9] / 340             # 5. ego v_body_x   (unit: mh)
-        norm_obs[6] = ego_state[10] / 340            # 6. ego v_body_y   (unit: mh)
-        norm_obs[7] = ego_state[11] / 340            # 7. ego v_body_z   (unit: mh)
-        norm_obs[8] = ego_state[12] / 340            # 8. ego vc   (unit: mh)(unit: 5G)
+        norm_obs[5:9] = ego_state[9:13] / 340        # 5-8. ego v_body_x, v_body_y, v_body_z, vc   (unit: mh)
         # (2) relative inof w.r.t partner+enemies state
-        offset = 8
-        for sim in env.agents[agent_id].partners + env.agents[agent_id].enemies:
-            state = np.array(sim.get_property_values(self.state_var))
-            cur_ned = LLA2NEU(*state[:3], env.center_lon, env.center_lat, env.center_alt)
-            feature = np.array([*cur_ned, *(state[6:9])])
-            AO, TA, R, side_flag = get_AO_TA_R(ego_feature, feature, return_side=True)
-            norm_obs[offset+1] = (state[9] - ego_state[9]) / 340
-            norm_obs[offset+2] = (state[2] - ego_state[2]) / 1000
-            norm_obs[offset+3] = AO
-            norm_obs[offset+4] = TA
-            norm_obs[offset+5] = R / 10000
-            norm_obs[offset+6] = side_flag
-            offset += 6
+        state = snapshot["state"][other_index]
+        relative_obs = np.stack([
+            (state[:, 9] - ego_state[9]) / 340,
+            (state[:, 2] - ego_state[2]) / 1000,
+            snapshot["AO"][ego_index, other_index],
+            snapshot["TA"][ego_index, other_index],
+            snapshot["R"][ego_index, other_index] / 10000,
+            snapshot["side_flag"][ego_index, other_index],
+        ], axis=1)
+        offset = 9 + relative_obs.size
+        norm_obs[9:offset] = relative_obs.reshape(-1)
         norm_obs = np.clip(norm_obs, self.observation_space.low, self.observation_space.high)
         return norm_obs
 
+    def get_state_snapshot(self, env):
+        """Read every aircraft's state once and compute the pairwise relative geometry.
+
+        The snapshot is shared by all `get_obs` calls until the simulators advance, which
+        is detected through their simulation time.
+
+        Returns:
+            (dict):
+                - state: [N, 13] raw values of `state_var[:13]`
+                - feature: [N, 6] (north, east, up, v_north, v_east, v_down)
+                - AO, TA, R, side_flag: [N, N] relative geometry, row = ego, column = other
+        """
+        sims = list(env.agents.values())
+        snapshot_key = tuple(sim.get_sim_time() for sim in sims)
+        if self._snapshot is not None and self._snapshot_key == snapshot_key:
+            return self._snapshot
+        state = np.array([sim.get_property_values(self.state_var[:13]) for sim in sims])
+        cur_neu = LLA2NEU(state[:, 0], state[:, 1], state[:, 2], env.center_lon, env.center_lat, env.center_alt)
+        feature = np.concatenate((cur_neu.T, state[:, 6:9]), axis=1)
+        AO, TA, R, side_flag = get_pairwise_AO_TA_R(feature)
+        self._snapshot = {"state": state, "feature": feature, "AO": AO, "TA": TA, "R": R, "side_flag": side_flag}
+        self._snapshot_key = snapshot_key
+        return self._snapshot
+
+    def reset(self, env):
+        """Task-specific reset, build the agent index used by the state snapshot.
+        """
+        self._agent_index = {agent_id: index for index, agent_id in enumerate(env.agents.keys())}
+        self._relative_index = {
+            agent_id: np.array([self._agent_index[sim.uid] for sim in agent.partners + agent.enemies], dtype=np.int64)
+            for agent_id, agent in env.agents.items()}
+        self._snapshot = None
+        self._snapshot_key = None
+        return super().reset(env)
+
     def normalize_action(self, env, agent_id, action):
         """Convert discrete action index into continuous value.
         """
@@ -145,6 +176,9 @@ class HierarchicalMultipleCombatTask(MultipleCombatTask):
         self.norm_delta_altitude = np.array([0.1, 0, -0.1])
         self.norm_delta_heading = np.array([-np.pi / 6, -np.pi / 12, 0, np.pi / 12, np.pi / 6])
         self.norm_delta_velocity = np.array([0.05, 0, -0.05])
+        # 0~40 => -1~1 for aileron/elevator/rudder, 0~29 => 0.4~0.9 for throttle
+        self.lowlevel_action_scale = np.array([20., 20., 20., 58.])
+        self.lowlevel_action_bias = np.array([-1., -1., -1., 0.4])
 
     def load_action_space(self):
         self.action_space = spaces.MultiDiscrete([3, 5, 3])
@@ -152,36 +186,53 @@ class HierarchicalMultipleCombatTask(MultipleCombatTask):
     def normalize_action(self, env, agent_id, action):
         """Convert high-level action into low-level action.
         """
+        return self.normalize_actions(env, {agent_id: action})[agent_id]
+
+    def normalize_actions(self, env, actions):
+        """Convert high-level actions of all agents into low-level actions with one batched
+        forward of the low-level policy.
+        """
+        norm_acts = {}
+        agent_ids = []
+        for agent_id, action in actions.items():
+            if self.is_baseline_agent(env, agent_id):
+                norm_acts[agent_id] = self.baseline_agent.get_action(env.agents[agent_id])
+            else:
+                agent_ids.append(agent_id)
+        if len(agent_ids) == 0:
+            return norm_acts
         # generate low-level input_obs
-        raw_obs = self.get_obs(env, agent_id)
-        input_obs = np.zeros(12)
+        high_level_actions = np.array([actions[agent_id] for agent_id in agent_ids], dtype=np.int64)
+        input_obs = np.zeros((len(agent_ids), 12), dtype=np.float32)
         # (1) delta altitude/heading/velocity
-        input_obs[0] = self.norm_delta_altitude[action[0]]
-        input_obs[1] = self.norm_delta_heading[action[1]]
-        input_obs[2] = self.norm_delta_velocity[action[2]]
+        input_obs[:, 0] = self.norm_delta_altitude[high_level_actions[:, 0]]
+        input_obs[:, 1] = self.norm_delta_heading[high_level_actions[:, 1]]
+        input_obs[:, 2] = self.norm_delta_velocity[high_level_actions[:, 2]]
         # (2) ego info
-        input_obs[3:12] = raw_obs[:9]
-        input_obs = np.expand_dims(input_obs, axis=0)
+        for row, agent_id in enumerate(agent_ids):
+            input_obs[row, 3:12] = self.get_obs(env, agent_id)[:9]
         # output low-level action
-        _action, _rnn_states = self.lowlevel_policy(input_obs, self._inner_rnn_states[agent_id])
-        action = _action.detach().cpu().numpy().squeeze(0)
-        self._inner_rnn_states[agent_id] = _rnn_states.detach().cpu().numpy()
+        rnn_index = torch.as_tensor([self._agent_index[agent_id] for agent_id in agent_ids])
+        with torch.inference_mode():
+            _action, _rnn_states = self.lowlevel_policy(torch.from_numpy(input_obs), self._inner_rnn_states[rnn_index])
+            self._inner_rnn_states[rnn_index] = _rnn_states
         # normalize low-level action
-        norm_act = np.zeros(4)
-        norm_act[0] = action[0] / 20 - 1.
-        norm_act[1] = action[1] / 20 - 1.
-        norm_act[2] = action[2] / 20 - 1.
-        norm_act[3] = action[3] / 58 + 0.4
-        return norm_act
+        norm_act = _action.numpy() / self.lowlevel_action_scale + self.lowlevel_action_bias
+        norm_acts.update(zip(agent_ids, norm_act))
+        return norm_acts
+
+    def is_baseline_agent(self, env, agent_id):
+        """Whether agent_id is controlled by the baseline agent instead of the low-level policy.
+        """
+        return False
 
     def reset(self, env):
         """Task-specific reset, include reward function reset.
         """
-        self._inner_rnn_states = {agent_id: np.zeros((1, 1, 128)) for agent_id in env.agents.keys()}
+        self._inner_rnn_states = torch.zeros((len(env.agents), 1, 128))
         return super().reset(env)
 
 
-
 class HierarchicalMultipleCombatShootTask(HierarchicalMultipleCombatTask):
     def __init__(self, config: str):
         super().__init__(config)
@@ -206,45 +257,42 @@ class HierarchicalMultipleCombatShootTask(HierarchicalMultipleCombatTask):
 
     def get_obs(self, env, agent_id):
         norm_obs = np.zeros(self.obs_length)
+        snapshot = self.get_state_snapshot(env)
+        ego_index = self._agent_index[agent_id]
+        other_index = self._relative_index[agent_id]
         # (1) ego info normalization
-        ego_state = np.array(env.agents[agent_id].get_property_values(self.state_var))
-        ego_cur_ned = LLA2NEU(*ego_state[:3], env.center_lon, env.center_lat, env.center_alt)
-        ego_feature = np.array([*ego_cur_ned, *(ego_state[6:9])])
+        ego_state = snapshot["state"][ego_index]
         norm_obs[0] = ego_state[2] / 5000            # 0. ego altitude   (unit: 5km)
         norm_obs[1] = np.sin(ego_state[3])           # 1. ego_roll_sin
         norm_obs[2] = np.cos(ego_state[3])           # 2. ego_roll_cos
         norm_obs[3] = np.sin(ego_state[4])           # 3. ego_pitch_sin
         norm_obs[4] = np.cos(ego_state[4])           # 4. ego_pitch_cos
-        norm_obs[5] = ego_state[9] / 340             # 5. ego v_body_x   (unit: mh)
-        norm_obs[6] = ego_state[10] / 340            # 6. ego v_body_y   (unit: mh)
-        norm_obs[7] = ego_state[11] / 340            # 7. ego v_body_z   (unit: mh)
-        norm_obs[8] = ego_state[12] / 340            # 8. ego vc   (unit: mh)(unit: 5G)
+        norm_obs[5:9] = ego_state[9:13] / 340        # 5-8. ego v_body_x, v_body_y, v_body_z, vc   (unit: mh)
         # (2) relative inof w.r.t partner+enemies state
-        offset = 8
-        for sim in env.agents[agent_id].partners + env.agents[agent_id].enemies:
-            state = np.array(sim.get_property_values(self.state_var))
-            cur_ned = LLA2NEU(*state[:3], env.center_lon, env.center_lat, env.center_alt)
-            feature = np.array([*cur_ned, *(state[6:9])])
-            AO, TA, R, side_flag = get_AO_TA_R(ego_feature, feature, return_side=True)
-            norm_obs[offset+1] = (state[9] - ego_state[9]) / 340
-            norm_obs[offset+2] = (state[2] - ego_state[2]) / 1000
-            norm_obs[offset+3] = AO
-            norm_obs[offset+4] = TA
-            norm_obs[offset+5] = R / 10000
-            norm_obs[offset+6] = side_flag
-            offset += 6
+        state = snapshot["state"][other_index]
+        relative_obs = np.stack([
+            (state[:, 9] - ego_state[9]) / 340,
+            (state[:, 2] - ego_state[2]) / 1000,
+            snapshot["AO"][ego_index, other_index],
+            snapshot["TA"][ego_index, other_index],
+            snapshot["R"][ego_index, other_index] / 10000,
+            snapshot["side_flag"][ego_index, other_index],
+        ], axis=1)
+        offset = 9 + relative_obs.size
+        norm_obs[9:offset] = relative_obs.reshape(-1)
         norm_obs = np.clip(norm_obs, self.observation_space.low, self.observation_space.high)
         # (3) missile info TODO: multiple missile and parnter's missile?
         missile_sim = env.agents[agent_id].check_missile_warning() #
         if missile_sim is not None:
+            ego_feature = snapshot["feature"][ego_index]
             missile_feature = np.concatenate((missile_sim.get_position(), missile_sim.get_velocity()))
             ego_AO, ego_TA, R, side_flag = get_AO_TA_R(ego_feature, missile_feature, return_side=True)
-            norm_obs[offset + 1] = (np.linalg.norm(missile_sim.get_velocity()) - ego_state[9]) / 340
-            norm_obs[offset + 2] = (missile_feature[2] - ego_state[2]) / 1000
-            norm_obs[offset + 3] = ego_AO
-            norm_obs[offset + 4] = ego_TA
-            norm_obs[offset + 5] = R / 10000
-            norm_obs[offset + 6] = side_flag
+            norm_obs[offset + 0] = (np.linalg.norm(missile_sim.get_velocity()) - ego_state[9]) / 340
+            norm_obs[offset + 1] = (missile_feature[2] - ego_state[2]) / 1000
+            norm_obs[offset + 2] = ego_AO
+            norm_obs[offset + 3] = ego_TA
+            norm_obs[offset + 4] = R / 10000
+            norm_obs[offset + 5] = side_flag
         return norm_obs
 
     def reset(self, env):
@@ -255,9 +303,10 @@ class HierarchicalMultipleCombatShootTask(HierarchicalMultipleCombatTask):
         self._shoot_action = {agent_id: False for agent_id in env.agents.keys()}
         return super().reset(env)
 
-    def normalize_action(self, env, agent_id, action):
-        self._shoot_action[agent_id] = action[3] > 0
-        return super().normalize_action(env, agent_id, action[:3])
+    def normalize_actions(self, env, actions):
+        for agent_id, action in actions.items():
+            self._shoot_action[agent_id] = action[3] > 0
+        return super().normalize_actions(env, {agent_id: action[:3] for agent_id, action in actions.items()})
 
     def step(self, env):
         SingleCombatTask.step(self, env)
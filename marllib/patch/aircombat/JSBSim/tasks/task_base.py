@@ -120,3 +120,18 @@ class BaseTask(ABC):
         """Normalize action to be consistent with action space.
         """
         return np.array(action)
+
+    def normalize_actions(self, env, actions):
+        """Normalize the actions of all agents in one call.
+
+        Tasks whose action conversion can be batched across agents override this method,
+        the default simply applies `normalize_action` to every agent.
+
+        Args:
+            env: environment instance
+            actions: {agent_id: action}
+
+        Returns:
+            (dict): {agent_id: normalized action}
+        """
+        return {agent_id: self.normalize_action(env, agent_id, action) for agent_id, action in actions.items()}
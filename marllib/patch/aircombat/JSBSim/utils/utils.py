@@ -30,11 +30,11 @@ def LLA2NEU(lon, lat, alt, lon0=120.0, lat0=60.0, alt0=0):
     """Convert from Geodetic Coordinate System to NEU Coordinate System.
 
     Args:
-        lon, lat, alt (float): target geodetic lontitude(°), latitude(°), altitude(m)
+        lon, lat, alt (float or np.ndarray): target geodetic lontitude(°), latitude(°), altitude(m)
         lon, lat, alt (float): observer geodetic lontitude(°), latitude(°), altitude(m); Default=`(120°E, 60°N, 0m)`
 
     Returns:
-        (np.array): (North, East, Up), unit: m
+        (np.array): (North, East, Up), unit: m; shape [3, N] when array inputs of length N are given
     """
     n, e, d = pymap3d.geodetic2ned(lat, lon, alt, lat0, lon0, alt0)
     return np.array([n, e, -d])
@@ -82,6 +82,30 @@ def get_AO_TA_R(ego_feature, enm_feature, return_side=False):
         return ego_AO, ego_TA, R, side_flag
 
 
+def get_pairwise_AO_TA_R(features):
+    """Get AO & TA angles, relative distance and side flag between all pairs of agents at once.
+
+    Args:
+        features (np.ndarray): [N, 6] array of (north, east, down, vn, ve, vd), one row per agent
+
+    Returns:
+        (tuple): AO, TA, R, side_flag, each an [N, N] array whose entry [i, j]
+            equals `get_AO_TA_R(features[i], features[j], return_side=True)`
+    """
+    features = np.asarray(features, dtype=np.float64)
+    position, velocity = features[:, :3], features[:, 3:6]
+    delta = position[None, :, :] - position[:, None, :]  # [i, j] = position[j] - position[i]
+    R = np.linalg.norm(delta, axis=-1)
+    v = np.linalg.norm(velocity, axis=-1)
+
+    proj_dist = np.einsum('ijk,ik->ij', delta, velocity)
+    AO = np.arccos(np.clip(proj_dist / (R * v[:, None] + 1e-8), -1, 1))
+    proj_dist = np.einsum('ijk,jk->ij', delta, velocity)
+    TA = np.arccos(np.clip(proj_dist / (R * v[None, :] + 1e-8), -1, 1))
+    side_flag = np.sign(velocity[:, None, 0] * delta[..., 1] - velocity[:, None, 1] * delta[..., 0])
+    return AO, TA, R, side_flag
+
+
 def get2d_AO_TA_R(ego_feature, enm_feature, return_side=False):
     ego_x, ego_y, ego_z, ego_vx, ego_vy, ego_vz = ego_feature
     ego_v = np.linalg.norm([ego_vx, ego_vy])
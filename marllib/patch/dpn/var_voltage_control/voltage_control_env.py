@@ -16,6 +16,41 @@ def convert(dictionary):
     return namedtuple('GenericDict', dictionary.keys())(**dictionary)
 
 
+def convert_time_series(csv_path):
+    """convert a time series csv (first column is the time stamp) into the columnar binary cache
+    <name>.npy holds the [T, N] values and <name>_time.npy holds the datetime64 time index,
+    both are written to a temporary file and renamed so that concurrent workers never read a partial cache
+    """
+    data = pd.read_csv(csv_path, index_col=None)
+    time_index = pd.to_datetime(data.iloc[:, 0]).to_numpy(dtype="datetime64[ns]")
+    values = np.ascontiguousarray(data.iloc[:, 1:].to_numpy(dtype=np.float64))
+    prefix = os.path.splitext(csv_path)[0]
+    for path, array in [(prefix + ".npy", values), (prefix + "_time.npy", time_index)]:
+        tmp_path = f"{prefix}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    return values, time_index
+
+
+def load_time_series(csv_path):
+    """load a time series as (values, time_index)
+    the csv is converted once into the binary cache, after that every worker memory-maps the same read-only pages
+    """
+    prefix = os.path.splitext(csv_path)[0]
+    values_path, time_path = prefix + ".npy", prefix + "_time.npy"
+    cached = all(os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path)
+                 for path in [values_path, time_path])
+    if not cached:
+        try:
+            convert_time_series(csv_path)
+        except OSError:
+            # the data folder is read-only, keep the parsed data in memory instead
+            data = pd.read_csv(csv_path, index_col=None)
+            return data.iloc[:, 1:].to_numpy(dtype=np.float64), \
+                pd.to_datetime(data.iloc[:, 0]).to_numpy(dtype="datetime64[ns]")
+    return np.load(values_path, mmap_mode="r"), np.load(time_path)
+
+
 class ActionSpace(object):
     def __init__(self, low, high):
         self.low = low
@@ -52,7 +87,7 @@ class VoltageControl(MultiAgentEnv):
         # load the model of power network
         self.base_powergrid = self._load_network()
         
-        # load data
+        # load data, the raw data is shared read-only between workers and scaled on use
         self.pv_data = self._load_pv_data()
         self.active_demand_data = self._load_active_demand_data()
         self.reactive_demand_data = self._load_reactive_demand_data()
@@ -68,9 +103,9 @@ class VoltageControl(MultiAgentEnv):
         # define constraints and uncertainty
         self.v_upper = getattr(args, "v_upper", 1.05)
         self.v_lower = getattr(args, "v_lower", 0.95)
-        self.active_demand_std = self.active_demand_data.values.std(axis=0) / 100.0
-        self.reactive_demand_std = self.reactive_demand_data.values.std(axis=0) / 100.0
-        self.pv_std = self.pv_data.values.std(axis=0) / 100.0
+        self.active_demand_std = self.active_demand_data.std(axis=0) * self.args.demand_scale / 100.0
+        self.reactive_demand_std = self.reactive_demand_data.std(axis=0) * self.args.demand_scale / 100.0
+        self.pv_std = self.pv_data.std(axis=0) * self.args.pv_scale / 100.0
         self._set_reactive_power_boundary()
 
         # define action space and observation space
@@ -83,10 +118,12 @@ class VoltageControl(MultiAgentEnv):
         elif self.args.mode == "decentralised":
             self.n_actions = len(self.base_powergrid.sgen)
             self.n_agents = len( set( self.base_powergrid.bus["zone"].to_numpy(copy=True) ) ) - 1 # exclude the main zone
+        self._init_obs_index()
         agents_obs, state = self.reset()
 
         self.obs_size = agents_obs[0].shape[0]
         self.state_size = state.shape[0]
+        self._init_rollback_buffers()
         self.last_v = self.powergrid.res_bus["vm_pu"].sort_index().to_numpy(copy=True)
         self.last_q = self.powergrid.sgen["q_mvar"].to_numpy(copy=True)
 
@@ -101,7 +138,8 @@ class VoltageControl(MultiAgentEnv):
         self.steps = 1
         self.sum_rewards = 0
         if self.history > 1:
-            self.obs_history = {i: [] for i in range(self.n_agents)}
+            self._obs_history[:] = 0.
+            self._obs_history_pos = 0
 
         # reset the power grid
         self.powergrid = copy.deepcopy(self.base_powergrid)
@@ -142,7 +180,8 @@ class VoltageControl(MultiAgentEnv):
         self.steps = 1
         self.sum_rewards = 0
         if self.history > 1:
-            self.obs_history = {i: [] for i in range(self.n_agents)}
+            self._obs_history[:] = 0.
+            self._obs_history_pos = 0
 
         # reset the power grid
         self.powergrid = copy.deepcopy(self.base_powergrid)
@@ -179,7 +218,7 @@ class VoltageControl(MultiAgentEnv):
     def step(self, actions, add_noise=True):
         """function for the interaction between agent and the env each time step
         """
-        last_powergrid = copy.deepcopy(self.powergrid)
+        self._snapshot_powergrid()
 
         # check whether the power balance is unsolvable
         solvable = self._take_action(actions)
@@ -188,7 +227,7 @@ class VoltageControl(MultiAgentEnv):
             reward, info = self._calc_reward()
         else:
             q_loss = np.mean( np.abs(self.powergrid.sgen["q_mvar"]) )
-            self.powergrid = last_powergrid
+            self._rollback_powergrid()
             reward, info = self._calc_reward()
             reward -= 200.
             # keep q_loss
@@ -215,100 +254,49 @@ class VoltageControl(MultiAgentEnv):
         """return the global state for the power system
            the default state: voltage, active power of generators, bus state, load active power, load reactive power
         """
+        res_bus = self.powergrid.res_bus
         state = []
         if "demand" in self.state_space:
-            state += list(self.powergrid.res_bus["p_mw"].sort_index().to_numpy(copy=True))
-            state += list(self.powergrid.res_bus["q_mvar"].sort_index().to_numpy(copy=True))
+            state.append(res_bus["p_mw"].to_numpy()[self._bus_order])
+            state.append(res_bus["q_mvar"].to_numpy()[self._bus_order])
         if "pv" in self.state_space:
-            state += list(self.powergrid.sgen["p_mw"].sort_index().to_numpy(copy=True))
+            state.append(self.powergrid.sgen["p_mw"].to_numpy()[self._sgen_order])
         if "reactive" in self.state_space:
-            state += list(self.powergrid.sgen["q_mvar"].sort_index().to_numpy(copy=True))
+            state.append(self.powergrid.sgen["q_mvar"].to_numpy()[self._sgen_order])
         if "vm_pu" in self.state_space:
-            state += list(self.powergrid.res_bus["vm_pu"].sort_index().to_numpy(copy=True))
+            state.append(res_bus["vm_pu"].to_numpy()[self._bus_order])
         if "va_degree" in self.state_space:
-            state += list(self.powergrid.res_bus["va_degree"].sort_index().to_numpy(copy=True))
-        state = np.array(state)
+            state.append(res_bus["va_degree"].to_numpy()[self._bus_order])
+        state = np.concatenate(state)
         return state
-    
+
     def get_obs(self):
         """return the obs for each agent in the power system
            the default obs: voltage, active power of generators, bus state, load active power, load reactive power
            each agent can only observe the state within the zone where it belongs
-        """
-        clusters = self._get_clusters_info()
+           the obs of all agents are gathered into one [n_agents, obs_len] buffer which is reused by the next call
+        """
+        res_bus = self.powergrid.res_bus
+        source = self._obs_source
+        source[self._source_slices["p_mw"]] = res_bus["p_mw"].to_numpy()
+        source[self._source_slices["q_mvar"]] = res_bus["q_mvar"].to_numpy()
+        source[self._source_slices["pv"]] = self.powergrid.sgen["p_mw"].to_numpy()
+        source[self._source_slices["reactive"]] = self.powergrid.sgen["q_mvar"].to_numpy()
+        source[self._source_slices["vm_pu"]] = res_bus["vm_pu"].to_numpy()
+        # transform the voltage phase to radian
+        source[self._source_slices["va_degree"]] = res_bus["va_degree"].to_numpy() * np.pi / 180
+
+        agents_obs = np.take(source, self._obs_gather_index, out=self._obs_buffer)
+        # the active and reactive power of the buses with pv are observed without the pv injection
+        np.add.at(agents_obs, self._obs_injection_index, source[self._obs_injection_source])
 
-        if self.args.mode == "distributed":
-            obs_zone_dict = dict()
-            zone_list = list()
-            obs_len_list = list()
-            for i in range(len(self.powergrid.sgen)):
-                obs = list()
-                zone_buses, zone, pv, q, sgen_bus = clusters[f"sgen{i}"]
-                zone_list.append(zone)
-                if not( zone in obs_zone_dict.keys() ):
-                    if "demand" in self.state_space:
-                        copy_zone_buses = copy.deepcopy(zone_buses)
-                        copy_zone_buses.loc[sgen_bus]["p_mw"] += pv
-                        copy_zone_buses.loc[sgen_bus]["q_mvar"] += q
-                        obs += list(copy_zone_buses.loc[:, "p_mw"].to_numpy(copy=True))
-                        obs += list(copy_zone_buses.loc[:, "q_mvar"].to_numpy(copy=True))
-                    if "pv" in self.state_space:
-                        obs.append(pv)
-                    if "reactive" in self.state_space:
-                        obs.append(q)
-                    if "vm_pu" in self.state_space:
-                        obs += list(zone_buses.loc[:, "vm_pu"].to_numpy(copy=True))
-                    if "va_degree" in self.state_space:
-                        # transform the voltage phase to radian
-                        obs += list(zone_buses.loc[:, "va_degree"].to_numpy(copy=True) * np.pi / 180)
-                    obs_zone_dict[zone] = np.array(obs)
-                obs_len_list.append(obs_zone_dict[zone].shape[0])
-            agents_obs = list()
-            obs_max_len = max(obs_len_list)
-            for zone in zone_list:
-                obs_zone = obs_zone_dict[zone]
-                pad_obs_zone = np.concatenate( [obs_zone, np.zeros(obs_max_len - obs_zone.shape[0])], axis=0 )
-                agents_obs.append(pad_obs_zone)
-        elif self.args.mode == "decentralised":
-            obs_len_list = list()
-            zone_obs_list = list()
-            for i in range(self.n_agents):
-                zone_buses, pv, q, sgen_buses = clusters[f"zone{i+1}"]
-                obs = list()
-                if "demand" in self.state_space:
-                    copy_zone_buses = copy.deepcopy(zone_buses)
-                    copy_zone_buses.loc[sgen_buses]["p_mw"] += pv
-                    copy_zone_buses.loc[sgen_buses]["q_mvar"] += q
-                    obs += list(copy_zone_buses.loc[:, "p_mw"].to_numpy(copy=True))
-                    obs += list(copy_zone_buses.loc[:, "q_mvar"].to_numpy(copy=True))
-                if "pv" in self.state_space:
-                    obs += list(pv.to_numpy(copy=True))
-                if "reactive" in self.state_space:
-                    obs += list(q.to_numpy(copy=True))
-                if "vm_pu" in self.state_space:
-                    obs += list(zone_buses.loc[:, "vm_pu"].to_numpy(copy=True))
-                if "va_degree" in self.state_space:
-                    obs += list(zone_buses.loc[:, "va_degree"].to_numpy(copy=True) * np.pi / 180)
-                obs = np.array(obs)
-                zone_obs_list.append(obs)
-                obs_len_list.append(obs.shape[0])
-            agents_obs = []
-            obs_max_len = max(obs_len_list)
-            for obs_zone in zone_obs_list:
-                pad_obs_zone = np.concatenate( [obs_zone, np.zeros(obs_max_len - obs_zone.shape[0])], axis=0 )
-                agents_obs.append(pad_obs_zone)
         if self.history > 1:
-            agents_obs_ = []
-            for i, obs in enumerate(agents_obs):
-                if len(self.obs_history[i]) >= self.history - 1:
-                    obs_ = np.concatenate(self.obs_history[i][-self.history+1:]+[obs], axis=0)
-                else:
-                    zeros = [np.zeros_like(obs)] * ( self.history - len(self.obs_history[i]) - 1 )
-                    obs_ = self.obs_history[i] + [obs]
-                    obs_ = zeros + obs_
-                    obs_ = np.concatenate(obs_, axis=0)
-                agents_obs_.append(copy.deepcopy(obs_))
-                self.obs_history[i].append(copy.deepcopy(obs))
+            n_history = self.history - 1
+            order = (self._obs_history_pos + np.arange(n_history)) % n_history
+            agents_obs_ = np.concatenate(
+                [self._obs_history[order].transpose(1, 0, 2).reshape(self.n_agents, -1), agents_obs], axis=1)
+            self._obs_history[self._obs_history_pos] = agents_obs
+            self._obs_history_pos = (self._obs_history_pos + 1) % n_history
             agents_obs = agents_obs_
 
         return agents_obs
@@ -389,9 +377,9 @@ class VoltageControl(MultiAgentEnv):
     def _select_start_day(self):
         """select start day (date) for an episode
         """
-        pv_data = self.pv_data
-        pv_days = (pv_data.index[-1] - pv_data.index[0]).days
-        self.time_delta = (pv_data.index[1] - pv_data.index[0]).seconds // 60
+        time_index = self.time_index
+        pv_days = int((time_index[-1] - time_index[0]) // np.timedelta64(1, "D"))
+        self.time_delta = int((time_index[1] - time_index[0]) // np.timedelta64(1, "m"))
         episode_days = ( self.episode_limit // (24 * (60 // self.time_delta) ) ) + 1  # margin
         return np.random.choice(pv_days - episode_days)
 
@@ -406,64 +394,48 @@ class VoltageControl(MultiAgentEnv):
         """load pv data
         the sensor frequency is set to 3 or 15 mins as default
         """
-        pv_path = os.path.join(self.data_path, 'pv_active.csv')
-        pv = pd.read_csv(pv_path, index_col=None)
-        pv.index = pd.to_datetime(pv.iloc[:, 0])
-        pv.index.name = 'time'
-        pv = pv.iloc[::1, 1:] * self.args.pv_scale
+        pv, self.time_index = load_time_series(os.path.join(self.data_path, 'pv_active.csv'))
         return pv
 
     def _load_active_demand_data(self):
         """load active demand data
         the sensor frequency is set to 3 or 15 mins as default
         """
-        demand_path = os.path.join(self.data_path, 'load_active.csv')
-        demand = pd.read_csv(demand_path, index_col=None)
-        demand.index = pd.to_datetime(demand.iloc[:, 0])
-        demand.index.name = 'time'
-        demand = demand.iloc[::1, 1:] * self.args.demand_scale
+        demand, _ = load_time_series(os.path.join(self.data_path, 'load_active.csv'))
         return demand
     
     def _load_reactive_demand_data(self):
         """load reactive demand data
         the sensor frequency is set to 3 min as default
         """
-        demand_path = os.path.join(self.data_path, 'load_reactive.csv')
-        demand = pd.read_csv(demand_path, index_col=None)
-        demand.index = pd.to_datetime(demand.iloc[:, 0])
-        demand.index.name = 'time'
-        demand = demand.iloc[::1, 1:] * self.args.demand_scale
+        demand, _ = load_time_series(os.path.join(self.data_path, 'load_reactive.csv'))
         return demand
 
+    def _get_episode_start(self):
+        """return the index of the first time interval of an episode
+        """
+        return self._episode_start_interval + self._episode_start_hour * (60 // self.time_delta) + self._episode_start_day * 24 * (60 // self.time_delta)
+
     def _get_episode_pv_history(self):
-        """return the pv history in an episode
+        """return the (unscaled) pv history in an episode as a view of the pv data
         """
-        episode_length = self.episode_limit
-        history = self.history
-        start = self._episode_start_interval + self._episode_start_hour * (60 // self.time_delta) + self._episode_start_day * 24 * (60 // self.time_delta)
-        nr_intervals = episode_length + history + 1  # margin of 1
-        episode_pv_history = self.pv_data[start:start + nr_intervals].values
-        return episode_pv_history
+        start = self._get_episode_start()
+        nr_intervals = self.episode_limit + self.history + 1  # margin of 1
+        return self.pv_data[start:start + nr_intervals]
     
     def _get_episode_active_demand_history(self):
-        """return the active power histories for all loads in an episode
+        """return the (unscaled) active power histories for all loads in an episode as a view of the demand data
         """
-        episode_length = self.episode_limit
-        history = self.history
-        start = self._episode_start_interval + self._episode_start_hour * (60 // self.time_delta) + self._episode_start_day * 24 * (60 // self.time_delta)
-        nr_intervals = episode_length + history + 1  # margin of 1
-        episode_demand_history = self.active_demand_data[start:start + nr_intervals].values
-        return episode_demand_history
+        start = self._get_episode_start()
+        nr_intervals = self.episode_limit + self.history + 1  # margin of 1
+        return self.active_demand_data[start:start + nr_intervals]
     
     def _get_episode_reactive_demand_history(self):
-        """return the reactive power histories for all loads in an episode
+        """return the (unscaled) reactive power histories for all loads in an episode as a view of the demand data
         """
-        episode_length = self.episode_limit
-        history = self.history
-        start = self._episode_start_interval + self._episode_start_hour * (60 // self.time_delta) + self._episode_start_day * 24 * (60 // self.time_delta)
-        nr_intervals = episode_length + history + 1  # margin of 1
-        episode_demand_history = self.reactive_demand_data[start:start + nr_intervals].values
-        return episode_demand_history
+        start = self._get_episode_start()
+        nr_intervals = self.episode_limit + self.history + 1  # margin of 1
+        return self.reactive_demand_data[start:start + nr_intervals]
 
     def _get_pv_history(self):
         """returns pv history
@@ -489,17 +461,17 @@ class VoltageControl(MultiAgentEnv):
     def _set_demand_and_pv(self, add_noise=True):
         """optionally update the demand and pv production according to the histories with some i.i.d. gaussian noise
         """ 
-        pv = copy.copy(self._get_pv_history()[0, :])
+        pv = self._get_pv_history()[0, :] * self.args.pv_scale
 
         # add uncertainty to pv data with unit truncated gaussian (only positive accepted)
         if add_noise:
             pv += self.pv_std * np.abs(np.random.randn(*pv.shape))
-        active_demand = copy.copy(self._get_active_demand_history()[0, :])
+        active_demand = self._get_active_demand_history()[0, :] * self.args.demand_scale
 
         # add uncertainty to active power of demand data with unit truncated gaussian (only positive accepted)
         if add_noise:
             active_demand += self.active_demand_std * np.abs(np.random.randn(*active_demand.shape))
-        reactive_demand = copy.copy(self._get_reactive_demand_history()[0, :])
+        reactive_demand = self._get_reactive_demand_history()[0, :] * self.args.demand_scale
 
         # add uncertainty to reactive power of demand data with unit truncated gaussian (only positive accepted)
         if add_noise:
@@ -514,35 +486,80 @@ class VoltageControl(MultiAgentEnv):
         """set the boundary of reactive power
         """
         self.factor = 1.2
-        self.p_max = self.pv_data.to_numpy(copy=True).max(axis=0)
+        self.p_max = self.pv_data.max(axis=0) * self.args.pv_scale
         self.s_max = self.factor * self.p_max
         # print (f"This is the s_max: \n{self.s_max}")
 
-    def _get_clusters_info(self):
-        """return the clusters of info
-        the clusters info is divided by predefined zone
-        distributed: each zone is equipped with several PV generators and each PV generator is an agent
+    def _init_obs_index(self):
+        """precompute the integer indices from which the obs of each agent are gathered
+        the clusters of info are divided by predefined zone
+        distributed: each zone is equipped with several PV generators and each PV generator is an agent,
+            all agents in a zone share the obs built from the first PV generator of the zone
         decentralised: each zone is controlled by an agent and each agent may have variant number of actions
         """
-        clusters = dict()
+        bus, sgen = self.base_powergrid.bus, self.base_powergrid.sgen
+        n_bus, n_sgen = len(bus), len(sgen)
+        # buses and sgens are observed in the order of their index
+        self._bus_order = np.argsort(bus.index.to_numpy(), kind="stable")
+        self._sgen_order = np.argsort(sgen.index.to_numpy(), kind="stable")
+        bus_zone = bus["zone"].to_numpy()
+        sgen_zone = sgen["name"].to_numpy()
+        sgen_bus = bus.index.get_indexer(sgen["bus"])
+
+        # one flat source vector per step: [res_bus p, res_bus q, sgen p, sgen q, res_bus vm, res_bus va, 0]
+        self._source_slices = dict()
+        offset = 0
+        for key, size in [("p_mw", n_bus), ("q_mvar", n_bus), ("pv", n_sgen), ("reactive", n_sgen),
+                          ("vm_pu", n_bus), ("va_degree", n_bus)]:
+            self._source_slices[key] = slice(offset, offset + size)
+            offset += size
+        self._obs_source = np.zeros(offset + 1)
+        zero_index = offset
+
         if self.args.mode == "distributed":
-            for i in range(len(self.powergrid.sgen)):
-                zone = self.powergrid.sgen["name"][i]
-                sgen_bus = self.powergrid.sgen["bus"][i]
-                pv = self.powergrid.sgen["p_mw"][i]
-                q = self.powergrid.sgen["q_mvar"][i]
-                zone_res_buses = self.powergrid.res_bus.sort_index().loc[self.powergrid.bus["zone"]==zone]
-                clusters[f"sgen{i}"] = (zone_res_buses, zone, pv, q, sgen_bus)
+            zone_first_sgen = dict()
+            for sgen_id in self._sgen_order:
+                zone_first_sgen.setdefault(sgen_zone[sgen_id], sgen_id)
+            agent_sgens = [np.array([zone_first_sgen[sgen_zone[sgen_id]]]) for sgen_id in self._sgen_order]
         elif self.args.mode == "decentralised":
-            for i in range(self.n_agents):
-                zone_res_buses = self.powergrid.res_bus.sort_index().loc[self.powergrid.bus["zone"]==f"zone{i+1}"]
-                sgen_res_buses = self.powergrid.sgen["bus"].loc[self.powergrid.sgen["name"] == f"zone{i+1}"]
-                pv = self.powergrid.sgen["p_mw"].loc[self.powergrid.sgen["name"] == f"zone{i+1}"]
-                q = self.powergrid.sgen["q_mvar"].loc[self.powergrid.sgen["name"] == f"zone{i+1}"]
-                clusters[f"zone{i+1}"] = (zone_res_buses, pv, q, sgen_res_buses)
-
-        return clusters
-    
+            agent_sgens = [self._sgen_order[sgen_zone[self._sgen_order] == f"zone{i+1}"] for i in range(self.n_agents)]
+
+        gather_index, injection_index, injection_source = list(), list(), list()
+        for agent_id, sgens in enumerate(agent_sgens):
+            zone = sgen_zone[sgens[0]]
+            zone_buses = self._bus_order[bus_zone[self._bus_order] == zone]
+            index = list()
+            if "demand" in self.state_space:
+                for key in ["p_mw", "q_mvar"]:
+                    source_slice = self._source_slices[key]
+                    for sgen_id in sgens:
+                        position = len(index) + int(np.flatnonzero(zone_buses == sgen_bus[sgen_id])[0])
+                        injection_index.append((agent_id, position))
+                        injection_source.append(self._source_slices["pv" if key == "p_mw" else "reactive"].start + sgen_id)
+                    index += list(source_slice.start + zone_buses)
+            if "pv" in self.state_space:
+                index += list(self._source_slices["pv"].start + sgens)
+            if "reactive" in self.state_space:
+                index += list(self._source_slices["reactive"].start + sgens)
+            if "vm_pu" in self.state_space:
+                index += list(self._source_slices["vm_pu"].start + zone_buses)
+            if "va_degree" in self.state_space:
+                index += list(self._source_slices["va_degree"].start + zone_buses)
+            gather_index.append(index)
+
+        # pad the obs of the smaller zones with zeros
+        obs_max_len = max(len(index) for index in gather_index)
+        self._obs_gather_index = np.full((self.n_agents, obs_max_len), zero_index, dtype=np.int64)
+        for agent_id, index in enumerate(gather_index):
+            self._obs_gather_index[agent_id, :len(index)] = index
+        self._obs_injection_index = tuple(np.array(injection_index, dtype=np.int64).reshape(-1, 2).T)
+        self._obs_injection_source = np.array(injection_source, dtype=np.int64)
+        self._obs_buffer = np.zeros((self.n_agents, obs_max_len))
+        if self.history > 1:
+            # ring buffer of the last history - 1 obs
+            self._obs_history = np.zeros((self.history - 1, self.n_agents, obs_max_len))
+            self._obs_history_pos = 0
+
     def _take_action(self, actions):
         """take the control variables
         the control variables we consider are the exact reactive power
@@ -551,8 +568,9 @@ class VoltageControl(MultiAgentEnv):
         self.powergrid.sgen["q_mvar"] = self._clip_reactive_power(actions, self.powergrid.sgen["p_mw"])
 
         # solve power flow to get the latest voltage with new reactive power and old deamnd and PV active power
+        # warm start from the solution of the last time step
         try:
-            pp.runpp(self.powergrid)
+            pp.runpp(self.powergrid, init="results")
             return True
         except ppException:
             print ("The power flow for the reactive power penetration cannot be solved.")
@@ -563,6 +581,34 @@ class VoltageControl(MultiAgentEnv):
             print (f"This is the res_bus: \n{self.powergrid.res_bus}")
             return False
     
+    def _init_rollback_buffers(self):
+        """preallocate the buffers used to roll back a time step
+        a step only mutates the pv, demand and reactive power of the generators and loads plus the power flow results,
+        so snapshotting these columns is enough to restore the power grid when the power flow diverges
+        """
+        tables = ["sgen", "load"] + [key for key in self.powergrid.keys()
+                                     if key.startswith("res_") and isinstance(self.powergrid[key], pd.DataFrame) and len(self.powergrid[key]) > 0]
+        self._rollback_buffers = dict()
+        for table in tables:
+            columns = ["p_mw", "q_mvar"] if table in ["sgen", "load"] else self.powergrid[table].columns
+            for column in columns:
+                values = self.powergrid[table][column].to_numpy()
+                self._rollback_buffers[(table, column)] = np.empty(values.shape, dtype=values.dtype)
+
+    def _snapshot_powergrid(self):
+        """copy the mutable columns of the power grid into the rollback buffers
+        """
+        for (table, column), buffer in self._rollback_buffers.items():
+            buffer[:] = self.powergrid[table][column].to_numpy()
+
+    def _rollback_powergrid(self):
+        """restore the power grid to the last snapshot
+        """
+        for (table, column), buffer in self._rollback_buffers.items():
+            self.powergrid[table][column] = buffer.copy()
+        # the restored results come from a solved power flow, so they are valid for warm starting again
+        self.powergrid["converged"] = True
+
     def _clip_reactive_power(self, reactive_actions, active_power):
         """clip the reactive power to the hard safety range
         """
@@ -45,6 +45,8 @@ tf1, tf, tfv = try_import_tf()
 
 logger = logging.getLogger(__name__)
 
+UPDATE_TARGET_TIMER = "update_target"
+
 
 class TrainOneStep:
     """Callable that improves the policy and updates workers.
@@ -424,7 +426,9 @@ class UpdateTargetNetwork:
         last_update = metrics.counters[LAST_TARGET_UPDATE_TS]
         if cur_ts - last_update > self.target_update_freq:
             to_update = self.policies or self.local_worker.policies_to_train
-            self.workers.local_worker().foreach_trainable_policy(
-                lambda p, p_id: p_id in to_update and p.update_target())
+            # reported as timers/update_target_time_ms
+            with metrics.timers[UPDATE_TARGET_TIMER]:
+                self.workers.local_worker().foreach_trainable_policy(
+                    lambda p, p_id: p_id in to_update and p.update_target())
             metrics.counters[NUM_TARGET_UPDATES] += 1
             metrics.counters[LAST_TARGET_UPDATE_TS] = cur_ts
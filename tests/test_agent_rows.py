@@ -0,0 +1,119 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import numpy as np
+from marllib.marl.algos.utils.agent_rows import drop_padding_rows, stack_agent_rows, gather_opponent_rows, \
+    next_opponent_actions, opponent_index_table
+
+
+def loop_next_opponent_actions(target_outputs, batch_agent_indices, n_agents):
+    # the per-row construction MADDPG used before, on batches padded with agent index + 1 and 0 padding
+    all_agent_next_action = []
+    for next_action, shifted_agent_index in target_outputs:
+        for a_id in np.unique(shifted_agent_index):
+            if a_id == 0:  # zero padding
+                continue
+            all_agent_next_action.append(next_action[np.where(shifted_agent_index == a_id)[0], :])
+    all_agent_next_action = np.stack(all_agent_next_action, 1)
+
+    results = []
+    for agent_index in batch_agent_indices:
+        agent_num = len(np.unique(agent_index))
+        next_action_batch = np.stack([all_agent_next_action] * agent_num, 1).reshape((len(agent_index), n_agents, -1))
+        results.append(np.stack([np.delete(next_action_batch[i], agent_index[i], axis=0)
+                                 for i in range(len(agent_index))], 0))
+    return results
+
+
+def pad_sequences(next_action, agent_index, max_seq_len, rng):
+    # split the rows into sequences of random length and zero pad each to max_seq_len, like rllib does for rnns
+    padded_actions, padded_index = [], []
+    start = 0
+    while start < len(agent_index):
+        length = int(rng.integers(1, max_seq_len + 1))
+        rows = slice(start, start + length)
+        real = len(agent_index[rows])
+        padded_actions.append(next_action[rows])
+        padded_actions.append(rng.normal(size=(max_seq_len - real, next_action.shape[1])))
+        padded_index.append(agent_index[rows] + 1)
+        padded_index.append(np.zeros(max_seq_len - real, dtype=agent_index.dtype))
+        start += length
+    return np.concatenate(padded_actions), np.concatenate(padded_index)
+
+
+class TestAgentRows(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def policy_batches(self, agent_groups, timesteps, action_dim):
+        # rows of each policy batch interleave its agents timestep by timestep
+        return [(self.rng.normal(size=(timesteps * len(agents), action_dim)), np.tile(np.array(agents), timesteps))
+                for agents in agent_groups]
+
+    def check(self, agent_groups, padded):
+        n_agents = sum(len(agents) for agents in agent_groups)
+        batches = self.policy_batches(agent_groups, timesteps=7, action_dim=3)
+
+        target_outputs, blocks = [], []
+        for next_action, agent_index in batches:
+            if padded:
+                padded_action, shifted_index = pad_sequences(next_action, agent_index, 4, self.rng)
+                target_outputs.append((padded_action, shifted_index))
+                blocks.append(stack_agent_rows(*drop_padding_rows(padded_action, shifted_index)))
+            else:
+                target_outputs.append((next_action, agent_index + 1))
+                blocks.append(stack_agent_rows(next_action, agent_index))
+
+        batch_agent_indices = [agent_index for _, agent_index in batches]
+        expected = loop_next_opponent_actions(target_outputs, batch_agent_indices, n_agents)
+        for got, want in zip(next_opponent_actions(blocks, batch_agent_indices), expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_shared_policy(self):
+        self.check([[0, 1, 2, 3]], padded=False)
+
+    def test_multi_policy(self):
+        self.check([[0, 1], [2], [3, 4]], padded=False)
+
+    def test_padded_rnn_batches(self):
+        self.check([[0, 1, 2]], padded=True)
+        self.check([[0, 1], [2]], padded=True)
+
+    def test_opponent_index_table(self):
+        np.testing.assert_array_equal(opponent_index_table(3), [[1, 2], [0, 2], [0, 1]])
+
+    def test_gather_matches_delete(self):
+        all_agent_values = self.rng.normal(size=(5, 4, 2))
+        agent_index = np.tile(np.arange(4), 5)
+        gathered = gather_opponent_rows(all_agent_values, agent_index)
+        for i, agent in enumerate(agent_index):
+            np.testing.assert_array_equal(gathered[i], np.delete(all_agent_values[i // 4], agent, axis=0))
+
+    def test_uneven_agent_rows(self):
+        with self.assertRaises(ValueError):
+            stack_agent_rows(np.zeros((5, 2)), np.array([0, 1, 0, 1, 0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import numpy as np
+import torch
+from gym.spaces import Box, Dict as GymDict, Discrete
+from ray.rllib.models import ModelCatalog
+from marllib.marl.algos.utils.batch_planner import profile_model_cost, plan_batches, _build_probe_model, \
+    _forward_backward, _critic_values
+from marllib.marl.models.zoo.mlp.base_mlp import BaseMLP
+from marllib.marl.models.zoo.rnn.base_rnn import BaseRNN
+from marllib.marl.models.zoo.mlp.cc_mlp import CentralizedCriticMLP
+from marllib.marl.models.zoo.rnn.cc_rnn import CentralizedCriticRNN
+from marllib.marl.models.zoo.mlp.vd_mlp import ValueDecompMLP
+
+OBS_SPACE = GymDict({
+    "obs": Box(-1.0, 1.0, (10,), dtype=np.float32),
+    "state": Box(-1.0, 1.0, (24,), dtype=np.float32),
+    "action_mask": Box(0.0, 1.0, (5,), dtype=np.float32),
+})
+LOCAL_OBS_SPACE = GymDict({k: v for k, v in OBS_SPACE.spaces.items() if k != "state"})
+ACTION_SPACE = Discrete(5)
+CPU = torch.device("cpu")
+
+
+def model_config(custom_model, core_arch, algorithm="ippo", opp_action_in_cc=False, global_state_flag=True):
+    return {
+        "custom_model": custom_model,
+        "max_seq_len": 10,
+        "fcnet_activation": "tanh",
+        "custom_model_config": {
+            "algorithm": algorithm,
+            "num_agents": 3,
+            "space_obs": OBS_SPACE if global_state_flag else LOCAL_OBS_SPACE,
+            "space_act": ACTION_SPACE,
+            "global_state_flag": global_state_flag,
+            "mask_flag": True,
+            "opp_action_in_cc": opp_action_in_cc,
+            "model_arch_args": {"core_arch": core_arch, "fc_layer": 1, "encode_layer": "16",
+                                "hidden_state_size": 16, "mixer_arch": "qmix", "mixer_embedding": 8},
+        },
+    }
+
+
+class TestBatchPlanner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        ModelCatalog.register_custom_model("Base_MLP_Probe", BaseMLP)
+        ModelCatalog.register_custom_model("Base_RNN_Probe", BaseRNN)
+        ModelCatalog.register_custom_model("CC_MLP_Probe", CentralizedCriticMLP)
+        ModelCatalog.register_custom_model("CC_RNN_Probe", CentralizedCriticRNN)
+        ModelCatalog.register_custom_model("VD_MLP_Probe", ValueDecompMLP)
+
+    def check_cost(self, fixed_ms, per_sample_ms, per_sample_bytes):
+        self.assertGreaterEqual(fixed_ms, 0.0)
+        self.assertGreater(per_sample_ms, 0.0)
+        if per_sample_bytes is not None:
+            self.assertGreaterEqual(per_sample_bytes, 1.0)
+
+    def test_profile_base_mlp(self):
+        cost = profile_model_cost(OBS_SPACE, ACTION_SPACE, model_config("Base_MLP_Probe", "mlp"), CPU,
+                                  probe_samples=(32, 256), repeats=1)
+        self.check_cost(*cost)
+
+    def test_profile_base_rnn(self):
+        for core_arch in ["gru", "lstm"]:
+            cost = profile_model_cost(OBS_SPACE, ACTION_SPACE, model_config("Base_RNN_Probe", core_arch), CPU,
+                                      probe_samples=(32, 256), repeats=1)
+            self.check_cost(*cost)
+
+    def check_critic_trained(self, config, critic):
+        obs_space = config["custom_model_config"]["space_obs"]
+        model = _build_probe_model(obs_space, ACTION_SPACE, config, CPU)
+        seen = []
+        for module in critic(model):
+            for param in module.parameters():
+                param.register_hook(lambda grad: seen.append(True))
+        n_seq = 4
+        _forward_backward(model, n_seq, config["max_seq_len"] if model.get_initial_state() else 1, CPU)
+        self.assertTrue(seen)
+        return model
+
+    def test_profile_centralized_critic(self):
+        for custom_model, core_arch in [("CC_MLP_Probe", "mlp"), ("CC_RNN_Probe", "gru")]:
+            for opp_action_in_cc, global_state_flag in [(False, True), (True, True), (True, False)]:
+                config = model_config(custom_model, core_arch, "mappo", opp_action_in_cc, global_state_flag)
+                self.check_critic_trained(config, lambda model: [model.cc_vf_branch])
+                obs_space = config["custom_model_config"]["space_obs"]
+                self.check_cost(*profile_model_cost(obs_space, ACTION_SPACE, config, CPU,
+                                                    probe_samples=(32, 256), repeats=1))
+
+    def test_profile_value_mixer(self):
+        for global_state_flag in [True, False]:
+            config = model_config("VD_MLP_Probe", "mlp", "vdppo", global_state_flag=global_state_flag)
+            model = self.check_critic_trained(config, lambda model: [model.mixer.V])
+            self.assertEqual(_critic_values(model, 4, CPU).shape, (4,))  # rows of the last forward
+
+    def test_plan_within_target(self):
+        plan = plan_batches(train_batch_size=4000, num_sgd_iter=5, episode_limit=25, fixed_ms=1.0,
+                            per_sample_ms=0.01, per_sample_bytes=None, target_ms=1000)
+        self.assertEqual(plan["num_sgd_iter"], 5)
+        self.assertEqual(plan["sgd_minibatch_size"], 128)
+        self.assertEqual(plan["rollout_fragment_length"], 4000)
+        self.assertLessEqual(plan["learner_ms"], 1000)
+
+    def test_plan_cuts_sgd_iter_and_respects_memory(self):
+        plan = plan_batches(train_batch_size=4000, num_sgd_iter=10, episode_limit=25, fixed_ms=1.0,
+                            per_sample_ms=0.05, per_sample_bytes=1024, target_ms=500,
+                            memory_budget_bytes=1024 * 1024, num_rollout_envs=4)
+        self.assertLessEqual(plan["sgd_minibatch_size"] * 1024, 1024 * 1024)
+        self.assertLess(plan["num_sgd_iter"], 10)
+        self.assertEqual(plan["rollout_fragment_length"], 1000)
+
+    def test_plan_scales_with_agent_rows(self):
+        kwargs = dict(train_batch_size=1000, num_sgd_iter=5, episode_limit=25, fixed_ms=1.0, per_sample_ms=0.01,
+                      per_sample_bytes=None, target_ms=1e9)
+        single = plan_batches(**kwargs)
+        shared = plan_batches(policy_rows=3000, **kwargs)  # 3 agents on one shared policy
+        individual = plan_batches(num_policies=3, **kwargs)  # 3 policies of 1000 rows each
+        self.assertEqual(single["rollout_fragment_length"], shared["rollout_fragment_length"])
+        self.assertAlmostEqual(individual["learner_ms"], 3 * single["learner_ms"])
+        self.assertGreater(shared["learner_ms"], 2.5 * single["learner_ms"])
+        # the minibatch can grow up to the policy batch, not train_batch_size
+        capped = plan_batches(policy_rows=3000, **dict(kwargs, fixed_ms=100.0, target_ms=1.0))
+        self.assertEqual(capped["sgd_minibatch_size"], 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
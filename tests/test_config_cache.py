@@ -0,0 +1,65 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+from marllib.marl.common import load_config, clear_config_cache
+
+
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        clear_config_cache()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "algo.yaml")
+        self.write("algo_args:\n  use_gae: True\n  lr: 0.0005\n  layers: [64, 64]\n", 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, text, second):
+        with open(self.path, "w") as f:
+            f.write(text)
+        os.utime(self.path, ns=(second * 10 ** 9, second * 10 ** 9))
+
+    def test_reloads_after_file_change(self):
+        self.assertEqual(load_config(self.path, "algo_args")["algo_args"]["lr"], 0.0005)
+        self.write("algo_args:\n  use_gae: True\n  lr: 0.001\n  layers: [64, 64]\n", 2)
+        self.assertEqual(load_config(self.path, "algo_args")["algo_args"]["lr"], 0.001)
+
+    def test_returned_config_is_a_copy(self):
+        config = load_config(self.path, "algo_args", {"lr": 0.1})
+        config["algo_args"]["lr"] = 0.3
+        config["algo_args"]["layers"].append(32)
+        again = load_config(self.path, "algo_args", {"lr": 0.1})
+        self.assertEqual(again["algo_args"]["lr"], 0.1)
+        self.assertEqual(again["algo_args"]["layers"], [64, 64])
+
+    def test_equal_overrides_of_different_type(self):
+        self.assertIs(load_config(self.path, "algo_args", {"use_gae": 1})["algo_args"]["use_gae"], 1)
+        self.assertIs(load_config(self.path, "algo_args", {"use_gae": True})["algo_args"]["use_gae"], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import warnings
+from marllib.marl.common import coerce_hyperparameter, check_algo_args
+
+
+class Float:
+    """stand-in for a ray.tune search space such as tune.uniform(1e-4, 1e-3)"""
+    __module__ = "ray.tune.sample"
+
+    def sample(self, spec=None, size=1):
+        return 5e-4
+
+
+REFERENCE = {"lr": 0.0005, "batch_episode": 10, "use_gae": True, "clip_param": 0.3, "vf_clip_param": 10.0}
+
+
+class TestCoerceHyperparameter(unittest.TestCase):
+
+    def test_strings(self):
+        samples = [("1e6", 1000000, int), ("1e-5", 1e-5, float), ("True", True, bool), ("False", False, bool),
+                   ("0.5", 0.5, float), ("10", 10, int), ("2.5e3", 2500.0, float), ("abc", "abc", str)]
+        for raw, expected, expected_type in samples:
+            value = coerce_hyperparameter(raw)
+            self.assertEqual(value, expected, raw)
+            self.assertIs(type(value), expected_type, raw)
+
+    def test_non_strings_unchanged(self):
+        for value in [3, 0.1, True, None, [1, 2]]:
+            self.assertIs(coerce_hyperparameter(value), value)
+
+    def test_grid_search(self):
+        value = coerce_hyperparameter({"grid_search": ["1e-5", "5e-4", 0.001]})
+        self.assertEqual(value, {"grid_search": [1e-5, 5e-4, 0.001]})
+        self.assertTrue(all(isinstance(choice, float) for choice in value["grid_search"]))
+
+    def test_tune_domain_unchanged(self):
+        domain = Float()
+        self.assertIs(coerce_hyperparameter(domain), domain)
+
+
+class TestCheckAlgoArgs(unittest.TestCase):
+
+    def test_typed_copy(self):
+        args = {"lr": "5e-4", "batch_episode": "1e1", "use_gae": "True", "clip_param": 0.2, "vf_clip_param": 10}
+        typed = check_algo_args(args, REFERENCE, "test")
+        self.assertEqual(typed, {"lr": 5e-4, "batch_episode": 10, "use_gae": True, "clip_param": 0.2,
+                                 "vf_clip_param": 10})
+        self.assertEqual(args["lr"], "5e-4")
+
+    def test_missing_key(self):
+        args = dict(REFERENCE)
+        args.pop("clip_param")
+        with self.assertRaisesRegex(ValueError, "clip_param"):
+            check_algo_args(args, REFERENCE, "test")
+
+    def test_wrong_type(self):
+        for key, value in [("batch_episode", 0.5), ("use_gae", 1), ("lr", "abc"), ("clip_param", True)]:
+            with self.assertRaisesRegex(ValueError, key):
+                check_algo_args(dict(REFERENCE, **{key: value}), REFERENCE, "test")
+
+    def test_unknown_key_warns(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            typed = check_algo_args(dict(REFERENCE, extra_key=1), REFERENCE, "test")
+        self.assertEqual(typed["extra_key"], 1)
+        self.assertTrue(any("extra_key" in str(w.message) for w in caught))
+
+    def test_grid_search(self):
+        typed = check_algo_args(dict(REFERENCE, lr={"grid_search": ["1e-4", 0.001]}), REFERENCE, "test")
+        self.assertEqual(typed["lr"], {"grid_search": [1e-4, 0.001]})
+        with self.assertRaisesRegex(ValueError, "batch_episode"):
+            check_algo_args(dict(REFERENCE, batch_episode={"grid_search": [5, 0.5]}), REFERENCE, "test")
+
+    def test_tune_domain(self):
+        domain = Float()
+        typed = check_algo_args(dict(REFERENCE, lr=domain), REFERENCE, "test")
+        self.assertIs(typed["lr"], domain)
+
+    def test_no_reference(self):
+        self.assertEqual(check_algo_args({"lr": "1e-3", "x": "abc"}), {"lr": 1e-3, "x": "abc"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pickle
+import unittest
+import numpy as np
+from gym.spaces import Box, Dict as GymDict, Tuple as GymTuple
+from ray.rllib.models import ModelCatalog
+from marllib.marl.algos.utils.obs_filter import obs_key_mask, ObsKeyMeanStdFilter, observation_filter
+from marllib.marl.inference import ObsNormalizer, _loads
+
+OBS_SPACE = GymDict({
+    "obs": Box(-10.0, 10.0, (3,), dtype=np.float32),
+    "state": Box(-10.0, 10.0, (4,), dtype=np.float32),
+    "action_mask": Box(0.0, 1.0, (2,), dtype=np.float32),
+})
+
+
+def flat_batch(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    prep = ModelCatalog.get_preprocessor_for_space(OBS_SPACE)
+    raw = [{"obs": rng.normal(5.0, 3.0, 3).astype(np.float32),
+            "state": rng.normal(-2.0, 0.5, 4).astype(np.float32),
+            "action_mask": np.ones(2, dtype=np.float32)} for _ in range(n_rows)]
+    return raw, np.stack([prep.transform(obs) for obs in raw])
+
+
+class TestObsFilter(unittest.TestCase):
+
+    def test_mask_selects_obs(self):
+        mask = obs_key_mask(OBS_SPACE)
+        self.assertEqual(mask.sum(), 3)
+        raw, flat = flat_batch(4)
+        np.testing.assert_array_equal(flat[:, mask], np.stack([obs["obs"] for obs in raw]))
+
+    def test_mask_of_grouped_agents(self):
+        mask = obs_key_mask(GymTuple([OBS_SPACE] * 3))
+        self.assertEqual(mask.shape, (27,))
+        self.assertEqual(mask.sum(), 9)
+        np.testing.assert_array_equal(mask, np.tile(obs_key_mask(OBS_SPACE), 3))
+
+    def test_normalizes_only_obs(self):
+        mask = obs_key_mask(OBS_SPACE)
+        obs_filter = ObsKeyMeanStdFilter(mask.shape, mask, clip=None)
+        _, flat = flat_batch(2000)
+        out = np.stack([obs_filter(row) for row in flat])
+        self.assertEqual(out.dtype, flat.dtype)
+        np.testing.assert_array_equal(out[:, ~mask], flat[:, ~mask])
+        later = obs_filter(flat, update=False)[:, mask]
+        np.testing.assert_allclose(later.mean(0), 0.0, atol=1e-3)
+        np.testing.assert_allclose(later.std(0), 1.0, atol=1e-3)
+
+    def test_copy_sync_and_pickle(self):
+        mask = obs_key_mask(OBS_SPACE)
+        obs_filter = ObsKeyMeanStdFilter(mask.shape, mask)
+        _, flat = flat_batch(50)
+        obs_filter(flat)
+        for other in [obs_filter.copy(), obs_filter.as_serializable(), pickle.loads(pickle.dumps(obs_filter))]:
+            self.assertIsInstance(other, ObsKeyMeanStdFilter)
+            np.testing.assert_array_equal(other(flat, update=False), obs_filter(flat, update=False))
+
+    def test_observation_filter_switch(self):
+        self.assertEqual(observation_filter({"normalize_obs": False}, OBS_SPACE), "NoFilter")
+        self.assertEqual(observation_filter({}, OBS_SPACE), "NoFilter")
+        obs_filter = observation_filter({"normalize_obs": True}, OBS_SPACE)((9,))  # called by rllib with the shape
+        self.assertIsInstance(obs_filter, ObsKeyMeanStdFilter)
+        self.assertEqual(obs_filter.mask.sum(), 3)
+
+    def test_inference_normalizer_matches_filter(self):
+        mask = obs_key_mask(OBS_SPACE)
+        obs_filter = ObsKeyMeanStdFilter(mask.shape, mask)
+        raw, flat = flat_batch(100)
+        obs_filter(flat)
+        # the checkpoint is unpickled by the ray-free inference loader
+        normalizer = ObsNormalizer.from_filter_state(_loads(pickle.dumps(obs_filter.as_serializable())).state)
+        obs = np.stack([o["obs"] for o in raw])
+        np.testing.assert_allclose(normalizer(obs), obs_filter(flat, update=False)[:, mask], rtol=1e-5, atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
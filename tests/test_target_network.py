@@ -0,0 +1,103 @@
+# MIT License
+
+# Copyright (c) 2023 Replicable-MARL
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import torch
+import torch.nn as nn
+from marllib.marl.algos.utils.target_network import TargetNetworkPair, target_network_pair
+
+
+def make_pair():
+    # batch norm brings both float buffers (running stats) and an integer one (num_batches_tracked)
+    torch.manual_seed(0)
+    source = nn.Sequential(nn.Linear(4, 8), nn.BatchNorm1d(8), nn.Linear(8, 2))
+    target = nn.Sequential(nn.Linear(4, 8), nn.BatchNorm1d(8), nn.Linear(8, 2))
+    source.train()
+    for _ in range(3):
+        source(torch.randn(16, 4))
+    return source, target
+
+
+class _Owner:
+    pass
+
+
+class TestTargetNetworkPair(unittest.TestCase):
+
+    def test_soft_update_matches_state_dict_blend(self):
+        source, target = make_pair()
+        tau = 0.3
+        source_state = source.state_dict()
+        expected = {}
+        for name, value in target.state_dict().items():
+            if value.is_floating_point():
+                expected[name] = tau * source_state[name] + (1 - tau) * value
+            else:
+                expected[name] = source_state[name].clone()
+        TargetNetworkPair(source, target).soft_update(tau)
+        for name, value in target.state_dict().items():
+            if value.is_floating_point():
+                self.assertTrue(torch.allclose(value, expected[name], atol=1e-6), name)
+            else:
+                self.assertTrue(torch.equal(value, expected[name]), name)
+
+    def test_soft_update_tau_one_is_hard_update(self):
+        source, target = make_pair()
+        TargetNetworkPair(source, target).soft_update(1.0)
+        for name, value in target.state_dict().items():
+            self.assertTrue(torch.equal(value, source.state_dict()[name]), name)
+
+    def test_hard_update_copies_integer_buffers(self):
+        source, target = make_pair()
+        self.assertEqual(int(source[1].num_batches_tracked), 3)
+        self.assertEqual(int(target[1].num_batches_tracked), 0)
+        TargetNetworkPair(source, target).hard_update()
+        self.assertEqual(int(target[1].num_batches_tracked), 3)
+        for name, value in target.state_dict().items():
+            self.assertTrue(torch.equal(value, source.state_dict()[name]), name)
+
+    def test_cached_pair_rebuilt_after_device_move(self):
+        source, target = make_pair()
+        owner = _Owner()
+        pair = target_network_pair(owner, source, target)
+        self.assertIs(target_network_pair(owner, source, target), pair)
+
+        device = "cuda" if torch.cuda.is_available() else "meta"
+        source.to(device)
+        target.to(device)
+        moved = target_network_pair(owner, source, target)
+        self.assertIsNot(moved, pair)
+        # the rebuilt pair points at the tensors the modules now hold
+        target_state = target.state_dict(keep_vars=True)
+        held = moved.float_pairs[0] + moved.other_pairs[0]
+        self.assertEqual(len(held), len(target_state))
+        for tensor in held:
+            self.assertEqual(tensor.device.type, device)
+            self.assertTrue(any(tensor is value for value in target_state.values()))
+        if device == "cuda":
+            moved.hard_update()
+            for name, value in target.state_dict().items():
+                self.assertTrue(torch.equal(value, source.state_dict()[name]), name)
+
+
+if __name__ == "__main__":
+    unittest.main()